@@ -0,0 +1,332 @@
+"""
+Measures the throughput and the overhead of linguametrica itself, by running
+sessions against a deterministic in-process fake LLM for the pipeline and the
+metrics. Every scenario runs in a fresh process, so its peak memory use isn't
+affected by the scenarios before it.
+
+Run the benchmark with `python -m benchmarks.session_throughput`. The results are
+written as JSON lines, one per scenario. Pass a previous result file with
+--baseline to fail when the throughput dropped.
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Annotated, Dict, Iterator, List, Optional, Tuple
+
+import typer
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from pydantic import BaseModel
+
+from linguametrica.config import ApplicationKind, ProjectConfig, TestProviderKind
+from linguametrica.fake_llm import FakeChatModel
+from linguametrica.harness import TestHarness
+from linguametrica.metrics import get_metric
+from linguametrica.session import Session
+from linguametrica.testcase import MessageData, MessageRole, TestCase
+
+app = typer.Typer(help="Benchmark the throughput of a linguametrica session")
+
+prompt_template = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You're a digital assistant, you're here to help me write stuff."),
+        MessagesPlaceholder(variable_name="history"),
+        ("user", "{input}"),
+    ]
+)
+
+
+class BenchmarkResult(BaseModel):
+    """
+    Contains the measurements of a single benchmark scenario.
+
+    Attributes:
+    -----------
+    test_cases: int
+        The number of test cases in the scenario
+    concurrency: int
+        The maximum number of calls to the pipeline or the metric LLM at once
+    batch_size: int
+        The number of test cases that are scored together
+    latency: float
+        The average number of seconds a call to the fake LLM takes
+    jitter: float
+        The maximum deviation from the average latency in seconds
+    metrics: List[str]
+        The metrics collected for each test case
+    duration: float
+        The number of seconds the session took
+    cases_per_second: float
+        The number of test cases completed per second
+    overhead_per_case: float
+        The number of seconds per test case not spent waiting for the fake LLM
+    peak_rss_mb: float
+        The peak memory use of the process in megabytes
+    failed_cases: int
+        The number of test cases that failed
+    """
+
+    test_cases: int
+    concurrency: int
+    batch_size: int
+    latency: float
+    jitter: float
+    metrics: List[str]
+    duration: float
+    cases_per_second: float
+    overhead_per_case: float
+    peak_rss_mb: float
+    failed_cases: int
+
+    @property
+    def key(self) -> Tuple[int, int, int, float, float]:
+        """Gets the settings that identify the scenario"""
+        return (
+            self.test_cases,
+            self.concurrency,
+            self.batch_size,
+            self.latency,
+            self.jitter,
+        )
+
+
+def run_scenario(
+    test_cases: int,
+    concurrency: int,
+    batch_size: int,
+    latency: float,
+    jitter: float,
+    metrics: List[str],
+) -> BenchmarkResult:
+    """
+    Runs a session with synthetic test cases against the fake LLM.
+
+    Parameters:
+    -----------
+    test_cases: int
+        The number of test cases to run
+    concurrency: int
+        The maximum number of calls to the pipeline or the metric LLM at once
+    batch_size: int
+        The number of test cases that are scored together
+    latency: float
+        The average number of seconds a call to the fake LLM takes
+    jitter: float
+        The maximum deviation from the average latency in seconds
+    metrics: List[str]
+        The metrics to collect for each test case
+
+    Returns:
+    --------
+    BenchmarkResult
+        The measurements of the scenario
+    """
+
+    # The metrics create their LLM through the fake provider, which reads its
+    # settings from the environment.
+    os.environ["LINGUAMETRICA_FAKE_LATENCY"] = str(latency)
+    os.environ["LINGUAMETRICA_FAKE_JITTER"] = str(jitter)
+
+    project_config = ProjectConfig(
+        kind=ApplicationKind.ChatApplication,
+        module="benchmarks.session_throughput:prompt_template",
+        metrics=metrics,
+        provider=TestProviderKind.Fake,
+    )
+
+    pipeline = prompt_template | FakeChatModel(latency=latency, jitter=jitter)
+
+    session = Session(
+        project_config,
+        TestHarness(pipeline),
+        [get_metric(name) for name in metrics],
+        _generate_test_cases(test_cases),
+        concurrency=concurrency,
+        batch_size=batch_size,
+    )
+
+    start_time = time.perf_counter()
+    summary = session.run()
+    duration = time.perf_counter() - start_time
+
+    # Every test case makes a call to the pipeline and one call per metric. With
+    # perfect concurrency, the calls would take this long in total.
+    calls = test_cases * (1 + len(metrics))
+    waiting_time = calls * latency / concurrency
+
+    return BenchmarkResult(
+        test_cases=test_cases,
+        concurrency=concurrency,
+        batch_size=batch_size,
+        latency=latency,
+        jitter=jitter,
+        metrics=metrics,
+        duration=duration,
+        cases_per_second=test_cases / duration,
+        overhead_per_case=max(0.0, duration - waiting_time) / test_cases,
+        peak_rss_mb=_get_peak_rss_mb(),
+        failed_cases=summary.failed_cases,
+    )
+
+
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline: List[BenchmarkResult],
+    tolerance: float,
+) -> List[str]:
+    """
+    Compares the throughput of the scenarios with a baseline.
+
+    Parameters:
+    -----------
+    results: List[BenchmarkResult]
+        The results of the current run
+    baseline: List[BenchmarkResult]
+        The results of an earlier run
+    tolerance: float
+        The fraction the throughput may drop before it's a regression
+
+    Returns:
+    --------
+    List[str]
+        A description of each scenario that regressed
+    """
+    baseline_results: Dict[Tuple[int, int, int, float, float], BenchmarkResult] = {
+        result.key: result for result in baseline
+    }
+
+    regressions = []
+
+    for result in results:
+        baseline_result = baseline_results.get(result.key)
+
+        if baseline_result is None:
+            continue
+
+        minimum = baseline_result.cases_per_second * (1 - tolerance)
+
+        if result.cases_per_second < minimum:
+            regressions.append(
+                f"{result.test_cases} test cases: {result.cases_per_second:.1f} "
+                f"cases/sec, baseline {baseline_result.cases_per_second:.1f}"
+            )
+
+    return regressions
+
+
+@app.command()
+def benchmark(
+    size: Annotated[
+        Optional[List[int]],
+        typer.Option(help="The number of test cases, can be repeated."),
+    ] = None,
+    concurrency: Annotated[
+        int,
+        typer.Option(help="The maximum number of calls at the same time.", min=1),
+    ] = 8,
+    batch_size: Annotated[
+        int,
+        typer.Option(help="The number of test cases scored together.", min=1),
+    ] = 32,
+    latency: Annotated[
+        float,
+        typer.Option(help="The average latency of the fake LLM in seconds.", min=0),
+    ] = 0.0,
+    jitter: Annotated[
+        float,
+        typer.Option(help="The maximum deviation from the latency in seconds.", min=0),
+    ] = 0.0,
+    metric: Annotated[
+        Optional[List[str]],
+        typer.Option(help="The metrics to collect, can be repeated."),
+    ] = None,
+    output: Annotated[
+        Optional[str],
+        typer.Option(help="The file to write the results to, as JSON lines."),
+    ] = None,
+    baseline: Annotated[
+        Optional[str],
+        typer.Option(help="A result file to compare the throughput with."),
+    ] = None,
+    tolerance: Annotated[
+        float,
+        typer.Option(help="The fraction the throughput may drop.", min=0, max=1),
+    ] = 0.2,
+):
+    """
+    Run the benchmark scenarios and report the throughput of each scenario.
+    """
+    sizes = size or [100, 1_000, 10_000, 100_000]
+    metrics = metric or ["harmfulness", "maliciousness"]
+    results = []
+
+    for test_cases in sizes:
+        # A fresh process per scenario, so the peak memory use is its own.
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            result = executor.submit(
+                run_scenario,
+                test_cases,
+                concurrency,
+                batch_size,
+                latency,
+                jitter,
+                metrics,
+            ).result()
+
+        results.append(result)
+        print(result.model_dump_json(), flush=True)
+
+    if output is not None:
+        with open(output, "w") as f:
+            for result in results:
+                f.write(result.model_dump_json() + "\n")
+
+    if baseline is not None:
+        with open(baseline, "r") as f:
+            baseline_results = [
+                BenchmarkResult.model_validate(json.loads(line))
+                for line in f
+                if line.strip() != ""
+            ]
+
+        regressions = find_regressions(results, baseline_results, tolerance)
+
+        for regression in regressions:
+            print(f"Throughput regression: {regression}", file=sys.stderr)
+
+        if len(regressions) > 0:
+            raise typer.Exit(code=1)
+
+
+def _generate_test_cases(count: int) -> Iterator[TestCase]:
+    for index in range(count):
+        yield TestCase(
+            id=f"benchmark-{index}",
+            history=[
+                MessageData(
+                    content=f"Hello, this is user {index}", role=MessageRole.user
+                ),
+                MessageData(content="Hi, how can I help?", role=MessageRole.assistant),
+            ],
+            input=f"Can you write a short summary of topic {index}?",
+        )
+
+
+def _get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports the peak memory use in kilobytes, macOS in bytes.
+    if sys.platform == "darwin":
+        return peak_rss / (1024 * 1024)
+
+    return peak_rss / 1024
+
+
+if __name__ == "__main__":
+    app()
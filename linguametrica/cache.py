@@ -0,0 +1,369 @@
+"""The caches used to store intermediate results of a session on disk."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# The number of seconds a connection waits for another process to finish writing.
+# Worker processes share the caches of a project, and a write can wait for the
+# writes of every other worker.
+BUSY_TIMEOUT = 60.0
+
+
+class KeyValueCache:
+    """
+    Stores values in a SQLite database, looked up by a content hash of everything
+    that determines the value. Entries that haven't been used for longer than the
+    maximum age are evicted, as are the least recently used entries when the cache
+    grows beyond the maximum number of entries.
+
+    Attributes:
+    -----------
+    path: Path
+        The path to the cache database
+    max_entries: int
+        The maximum number of entries to keep in the cache
+    max_age: timedelta
+        The maximum time an entry is kept in the cache since it was last used
+    """
+
+    path: Path
+    max_entries: int
+    max_age: timedelta
+
+    # The name of the table and the column holding the values, and the SQLite type
+    # of the values.
+    table_name: str
+    value_column: str
+    value_type: str
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 100_000,
+        max_age: timedelta = timedelta(days=30),
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = _connect(path)
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table_name} (key TEXT PRIMARY KEY, "
+            f"{self.value_column} {self.value_type} NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table_name}_accessed_at "
+            f"ON {self.table_name}(accessed_at)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def create_key(*parts: str) -> str:
+        """
+        Creates a cache key from the parts that determine a value.
+
+        Parameters:
+        -----------
+        parts: str
+            The parts that determine the value, like the provider, the model and
+            the rendered prompt
+
+        Returns:
+        --------
+        str
+            The SHA-256 hash of the parts
+        """
+        digest = hashlib.sha256()
+
+        for part in parts:
+            encoded_part = part.encode("utf-8")
+            digest.update(len(encoded_part).to_bytes(8, "little"))
+            digest.update(encoded_part)
+
+        return digest.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Looks up the values for the given keys.
+
+        Parameters:
+        -----------
+        keys: List[str]
+            The keys to look up
+
+        Returns:
+        --------
+        Dict[str, Any]
+            The cached values for the keys that were found in the cache
+        """
+        if len(keys) == 0:
+            return {}
+
+        now = time.time()
+        unique_keys = list(set(keys))
+        values = {}
+
+        with self._lock:
+            # SQLite limits the number of parameters in a single statement, so we
+            # look up the keys in chunks.
+            for offset in range(0, len(unique_keys), 500):
+                chunk = unique_keys[offset : offset + 500]
+                placeholders = ",".join("?" for _ in chunk)
+
+                rows = self._connection.execute(
+                    f"SELECT key, {self.value_column} FROM {self.table_name} "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+
+                values.update(dict(rows))
+
+            self._connection.executemany(
+                f"UPDATE {self.table_name} SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in values],
+            )
+            self._connection.commit()
+
+        return values
+
+    def put_many(self, values: Dict[str, Any]):
+        """
+        Stores values in the cache.
+
+        Parameters:
+        -----------
+        values: Dict[str, Any]
+            The values to store, by key
+        """
+        if len(values) == 0:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table_name} "
+                f"(key, {self.value_column}, accessed_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in values.items()],
+            )
+            self._connection.commit()
+
+    def evict(self):
+        """
+        Removes the entries that are older than the maximum age, and the least
+        recently used entries when the cache holds more than the maximum number
+        of entries.
+        """
+        expiry_time = time.time() - self.max_age.total_seconds()
+
+        with self._lock:
+            self._connection.execute(
+                f"DELETE FROM {self.table_name} WHERE accessed_at < ?", (expiry_time,)
+            )
+            self._connection.execute(
+                f"DELETE FROM {self.table_name} WHERE key IN (SELECT key FROM "
+                f"{self.table_name} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                f"SELECT COUNT(*) FROM {self.table_name}"
+            ).fetchone()
+
+        return count
+
+
+class VerdictCache(KeyValueCache):
+    """
+    Stores the scores produced by the LLM used to collect metrics on disk, so
+    repeated runs don't have to call the LLM again for responses that were already
+    scored.
+    """
+
+    table_name = "verdicts"
+    value_column = "score"
+    value_type = "REAL"
+
+    @staticmethod
+    def from_directory(project_directory: str) -> "VerdictCache":
+        """
+        Opens the verdict cache for a project directory. The cache is stored in
+        the .linguametrica/cache directory of the project.
+
+        Parameters:
+        -----------
+        project_directory: str
+            The directory containing the project
+
+        Returns:
+        --------
+        VerdictCache
+            The verdict cache for the project
+        """
+        cache_path = (
+            Path(project_directory) / ".linguametrica" / "cache" / "verdicts.db"
+        )
+        return VerdictCache(cache_path)
+
+
+class ResultStore(KeyValueCache):
+    """
+    Stores the results of test cases on disk, so incremental runs only have to
+    execute the test cases that changed since the previous run. Results are stored
+    as JSON.
+    """
+
+    table_name = "results"
+    value_column = "result"
+    value_type = "TEXT"
+
+    @staticmethod
+    def from_directory(project_directory: str) -> "ResultStore":
+        """
+        Opens the result store for a project directory. The store is kept in the
+        .linguametrica/cache directory of the project.
+
+        Parameters:
+        -----------
+        project_directory: str
+            The directory containing the project
+
+        Returns:
+        --------
+        ResultStore
+            The result store for the project
+        """
+        store_path = Path(project_directory) / ".linguametrica" / "cache" / "results.db"
+        return ResultStore(store_path)
+
+
+class DatasetCache:
+    """
+    Stores parsed test cases on disk, so test case files that didn't change since
+    the previous run don't have to be parsed and validated again.
+
+    Test cases are stored as JSON in a SQLite database, keyed by the path of the
+    test case file. An entry is only used when the modification time and size of
+    the file match the values recorded when the entry was stored.
+
+    Attributes:
+    -----------
+    path: Path
+        The path to the cache database
+    """
+
+    path: Path
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = _connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS test_cases ("
+            "path TEXT PRIMARY KEY, mtime INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "data BLOB NOT NULL)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def from_directory(project_directory: str) -> "DatasetCache":
+        """
+        Opens the dataset cache for a project directory. The cache is stored in
+        the .linguametrica/cache directory of the project.
+
+        Parameters:
+        -----------
+        project_directory: str
+            The directory containing the project
+
+        Returns:
+        --------
+        DatasetCache
+            The dataset cache for the project
+        """
+        cache_path = Path(project_directory) / ".linguametrica" / "cache" / "dataset.db"
+        return DatasetCache(cache_path)
+
+    def get_many(self, files: List[Tuple[str, int, int]]) -> Dict[str, bytes]:
+        """
+        Looks up the parsed test cases for the given files.
+
+        Parameters:
+        -----------
+        files: List[Tuple[str, int, int]]
+            The path, modification time in nanoseconds and size of each file
+
+        Returns:
+        --------
+        Dict[str, bytes]
+            The parsed test cases as JSON, for the files that are in the cache and
+            didn't change since they were stored
+        """
+        entries = {}
+
+        with self._lock:
+            for offset in range(0, len(files), 500):
+                chunk = files[offset : offset + 500]
+                placeholders = ",".join("?" for _ in chunk)
+
+                rows = self._connection.execute(
+                    "SELECT path, mtime, size, data FROM test_cases "
+                    f"WHERE path IN ({placeholders})",
+                    [path for path, _, _ in chunk],
+                ).fetchall()
+
+                entries.update({row[0]: row for row in rows})
+
+        return {
+            path: entries[path][3]
+            for path, mtime, size in files
+            if path in entries and entries[path][1:3] == (mtime, size)
+        }
+
+    def put_many(self, entries: List[Tuple[str, int, int, bytes]]):
+        """
+        Stores parsed test cases in the cache.
+
+        Parameters:
+        -----------
+        entries: List[Tuple[str, int, int, bytes]]
+            The path, modification time in nanoseconds, size and parsed test case
+            as JSON for each file
+        """
+        if len(entries) == 0:
+            return
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO test_cases (path, mtime, size, data) "
+                "VALUES (?, ?, ?, ?)",
+                entries,
+            )
+            self._connection.commit()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(
+        str(path), timeout=BUSY_TIMEOUT, check_same_thread=False
+    )
+
+    # In WAL mode, readers don't block the writer and the writer doesn't block
+    # readers, so worker processes only wait for each other's writes.
+    connection.execute("PRAGMA journal_mode=WAL")
+
+    return connection
@@ -0,0 +1,188 @@
+"""The checkpoint log used to resume a session that was interrupted."""
+
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from linguametrica.testcase import TestResult
+
+# The number of results that are kept in memory before they're written to the
+# checkpoint log. At most this many results are lost when the process is killed.
+CHECKPOINT_FLUSH_SIZE = 100
+
+
+class CheckpointLog:
+    """
+    An append-only log of the results of a session, stored as JSON lines. The
+    first line describes the session, every other line is the result of a test
+    case. Results are written in batches, and every batch is synced to disk, so
+    the log survives a crash of the process or the machine.
+
+    When a session is resumed, the successful results in the log are reused and
+    only the remaining test cases are executed. A line that was only partially
+    written when the process died is removed before new results are appended.
+
+    Attributes:
+    -----------
+    path: Path
+        The path to the checkpoint log
+    flush_size: int
+        The number of results that are written to the log at once
+    """
+
+    path: Path
+    flush_size: int
+
+    def __init__(self, path: Path, flush_size: int = CHECKPOINT_FLUSH_SIZE):
+        if flush_size < 1:
+            raise ValueError("The flush size must be at least 1")
+
+        self.path = path
+        self.flush_size = flush_size
+
+        self._file: Optional[IO[str]] = None
+        self._buffer: List[str] = []
+
+    @staticmethod
+    def from_directory(
+        project_directory: str, shard: Optional[Tuple[int, int]] = None
+    ) -> "CheckpointLog":
+        """
+        Opens the checkpoint log for a project directory. The log is kept in the
+        .linguametrica directory of the project. Every shard has its own log.
+
+        Parameters:
+        -----------
+        project_directory: str
+            The directory containing the project
+        shard: Optional[Tuple[int, int]]
+            The index and the number of shards, if the session runs a shard
+
+        Returns:
+        --------
+        CheckpointLog
+            The checkpoint log for the project
+        """
+        file_name = "checkpoint.jsonl"
+
+        if shard is not None:
+            file_name = f"checkpoint-{shard[0]}-of-{shard[1]}.jsonl"
+
+        return CheckpointLog(Path(project_directory) / ".linguametrica" / file_name)
+
+    def start(self, header: Dict[str, Any]):
+        """
+        Starts a new checkpoint log, replacing the results of an earlier session.
+
+        Parameters:
+        -----------
+        header: Dict[str, Any]
+            The settings that identify the session
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._file = open(self.path, "w")
+        self._buffer = [json.dumps({"type": "session", **header})]
+        self.flush()
+
+    def resume(self, header: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Continues the checkpoint log of an earlier session with the same settings.
+        A new log is started when there's no log to continue.
+
+        Parameters:
+        -----------
+        header: Dict[str, Any]
+            The settings that identify the session
+
+        Returns:
+        --------
+        Dict[str, str]
+            The results of the test cases that succeeded in the earlier session as
+            JSON, by the ID of the test case
+
+        Raises:
+        -------
+        ValueError
+            If the log was written by a session with different settings
+        """
+        if not self.path.exists():
+            self.start(header)
+            return {}
+
+        results = {}
+        valid_length = 0
+
+        with open(self.path, "rb") as f:
+            for line in f:
+                # The last line is incomplete when the process died while it was
+                # written. It's dropped, along with anything after it.
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    break
+
+                if not line.endswith(b"\n"):
+                    break
+
+                if valid_length == 0:
+                    if data != {"type": "session", **header}:
+                        raise ValueError(
+                            f"The checkpoint log {self.path} was written by a "
+                            "session with different settings"
+                        )
+                elif data.get("error") is None:
+                    results[data["id"]] = line.decode("utf-8")
+                else:
+                    # Failed test cases are executed again, so an earlier success
+                    # of the same test case is no longer the latest result.
+                    results.pop(data["id"], None)
+
+                valid_length += len(line)
+
+        if valid_length == 0:
+            self.start(header)
+            return {}
+
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_length)
+
+        self._file = open(self.path, "a")
+
+        return results
+
+    def append(self, result: TestResult):
+        """
+        Adds the result of a test case to the log. The result is written when the
+        buffer is full, or when the log is flushed.
+
+        Parameters:
+        -----------
+        result: TestResult
+            The result to add
+        """
+        self._buffer.append(json.dumps({"type": "result", **result.model_dump()}))
+
+        if len(self._buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered results to the log and syncs them to disk."""
+        if self._file is None or len(self._buffer) == 0:
+            return
+
+        self._file.write("".join(f"{line}\n" for line in self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._buffer = []
+
+    def close(self):
+        """Writes the buffered results and closes the log."""
+        if self._file is None:
+            return
+
+        self.flush()
+        self._file.close()
+        self._file = None
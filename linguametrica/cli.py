@@ -1,12 +1,11 @@
 """The CLI interface for the LinguaMetrica application."""
 
-from typing import Annotated, Optional
+from typing import Annotated, List, Optional, Tuple
 
 import typer
 
-from linguametrica.config import OutputConfig
-from linguametrica.reporter import get_reporter
-from linguametrica.session import Session
+# The modules that run the session are imported by the commands, because they load
+# LangChain. This keeps the CLI fast for commands like --help.
 
 app = typer.Typer(help="Langchain application evaluation")
 
@@ -26,19 +25,275 @@ def analyze_performance(
             help="The format for the output file.",
         ),
     ] = "terminal",  # noqa
+    concurrency: Annotated[
+        int,
+        typer.Option(
+            help="The maximum number of calls to the pipeline or LLM at the same time.",
+            min=1,
+        ),
+    ] = 1,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            help="The number of test cases that are scored together.",
+            min=1,
+        ),
+    ] = 32,
+    cache: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help="Reuse parsed test cases and verdicts from previous runs.",
+        ),
+    ] = True,
+    record: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Record the responses of the pipeline to this file.",
+        ),
+    ] = None,
+    replay: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Replay the responses recorded in this file instead of invoking "
+            "the pipeline.",
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="The number of worker processes to run the test cases on.",
+            min=1,
+        ),
+    ] = 1,
+    shard: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Run only one shard of the test cases, formatted as INDEX/COUNT.",
+        ),
+    ] = None,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="Only run test cases that changed since the previous run.",
+        ),
+    ] = False,
+    pipeline_version: Annotated[
+        Optional[str],
+        typer.Option(
+            help="The version of the pipeline, results of other versions are "
+            "not reused in incremental runs.",
+        ),
+    ] = None,
+    combine_critiques: Annotated[
+        bool,
+        typer.Option(
+            help="Collect all aspect critique metrics with a single LLM call.",
+        ),
+    ] = False,
+    bootstrap_resamples: Annotated[
+        int,
+        typer.Option(
+            help="The number of bootstrap resamples for the confidence interval of "
+            "the mean, 0 to skip it. The bootstrap keeps every score in memory.",
+            min=0,
+        ),
+    ] = 0,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            help="Resume an interrupted run, skipping the test cases that already "
+            "succeeded.",
+        ),
+    ] = False,
+    checkpoint: Annotated[
+        bool,
+        typer.Option(
+            help="Write the results to .linguametrica/checkpoint.jsonl while the run "
+            "is going, so it can be resumed with --resume.",
+        ),
+    ] = False,
+    tolerance: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Stop once the 95% confidence interval of the mean of every metric "
+            "is within plus or minus this value. Test cases run in a random order.",
+        ),
+    ] = None,
+    time_budget: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Stop starting test cases after this many seconds. Test cases run "
+            "in a random order.",
+        ),
+    ] = None,
+    cost_budget: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Stop starting test cases once the estimated cost reaches this "
+            "value. Test cases run in a random order.",
+        ),
+    ] = None,
+    sample: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Run only this many test cases, chosen from every subdirectory of "
+            "the data in proportion to its size.",
+            min=1,
+        ),
+    ] = None,
+    sample_fraction: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Run only this fraction of the test cases, chosen from every "
+            "subdirectory of the data in proportion to its size. Can't be combined "
+            "with --sample.",
+            max=1.0,
+        ),
+    ] = None,
+    seed: Annotated[
+        int,
+        typer.Option(
+            help="The seed for choosing a sample of the test cases and for their "
+            "order when stopping early.",
+        ),
+    ] = 0,
+    deduplicate: Annotated[
+        bool,
+        typer.Option(
+            help="Run test cases with the same input, history and context only once.",
+        ),
+    ] = False,
 ):
     """
     Analyze the performance of a langchain application.
     """
+    _check_sample(sample, sample_fraction)
+
+    from linguametrica.config import OutputConfig
+    from linguametrica.reporter import get_reporter
+    from linguametrica.sequential import SequentialSampling
+    from linguametrica.session import Session
+
     output_config = OutputConfig(output_path=report_file, output_format=report_format)
 
     reporter = get_reporter(output_config)
-    session = Session.from_directory(path)
-    outcome = session.run()
+
+    # Any of the stopping conditions turns on sequential sampling.
+    sampling = None
+
+    if tolerance is not None or time_budget is not None or cost_budget is not None:
+        sampling = SequentialSampling(
+            tolerance=tolerance,
+            max_duration=time_budget,
+            max_cost=cost_budget,
+            seed=seed,
+        )
+
+    session = Session.from_directory(
+        path,
+        concurrency=concurrency,
+        batch_size=batch_size,
+        use_cache=cache,
+        record_path=record,
+        replay_path=replay,
+        combine_critiques=combine_critiques,
+        workers=workers,
+        shard=_parse_shard(shard),
+        incremental=incremental,
+        pipeline_version=pipeline_version,
+        bootstrap_resamples=bootstrap_resamples,
+        resume=resume,
+        checkpoint=checkpoint,
+        sampling=sampling,
+        deduplicate=deduplicate,
+        sample_size=sample,
+        sample_fraction=sample_fraction,
+        seed=seed,
+    )
+
+    # The reporter is closed when the session fails as well, so the results that
+    # were reported up to then can still be read.
+    try:
+        outcome = session.run(
+            on_result=reporter.report_result, on_event=reporter.report_event
+        )
+
+        reporter.generate_report(outcome)
+    finally:
+        reporter.close()
+
+
+@app.command()
+def merge_results(
+    files: Annotated[
+        List[str],
+        typer.Argument(help="The result files written with --report-format jsonl"),
+    ],
+    report_file: Annotated[
+        Optional[str],
+        typer.Option(
+            help="The output path for the merged results",
+        ),
+    ] = None,
+    report_format: Annotated[
+        str,
+        typer.Option(
+            help="The format for the output file.",
+        ),
+    ] = "terminal",  # noqa
+    bootstrap_resamples: Annotated[
+        int,
+        typer.Option(
+            help="The number of bootstrap resamples for the confidence interval of "
+            "the mean, 0 to skip it. The bootstrap keeps every score in memory.",
+            min=0,
+        ),
+    ] = 0,
+):
+    """
+    Merge the results of multiple shards into a single report.
+    """
+    from linguametrica.config import OutputConfig
+    from linguametrica.reporter import get_reporter, merge_result_files
+
+    output_config = OutputConfig(output_path=report_file, output_format=report_format)
+
+    reporter = get_reporter(output_config)
+    outcome = merge_result_files(files, bootstrap_resamples)
 
     reporter.generate_report(outcome)
 
 
+def _parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    if value is None:
+        return None
+
+    try:
+        shard_index, shard_count = [int(part) for part in value.split("/")]
+    except ValueError:
+        raise typer.BadParameter("The shard must be formatted as INDEX/COUNT")
+
+    if not 1 <= shard_index <= shard_count:
+        raise typer.BadParameter("The shard index must be between 1 and COUNT")
+
+    return shard_index, shard_count
+
+
+def _check_sample(sample: Optional[int], sample_fraction: Optional[float]):
+    if sample is not None and sample_fraction is not None:
+        raise typer.BadParameter(
+            "--sample and --sample-fraction can't be combined",
+            param_hint="--sample-fraction",
+        )
+
+    if sample_fraction is not None and not 0 < sample_fraction <= 1:
+        raise typer.BadParameter(
+            "The sample fraction must be greater than 0 and at most 1",
+            param_hint="--sample-fraction",
+        )
+
+
 def main():
     """Runs the application"""
     app()
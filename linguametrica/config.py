@@ -3,7 +3,7 @@
 import re
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, model_validator
 from pydantic_yaml import parse_yaml_raw_as
@@ -14,6 +14,8 @@ class TestProviderKind(Enum):
 
     Azure = "Azure"
     OpenAI = "OpenAI"
+    OpenAICompatible = "OpenAICompatible"
+    Fake = "Fake"
 
 
 class ApplicationKind(Enum):
@@ -44,7 +46,7 @@ class OutputConfig(BaseModel):
 
     @model_validator(mode="after")
     def check_output_config(self) -> "OutputConfig":
-        if self.output_format == "json":
+        if self.output_format in ["json", "jsonl", "parquet", "arrow"]:
             if self.output_path is None or self.output_path.strip() == "":
                 raise ValueError("Output path is required")
 
@@ -59,6 +61,128 @@ class OutputConfig(BaseModel):
         return self
 
 
+class RateLimitConfig(BaseModel):
+    """
+    The rate limit configuration defines the budget for the requests sent to the
+    provider of the LLM used to collect metrics. The budget is shared by all
+    metrics in the session.
+
+    Attributes:
+    -----------
+    requests_per_minute: Optional[int]
+        The maximum number of requests per minute.
+    tokens_per_minute: Optional[int]
+        The maximum number of tokens per minute.
+    """
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_rate_limit_config(self) -> "RateLimitConfig":
+        for value in [self.requests_per_minute, self.tokens_per_minute]:
+            if value is not None and value <= 0:
+                raise ValueError("Rate limits must be greater than zero")
+
+        return self
+
+
+class ResilienceConfig(BaseModel):
+    """
+    The resilience configuration defines how calls to the LLM used to collect
+    metrics are timed out and retried, and when calls to a failing provider are
+    stopped.
+
+    Attributes:
+    -----------
+    timeout: float
+        The maximum number of seconds a single call may take.
+    max_retries: int
+        The number of times a call is retried after a transient error.
+    failure_threshold: int
+        The number of consecutive failed calls after which calls fail immediately.
+    reset_timeout: float
+        The number of seconds to wait before calls are tried again.
+    """
+
+    timeout: float = 60.0
+    max_retries: int = 2
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @model_validator(mode="after")
+    def check_resilience_config(self) -> "ResilienceConfig":
+        if self.timeout <= 0 or self.reset_timeout <= 0:
+            raise ValueError("Timeouts must be greater than zero")
+
+        if self.max_retries < 0:
+            raise ValueError("The number of retries can't be negative")
+
+        if self.failure_threshold < 1:
+            raise ValueError("The failure threshold must be at least 1")
+
+        return self
+
+
+class HttpClientConfig(BaseModel):
+    """
+    The HTTP client configuration defines the connection pool that is shared by
+    all metrics for the calls to the provider of the LLM used to collect metrics.
+
+    Attributes:
+    -----------
+    max_connections: int
+        The maximum number of open connections.
+    max_keepalive_connections: int
+        The maximum number of idle connections kept open for later calls.
+    keepalive_expiry: float
+        The number of seconds an idle connection is kept open.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+
+    @model_validator(mode="after")
+    def check_http_client_config(self) -> "HttpClientConfig":
+        if self.max_connections < 1:
+            raise ValueError("The maximum number of connections must be at least 1")
+
+        if self.max_keepalive_connections < 0 or self.keepalive_expiry < 0:
+            raise ValueError("The keep-alive settings can't be negative")
+
+        if self.max_keepalive_connections > self.max_connections:
+            raise ValueError(
+                "The number of keep-alive connections can't exceed the maximum "
+                "number of connections"
+            )
+
+        return self
+
+
+class ModelPrice(BaseModel):
+    """
+    The price of the tokens of a model, used to estimate the cost of a session.
+
+    Attributes:
+    -----------
+    prompt: float
+        The price per million tokens in the prompt.
+    completion: float
+        The price per million tokens generated by the model.
+    """
+
+    prompt: float
+    completion: float
+
+    @model_validator(mode="after")
+    def check_model_price(self) -> "ModelPrice":
+        if self.prompt < 0 or self.completion < 0:
+            raise ValueError("Prices can't be negative")
+
+        return self
+
+
 class ProjectConfig(BaseModel):
     """
     The .linguametrica.yml is a YAML file that contains the configuration for a
@@ -79,12 +203,24 @@ class ProjectConfig(BaseModel):
         The metrics to be used.
     provider: TestProviderKind
         The provider for the LLM used to test the langchain application
+    rate_limit: Optional[RateLimitConfig]
+        The rate limit for the provider of the LLM used to collect metrics
+    resilience: Optional[ResilienceConfig]
+        The timeouts and retries for the LLM used to collect metrics
+    http_client: Optional[HttpClientConfig]
+        The connection pool for the calls to the LLM used to collect metrics
+    prices: Optional[Dict[str, ModelPrice]]
+        The price per million tokens per model, used to estimate the cost
     """
 
     kind: ApplicationKind
     module: str
     metrics: List[str]
     provider: Optional[TestProviderKind] = TestProviderKind.OpenAI
+    rate_limit: Optional[RateLimitConfig] = None
+    resilience: Optional[ResilienceConfig] = None
+    http_client: Optional[HttpClientConfig] = None
+    prices: Optional[Dict[str, ModelPrice]] = None
 
     @model_validator(mode="after")
     def check_project_config(self) -> "ProjectConfig":
@@ -0,0 +1,90 @@
+"""The HTTP client shared by the LLMs used to collect metrics."""
+
+import threading
+from typing import TYPE_CHECKING, Optional
+
+# The HTTP client is only imported when an LLM of a provider is created, so the
+# CLI starts without loading it.
+if TYPE_CHECKING:
+    import httpx
+
+# The maximum number of open connections to the provider. The default is large
+# enough for the concurrency of most sessions, calls beyond it wait for a
+# connection to become available.
+DEFAULT_MAX_CONNECTIONS = 100
+
+# The maximum number of idle connections that are kept open for later calls.
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+# The number of seconds an idle connection is kept open.
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+
+
+_http_client: Optional["httpx.Client"] = None
+_http_client_limits: Optional["httpx.Limits"] = None
+_http_client_lock = threading.Lock()
+
+
+def configure_http_client(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+):
+    """
+    Configures the connection pool of the shared HTTP client. The client is only
+    replaced when the settings change. The previous client isn't closed, because
+    LLMs created earlier may still use it.
+
+    Parameters:
+    -----------
+    max_connections: int
+        The maximum number of open connections
+    max_keepalive_connections: int
+        The maximum number of idle connections kept open for later calls
+    keepalive_expiry: float
+        The number of seconds an idle connection is kept open
+    """
+    global _http_client, _http_client_limits
+
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+    with _http_client_lock:
+        if _http_client is not None and _http_client_limits == limits:
+            return
+
+        _http_client = httpx.Client(limits=limits)
+        _http_client_limits = limits
+
+
+def get_http_client() -> "httpx.Client":
+    """
+    Gets the shared HTTP client. All LLMs use the same client, so connections to
+    the provider are kept alive and reused between metrics. A client with the
+    default connection pool is created when the client wasn't configured.
+
+    Returns:
+    --------
+    httpx.Client
+        The shared HTTP client
+    """
+    global _http_client, _http_client_limits
+
+    import httpx
+
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client_limits = httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+            )
+
+            _http_client = httpx.Client(limits=_http_client_limits)
+
+        return _http_client
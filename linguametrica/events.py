@@ -0,0 +1,81 @@
+"""The events a session reports while it's running."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SessionEvent(BaseModel):
+    """
+    The base class for the events of a session. Events are reported while the
+    session is running, so progress can be shown before the summary is ready.
+    """
+
+    pass
+
+
+class SessionStartedEvent(SessionEvent):
+    """
+    Reported when the session starts executing test cases.
+
+    Attributes:
+    -----------
+    test_cases: Optional[int]
+        The number of test cases in the session, or None if it isn't known upfront
+    metrics: List[str]
+        The names of the metrics collected in the session
+    """
+
+    test_cases: Optional[int] = None
+    metrics: List[str] = []
+
+
+class CaseStartedEvent(SessionEvent):
+    """
+    Reported when the pipeline is invoked for a test case. With multiple workers,
+    it's reported when the test case is handed to a worker.
+
+    Attributes:
+    -----------
+    test_case_id: str
+        The ID of the test case
+    """
+
+    test_case_id: str
+
+
+class MetricScoredEvent(SessionEvent):
+    """
+    Reported for every score of a finished test case, before the test case itself
+    is reported as finished.
+
+    Attributes:
+    -----------
+    test_case_id: str
+        The ID of the test case
+    metric: str
+        The name of the metric
+    score: float
+        The score of the test case for the metric
+    """
+
+    test_case_id: str
+    metric: str
+    score: float
+
+
+class CaseFinishedEvent(SessionEvent):
+    """
+    Reported when the result of a test case is available. Test cases with a
+    stored result from a previous run are reported as finished without starting.
+
+    Attributes:
+    -----------
+    test_case_id: str
+        The ID of the test case
+    error: Optional[str]
+        The error of the test case, or None if it succeeded
+    """
+
+    test_case_id: str
+    error: Optional[str] = None
@@ -0,0 +1,98 @@
+"""A deterministic in-process chat model used to benchmark linguametrica itself."""
+
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from linguametrica.ratelimit import estimate_tokens
+
+# The critique prompts end with this marker, so the fake model knows it has to
+# answer with a verdict instead of a regular response.
+VERDICT_MARKER = "output:"
+
+# The criteria in a combined critique prompt are listed as "- name: description".
+CRITERION_PATTERN = re.compile(r"^- ([\w-]+):", re.MULTILINE)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    A chat model that answers without calling a provider. The answer and the time
+    it takes only depend on the prompt and the seed, so runs can be compared.
+
+    Critique prompts are answered with a verdict of 0 or 1, or with a JSON object
+    of verdicts when the prompt lists multiple criteria. Other prompts are answered
+    with a short response. The token usage is estimated from the length of the
+    prompt and the response.
+
+    Attributes:
+    -----------
+    latency: float
+        The average number of seconds a call takes
+    jitter: float
+        The maximum number of seconds a call takes more or less than the average
+    seed: int
+        The seed for the answers and the jitter
+    model_name: str
+        The model name reported in the output of a call
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+    model_name: str = "fake"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        generator = random.Random(digest)
+
+        delay = self.latency + generator.uniform(-self.jitter, self.jitter)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        response = self._respond(prompt, generator)
+
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=response))],
+            llm_output={
+                "model_name": self.model_name,
+                "token_usage": {
+                    "prompt_tokens": estimate_tokens(messages),
+                    "completion_tokens": estimate_tokens(response),
+                },
+            },
+        )
+
+    @staticmethod
+    def _respond(prompt: str, generator: random.Random) -> str:
+        if not prompt.rstrip().endswith(VERDICT_MARKER):
+            return f"This is response {generator.randrange(1_000_000)} to the input."
+
+        # Only the criteria of the question are answered, not the ones in the
+        # example that precedes it.
+        question = prompt[prompt.rfind("criteria:") :]
+        criteria = CRITERION_PATTERN.findall(question)
+
+        if len(criteria) == 0:
+            return str(generator.randint(0, 1))
+
+        return json.dumps({name: generator.randint(0, 1) for name in criteria})
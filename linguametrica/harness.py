@@ -2,30 +2,67 @@
 
 from importlib import import_module
 from operator import itemgetter
-from typing import List, Union
+from typing import List, Optional, Union
 
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import Runnable
 
+from linguametrica.recording import ResponseRecording
 
-class TestHarness:
-    """Hosts the pipeline in a test harness, so we can inject chat history and input."""
-
-    def __init__(self, pipeline: Runnable):
-        context_variables = {
-            "input": itemgetter("input"),
-            "history": itemgetter("history"),
-        }
-
-        self._pipeline = context_variables | pipeline
-
-        # Make sure we have a string output parser at the end of the pipeline.
-        # We need this for the generate_response method to work correctly.
-        if not isinstance(self._pipeline, StrOutputParser):
-            self._pipeline = self._pipeline | StrOutputParser()
 
-    def invoke(self, prompt: str, history: List[Union[HumanMessage, AIMessage]]) -> str:
+class TestHarness:
+    """
+    Hosts the pipeline in a test harness, so we can inject chat history and input.
+
+    The harness can record the responses of the pipeline, or replay the responses
+    from an earlier recording instead of invoking the pipeline.
+
+    Attributes:
+    -----------
+    recording: Optional[ResponseRecording]
+        The recording to store responses in, or to replay responses from
+    replay: bool
+        Whether to replay the responses from the recording
+    """
+
+    recording: Optional[ResponseRecording]
+    replay: bool
+
+    def __init__(
+        self,
+        pipeline: Optional[Runnable],
+        recording: Optional[ResponseRecording] = None,
+        replay: bool = False,
+    ):
+        if replay and recording is None:
+            raise ValueError("A recording is required to replay responses")
+
+        self.recording = recording
+        self.replay = replay
+        self._pipeline = None
+
+        if pipeline is not None:
+            context_variables = {
+                "input": itemgetter("input"),
+                "history": itemgetter("history"),
+            }
+
+            self._pipeline = context_variables | pipeline
+
+            # Make sure we have a string output parser at the end of the pipeline.
+            # We need this for the generate_response method to work correctly.
+            if not isinstance(self._pipeline, StrOutputParser):
+                self._pipeline = self._pipeline | StrOutputParser()
+
+    def invoke(
+        self,
+        prompt: str,
+        history: List[Union[HumanMessage, AIMessage]],
+        test_case_id: Optional[str] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> str:
         """
         Generates a response from the pipeline, given an input.
 
@@ -35,17 +72,80 @@ class TestHarness:
             The input to the pipeline
         history: List[BaseMessage]
             The history of the conversation
+        test_case_id: Optional[str]
+            The ID of the test case, used to record or replay the response
+        callbacks: Optional[List[BaseCallbackHandler]]
+            The callback handlers to pass to the pipeline, like a handler that
+            collects the token usage
 
         Returns:
         --------
         str
             The response from the pipeline
+
+        Raises:
+        -------
+        KeyError
+            If the harness replays responses and no response was recorded for the
+            test case.
         """
 
-        return self._pipeline.invoke({"input": prompt, "history": history})
+        if self.replay:
+            return self._replay(prompt, history, test_case_id)
+
+        if self._pipeline is None:
+            raise ValueError("The test harness has no pipeline to invoke")
+
+        response = self._pipeline.invoke(
+            {"input": prompt, "history": history}, config={"callbacks": callbacks}
+        )
+
+        if self.recording is not None and test_case_id is not None:
+            input_hash = ResponseRecording.create_input_hash(prompt, history)
+            self.recording.add(test_case_id, input_hash, response)
+
+        return response
+
+    def save_recording(self):
+        """Writes the buffered responses to disk, if the harness records them."""
+        if self.recording is not None and not self.replay:
+            self.recording.save()
+
+    def _replay(
+        self,
+        prompt: str,
+        history: List[Union[HumanMessage, AIMessage]],
+        test_case_id: Optional[str],
+    ) -> str:
+        input_hash = ResponseRecording.create_input_hash(prompt, history)
+        response = self.recording.get(test_case_id, input_hash)
+
+        if response is None:
+            raise KeyError(f"No recorded response for test case {test_case_id}")
+
+        return response
 
     @staticmethod
-    def create_from_path(pipeline_path: str) -> "TestHarness":
+    def create_from_recording(recording: ResponseRecording) -> "TestHarness":
+        """
+        Creates a new test harness that replays the responses from a recording.
+
+        Parameters:
+        -----------
+        recording: ResponseRecording
+            The recording to replay
+
+        Returns:
+        --------
+        TestHarness
+            The test harness
+        """
+        return TestHarness(None, recording=recording, replay=True)
+
+    @staticmethod
+    def create_from_path(
+        pipeline_path: str, recording: Optional[ResponseRecording] = None
+    ) -> "TestHarness":
         """
         Creates a new test harness based on the pipeline path.
 
@@ -56,7 +156,8 @@ class TestHarness:
         -----------
         pipeline_path: str
             The path to the pipeline
-
+        recording: Optional[ResponseRecording]
+            The recording to store the responses of the pipeline in
 
         Returns:
         --------
@@ -69,4 +170,4 @@ class TestHarness:
         module_instance = import_module(module_name)
         pipeline_instance = getattr(module_instance, variable_name)
 
-        return TestHarness(pipeline_instance)
+        return TestHarness(pipeline_instance, recording=recording)
@@ -2,10 +2,17 @@
 
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Type, Union
 
-from dotenv import load_dotenv
-from langchain_core.runnables import Runnable
-from langchain_openai.chat_models import AzureChatOpenAI, ChatOpenAI
+from linguametrica.connections import get_http_client
+from linguametrica.ratelimit import RateLimitedRunnable, get_rate_limiter
+from linguametrica.resilience import ResilientRunnable, RetryPolicy, get_retry_policy
+
+# The provider SDKs take long to import, so they're imported when an LLM of the
+# provider is created instead of when the CLI starts.
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+    from openai import AzureOpenAI, OpenAI
 
 
 def read_template(name: str) -> str:
@@ -28,29 +35,123 @@ def read_template(name: str) -> str:
         return f.read()
 
 
-def create_llm(provider: str) -> Runnable:
+def create_llm(provider: str) -> "Runnable":
     """
-    Creates the LLM model to use for testing the langchain pipeline.
+    Creates the LLM model to use for testing the langchain pipeline. Every call
+    to the LLM goes through the rate limiter and the retry policy of the provider,
+    which are shared by all LLMs created for the same provider. The LLMs share a
+    single HTTP client, so connections are reused between metrics.
 
     Parameters:
     -----------
-    config: ProjectConfig
-        The configuration for the project
+    provider: str
+        The provider of the LLM
 
     Returns:
     --------
     Runnable
         The LLM model to use for testing the langchain pipeline
+
+    Raises:
+    -------
+    ValueError
+        If the provider is unknown, or the base URL of an OpenAI compatible
+        provider isn't configured.
     """
+    from dotenv import load_dotenv
+
     load_dotenv()
 
+    retry_policy = get_retry_policy(provider)
+
+    # Requests are retried by the wrappers, so the rate limiter learns about every
+    # throttled request and the circuit breaker about every failed request.
     if provider == "OpenAI":
-        return ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
+        from langchain_openai.chat_models import ChatOpenAI
+        from openai import OpenAI
+
+        api_key = os.getenv("OPENAI_API_KEY", "")
+
+        llm = ChatOpenAI(
+            client=_create_client(OpenAI, retry_policy, api_key=api_key),
+            api_key=api_key,
+            max_retries=0,
+            timeout=retry_policy.timeout,
+        )
     elif provider == "Azure":
-        return AzureChatOpenAI(
-            azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT", ""),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", ""),
+        from langchain_openai.chat_models import AzureChatOpenAI
+        from openai import AzureOpenAI
+
+        client_params = {
+            "azure_deployment": os.getenv("AZURE_OPENAI_DEPLOYMENT", ""),
+            "api_key": os.getenv("AZURE_OPENAI_API_KEY", ""),
+            "api_version": os.getenv("AZURE_OPENAI_API_VERSION", ""),
+        }
+
+        llm = AzureChatOpenAI(
+            **client_params, max_retries=0, timeout=retry_policy.timeout
+        )
+
+        # The Azure model always creates its own client, so the client that uses
+        # the shared HTTP client replaces it afterwards.
+        llm.client = _create_client(AzureOpenAI, retry_policy, **client_params)
+    elif provider == "OpenAICompatible":
+        from langchain_openai.chat_models import ChatOpenAI
+        from openai import OpenAI
+
+        base_url = os.getenv("OPENAI_COMPATIBLE_BASE_URL", "")
+
+        if base_url == "":
+            raise ValueError(
+                "The OPENAI_COMPATIBLE_BASE_URL environment variable is required "
+                "for the OpenAICompatible provider"
+            )
+
+        # Self-hosted servers often don't check the API key, but the OpenAI client
+        # doesn't accept an empty one.
+        api_key = os.getenv("OPENAI_COMPATIBLE_API_KEY", "not-needed")
+
+        llm = ChatOpenAI(
+            client=_create_client(
+                OpenAI, retry_policy, api_key=api_key, base_url=base_url
+            ),
+            api_key=api_key,
+            base_url=base_url,
+            model=os.getenv("OPENAI_COMPATIBLE_MODEL", "gpt-3.5-turbo"),
+            max_retries=0,
+            timeout=retry_policy.timeout,
+        )
+    elif provider == "Fake":
+        from linguametrica.fake_llm import FakeChatModel
+
+        # The fake provider answers in-process. It's used to measure the overhead
+        # of linguametrica itself.
+        llm = FakeChatModel(
+            latency=float(os.getenv("LINGUAMETRICA_FAKE_LATENCY", "0")),
+            jitter=float(os.getenv("LINGUAMETRICA_FAKE_JITTER", "0")),
         )
     else:
         raise ValueError(f"Unknown provider: {provider}")
+
+    return ResilientRunnable(
+        RateLimitedRunnable(llm, get_rate_limiter(provider)), retry_policy
+    )
+
+
+def _create_client(
+    client_class: Type[Union["OpenAI", "AzureOpenAI"]],
+    retry_policy: RetryPolicy,
+    **client_params: Any,
+) -> Any:
+    # The chat models pass their HTTP client to both a synchronous and an
+    # asynchronous OpenAI client, which don't accept the same kind of HTTP client.
+    # Only the synchronous client is used, so it's created with the shared HTTP
+    # client here.
+    client = client_class(
+        **client_params,
+        max_retries=0,
+        timeout=retry_policy.timeout,
+        http_client=get_http_client(),
+    )
+
+    return client.chat.completions
@@ -2,15 +2,36 @@
 
 from abc import ABC, abstractmethod
 from operator import itemgetter
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Union
 
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 
+from linguametrica.cache import VerdictCache
 from linguametrica.llm import create_llm, read_template
 
 
+class MetricInput(BaseModel):
+    """
+    Contains the data needed to collect a metric for a single generated response.
+
+    Attributes:
+    -----------
+    prompt: str
+        The prompt that was used to generate the response
+    output: str
+        The response that was generated
+    context: Optional[str]
+        The context that was used to generate the output
+    """
+
+    prompt: str
+    output: str
+    context: Optional[str] = None
+
+
 class Metric(ABC):
     """
     A metric can be collected as part of a test case. It's a way to measure the
@@ -18,7 +39,7 @@ class Metric(ABC):
     """
 
     @abstractmethod
-    def init(self, llm_provider: str):
+    def init(self, llm_provider: str, cache: Optional[VerdictCache] = None):
         """
         Initializes the metric with the given project configuration
 
@@ -26,6 +47,8 @@ class Metric(ABC):
         -----------
         llm_provider: str
             The provider for the LLM used to test the langchain application
+        cache: Optional[VerdictCache]
+            The cache to look up verdicts in before calling the LLM
         """
         raise NotImplementedError()
 
@@ -52,6 +75,36 @@ class Metric(ABC):
         """
         raise NotImplementedError()
 
+    def collect_many(
+        self,
+        items: List[MetricInput],
+        max_concurrency: Optional[int] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> List[Optional[float]]:
+        """
+        Collects the value for the metric for a batch of generated responses.
+
+        The default implementation collects the metric for one item at a time.
+        Metrics that can score multiple responses in one go should override this.
+
+        Parameters:
+        -----------
+        items: List[MetricInput]
+            The prompts and generated responses to collect the metric for
+        max_concurrency: Optional[int]
+            The maximum number of concurrent calls to make while collecting
+        callbacks: Optional[List[BaseCallbackHandler]]
+            A callback handler per item to pass to the LLM calls for the item. The
+            default implementation can't pass them to collect, so it ignores them.
+
+        Returns:
+        --------
+        List[Optional[float]]
+            The values of the metric in the same order as the items. A value is None
+            if the metric could not be collected for the item.
+        """
+        return [self.collect(item.prompt, item.output, item.context) for item in items]
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -59,6 +112,169 @@ class Metric(ABC):
         raise NotImplementedError()
 
 
+class CritiqueJudge:
+    """
+    Sends critique prompts to the LLM used to collect metrics and parses the
+    verdicts from the responses.
+
+    Verdicts are stored per aspect in the cache, keyed by the provider, the model
+    and the rendered prompt. Prompts for which all verdicts are cached are not sent
+    to the LLM.
+    """
+
+    def __init__(
+        self,
+        llm_provider: str,
+        template_name: str,
+        cache: Optional[VerdictCache] = None,
+    ):
+        prompt_template = ChatPromptTemplate.from_messages(
+            [
+                ("system", read_template(template_name)),
+            ]
+        )
+
+        context_variables = {
+            "criteria": itemgetter("criteria"),
+            "input": itemgetter("input"),
+            "response": itemgetter("response"),
+        }
+
+        llm = create_llm(llm_provider)
+
+        self._prompt = context_variables | prompt_template
+        self._llm = llm | StrOutputParser()
+        self._cache = cache
+
+        # The verdict depends on the model that produced it, so the provider and
+        # model are part of the cache key.
+        self._llm_key = ":".join(
+            [
+                llm_provider,
+                str(getattr(llm, "model_name", "")),
+                str(getattr(llm, "deployment_name", "")),
+            ]
+        )
+
+    def judge(
+        self,
+        items: List[MetricInput],
+        criteria: str,
+        aspects: List[str],
+        parse_verdicts: Callable[[str], Dict[str, float]],
+        max_concurrency: Optional[int] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> List[Dict[str, Optional[float]]]:
+        """
+        Collects the verdicts for a batch of generated responses.
+
+        Parameters:
+        -----------
+        items: List[MetricInput]
+            The prompts and generated responses to judge
+        criteria: str
+            The criteria to include in the critique prompt
+        aspects: List[str]
+            The aspects that are judged by the critique prompt
+        parse_verdicts: Callable[[str], Dict[str, float]]
+            Parses the response of the LLM into a score per aspect
+        max_concurrency: Optional[int]
+            The maximum number of concurrent calls to the LLM
+        callbacks: Optional[List[BaseCallbackHandler]]
+            A callback handler per item to pass to the LLM call for the item
+
+        Returns:
+        --------
+        List[Dict[str, Optional[float]]]
+            The score per aspect in the same order as the items. A score is None if
+            it could not be collected.
+        """
+        if len(items) == 0:
+            return []
+
+        prompts = self._prompt.batch(
+            [
+                {"input": item.prompt, "response": item.output, "criteria": criteria}
+                for item in items
+            ]
+        )
+
+        keys = [
+            [
+                VerdictCache.create_key(self._llm_key, prompt.to_string(), aspect)
+                for aspect in aspects
+            ]
+            for prompt in prompts
+        ]
+
+        cached_scores = {}
+
+        if self._cache is not None:
+            cached_scores = self._cache.get_many(
+                [key for item_keys in keys for key in item_keys]
+            )
+
+        verdicts = [
+            {aspect: cached_scores.get(key) for aspect, key in zip(aspects, item_keys)}
+            for item_keys in keys
+        ]
+
+        missing = [
+            index
+            for index, item_keys in enumerate(keys)
+            if any(key not in cached_scores for key in item_keys)
+        ]
+
+        if len(missing) == 0:
+            return verdicts
+
+        # Every call gets the callback handler of its own item, so the token usage
+        # can be attributed to the item.
+        responses = self._llm.batch(
+            [prompts[index] for index in missing],
+            config=[
+                {
+                    "max_concurrency": max_concurrency,
+                    "callbacks": [callbacks[index]] if callbacks else None,
+                }
+                for index in missing
+            ],
+            return_exceptions=True,
+        )
+
+        new_scores = {}
+
+        for index, response in zip(missing, responses):
+            verdicts[index] = self._parse_response(response, aspects, parse_verdicts)
+
+            for aspect, key in zip(aspects, keys[index]):
+                if verdicts[index][aspect] is not None:
+                    new_scores[key] = verdicts[index][aspect]
+
+        # Only verdicts that could be parsed are cached, so failed calls are retried
+        # the next time the metric is collected.
+        if self._cache is not None:
+            self._cache.put_many(new_scores)
+
+        return verdicts
+
+    @staticmethod
+    def _parse_response(
+        response: Union[str, Exception],
+        aspects: List[str],
+        parse_verdicts: Callable[[str], Dict[str, float]],
+    ) -> Dict[str, Optional[float]]:
+        scores = {}
+
+        if not isinstance(response, Exception):
+            try:
+                scores = parse_verdicts(response)
+            except Exception:  # noqa
+                scores = {}
+
+        return {aspect: scores.get(aspect) for aspect in aspects}
+
+
 class AspectCritiqueMetric(Metric, ABC):
     """
     A metric that evaluates a specific aspect of the generated response.
@@ -70,9 +286,10 @@ class AspectCritiqueMetric(Metric, ABC):
     """
 
     aspect: str
-    _pipeline: Runnable
+    _judge: CritiqueJudge
+    _criteria: str
 
-    def init(self, llm_provider: str):
+    def init(self, llm_provider: str, cache: Optional[VerdictCache] = None):
         """
         Initializes the metric with the given project configuration
 
@@ -80,23 +297,11 @@ class AspectCritiqueMetric(Metric, ABC):
         -----------
         llm_provider: str
             The provider for the LLM used to test the langchain application
+        cache: Optional[VerdictCache]
+            The cache to look up verdicts in before calling the LLM
         """
-
-        prompt_template = ChatPromptTemplate.from_messages(
-            [
-                ("system", read_template("critique")),
-            ]
-        )
-
-        context_variables = {
-            "criteria": itemgetter("criteria"),
-            "input": itemgetter("input"),
-            "response": itemgetter("response"),
-        }
-
-        llm = create_llm(llm_provider)
-
-        self._pipeline = context_variables | prompt_template | llm | StrOutputParser()
+        self._judge = CritiqueJudge(llm_provider, "critique", cache)
+        self._criteria = read_template(self.aspect)
 
     def collect(
         self, prompt: str, output: str, context: Optional[str]
@@ -119,23 +324,139 @@ class AspectCritiqueMetric(Metric, ABC):
             The value of the metric, or None if the metric could not be collected
         """
         try:
-            response = self._pipeline.invoke(
-                {
-                    "input": prompt,
-                    "response": output,
-                    "criteria": read_template(self.aspect),
-                }
+            [score] = self.collect_many(
+                [MetricInput(prompt=prompt, output=output, context=context)]
             )
         except:  # noqa
             return None
 
-        return float(response)
+        return score
+
+    def collect_many(
+        self,
+        items: List[MetricInput],
+        max_concurrency: Optional[int] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> List[Optional[float]]:
+        """
+        Collects the value for the metric for a batch of generated responses by
+        sending the critique prompts to the LLM as a single batch. Verdicts found
+        in the cache are not sent to the LLM.
+
+        Parameters:
+        -----------
+        items: List[MetricInput]
+            The prompts and generated responses to collect the metric for
+        max_concurrency: Optional[int]
+            The maximum number of concurrent calls to the LLM
+        callbacks: Optional[List[BaseCallbackHandler]]
+            A callback handler per item to pass to the LLM call for the item
+
+        Returns:
+        --------
+        List[Optional[float]]
+            The values of the metric in the same order as the items. A value is None
+            if the metric could not be collected for the item.
+        """
+        verdicts = self._judge.judge(
+            items,
+            self._criteria,
+            [self.aspect],
+            lambda response: {self.aspect: float(response)},
+            max_concurrency,
+            callbacks,
+        )
+
+        return [verdict[self.aspect] for verdict in verdicts]
 
     @property
     def name(self) -> str:
         return self.aspect
 
 
+class AspectCritiqueGroup:
+    """
+    Collects several aspect critique metrics with a single call to the LLM per
+    response. The LLM judges all aspects at once and returns the verdicts as a
+    JSON object, which saves a call and a copy of the prompt per extra aspect.
+
+    Attributes:
+    -----------
+    metrics: List[AspectCritiqueMetric]
+        The metrics that are collected together
+    """
+
+    metrics: List[AspectCritiqueMetric]
+    _judge: CritiqueJudge
+    _criteria: str
+
+    def __init__(self, metrics: List[AspectCritiqueMetric]):
+        self.metrics = metrics
+
+    def init(self, llm_provider: str, cache: Optional[VerdictCache] = None):
+        """
+        Initializes the group with the given project configuration
+
+        Parameters:
+        -----------
+        llm_provider: str
+            The provider for the LLM used to test the langchain application
+        cache: Optional[VerdictCache]
+            The cache to look up verdicts in before calling the LLM
+        """
+        self._judge = CritiqueJudge(llm_provider, "critique_combined", cache)
+
+        self._criteria = "\n".join(
+            f"- {metric.aspect}: {read_template(metric.aspect)}"
+            for metric in self.metrics
+        )
+
+    def collect_many(
+        self,
+        items: List[MetricInput],
+        max_concurrency: Optional[int] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> List[Dict[str, Optional[float]]]:
+        """
+        Collects the values for all metrics in the group for a batch of generated
+        responses.
+
+        Parameters:
+        -----------
+        items: List[MetricInput]
+            The prompts and generated responses to collect the metrics for
+        max_concurrency: Optional[int]
+            The maximum number of concurrent calls to the LLM
+        callbacks: Optional[List[BaseCallbackHandler]]
+            A callback handler per item to pass to the LLM call for the item
+
+        Returns:
+        --------
+        List[Dict[str, Optional[float]]]
+            The value per metric name in the same order as the items. A value is
+            None if the metric could not be collected for the item.
+        """
+        return self._judge.judge(
+            items,
+            self._criteria,
+            self.names,
+            self._parse_verdicts,
+            max_concurrency,
+            callbacks,
+        )
+
+    @property
+    def names(self) -> List[str]:
+        """Gets the names of the metrics in the group"""
+        return [metric.name for metric in self.metrics]
+
+    @staticmethod
+    def _parse_verdicts(response: str) -> Dict[str, float]:
+        verdicts = JsonOutputParser().parse(response)
+
+        return {aspect: float(verdict) for aspect, verdict in verdicts.items()}
+
+
 class HarmfulnessMetric(AspectCritiqueMetric):
     """Calculates how harmful the generated response is."""
 
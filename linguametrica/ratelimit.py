@@ -0,0 +1,432 @@
+"""The rate limiter for the LLM used to collect metrics."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+# The number of tokens we expect the LLM to generate for a verdict. It's added to
+# the estimated number of tokens for a request before the actual usage is known.
+ESTIMATED_COMPLETION_TOKENS = 16
+
+# The time to pause all requests when the provider throttles us without telling us
+# how long to wait.
+DEFAULT_RETRY_AFTER = 1.0
+
+# The number of times a throttled request is sent to the provider before giving up.
+MAX_THROTTLED_ATTEMPTS = 6
+
+
+class TokenBucket:
+    """
+    A token bucket that allows a fixed budget per minute. The bucket holds at most
+    ten seconds worth of budget, so requests are spread over the minute instead of
+    being sent in a single burst.
+
+    Attributes:
+    -----------
+    rate_per_minute: float
+        The budget per minute
+    """
+
+    rate_per_minute: float
+
+    def __init__(self, rate_per_minute: float):
+        if rate_per_minute <= 0:
+            raise ValueError("The rate per minute must be greater than zero")
+
+        self.rate_per_minute = rate_per_minute
+        self._capacity = max(1.0, rate_per_minute / 6)
+        self._available = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float):
+        """
+        Takes an amount from the bucket, waiting until enough budget is available.
+
+        Parameters:
+        -----------
+        amount: float
+            The amount to take from the bucket
+        """
+        # A request larger than the bucket would never fit, so it waits for a full
+        # bucket instead.
+        amount = min(amount, self._capacity)
+
+        while True:
+            with self._lock:
+                self._refill()
+
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+
+                wait_time = (amount - self._available) / (self.rate_per_minute / 60)
+
+            time.sleep(wait_time)
+
+    def adjust(self, amount: float):
+        """
+        Takes an additional amount from the bucket without waiting, or returns an
+        amount to the bucket when the amount is negative. This is used to correct
+        an estimate once the actual usage is known.
+
+        Parameters:
+        -----------
+        amount: float
+            The amount to take from the bucket
+        """
+        with self._lock:
+            self._refill()
+            self._available = min(self._capacity, self._available - amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+
+        self._available = min(
+            self._capacity, self._available + elapsed * self.rate_per_minute / 60
+        )
+        self._updated_at = now
+
+
+class RateLimiter:
+    """
+    Limits the requests sent to a provider. Requests are limited by a budget of
+    requests and tokens per minute, and by a concurrency limit that adapts to the
+    responses of the provider.
+
+    The concurrency limit starts out unbounded. When the provider throttles a
+    request, the limit is halved and all requests are paused for the time the
+    provider asks us to wait. Every successful request raises the limit a little,
+    so the throughput settles just under the quota of the provider.
+
+    Attributes:
+    -----------
+    requests_per_minute: Optional[int]
+        The maximum number of requests per minute
+    tokens_per_minute: Optional[int]
+        The maximum number of tokens per minute
+    concurrency_limit: Optional[float]
+        The current maximum number of requests in flight
+    throttled_requests: int
+        The number of requests that were throttled by the provider
+    """
+
+    requests_per_minute: Optional[int]
+    tokens_per_minute: Optional[int]
+    concurrency_limit: Optional[float]
+    throttled_requests: int
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.concurrency_limit = None
+        self.throttled_requests = 0
+
+        self._request_bucket = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._token_bucket = (
+            TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        )
+
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self, estimated_tokens: int) -> Iterator[None]:
+        """
+        Waits until a request can be sent to the provider, and keeps a slot in the
+        concurrency limit while the request is in flight.
+
+        Parameters:
+        -----------
+        estimated_tokens: int
+            The estimated number of tokens used by the request
+        """
+        with self._condition:
+            while True:
+                pause_time = self._paused_until - time.monotonic()
+
+                if pause_time > 0:
+                    self._condition.wait(pause_time)
+                elif (
+                    self.concurrency_limit is not None
+                    and self._in_flight >= self.concurrency_limit
+                ):
+                    self._condition.wait()
+                else:
+                    break
+
+            self._in_flight += 1
+
+        try:
+            if self._request_bucket is not None:
+                self._request_bucket.acquire(1)
+
+            if self._token_bucket is not None:
+                self._token_bucket.acquire(estimated_tokens)
+
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Corrects the token budget with the actual number of tokens a request used.
+
+        Parameters:
+        -----------
+        estimated_tokens: int
+            The number of tokens the request was estimated to use
+        actual_tokens: int
+            The number of tokens the request actually used
+        """
+        if self._token_bucket is not None:
+            self._token_bucket.adjust(actual_tokens - estimated_tokens)
+
+    def record_success(self):
+        """Raises the concurrency limit after a successful request."""
+        with self._condition:
+            if self.concurrency_limit is not None:
+                self.concurrency_limit += 1 / self.concurrency_limit
+                self._condition.notify_all()
+
+    def record_throttled(self, retry_after: Optional[float] = None):
+        """
+        Lowers the concurrency limit and pauses all requests after the provider
+        throttled a request.
+
+        Parameters:
+        -----------
+        retry_after: Optional[float]
+            The number of seconds the provider asked us to wait
+        """
+        with self._condition:
+            self.throttled_requests += 1
+
+            current_limit = self.concurrency_limit or max(1, self._in_flight)
+            self.concurrency_limit = max(1.0, current_limit / 2)
+
+            pause_time = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+            self._paused_until = max(self._paused_until, time.monotonic() + pause_time)
+
+
+class RateLimitedRunnable(Runnable):
+    """
+    Wraps the LLM used to collect metrics, so every call goes through the rate
+    limiter of the provider.
+
+    The wrapped LLM should not retry requests by itself. Throttled requests are
+    retried here, after the rate limiter has lowered the concurrency limit and
+    waited for the time the provider asked for. Requests that failed because of a
+    transient error are retried by the retry policy of the provider.
+    """
+
+    def __init__(self, llm: Runnable, rate_limiter: RateLimiter):
+        self.llm = llm
+        self.rate_limiter = rate_limiter
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None) -> Any:
+        estimated_tokens = estimate_tokens(input) + ESTIMATED_COMPLETION_TOKENS
+        throttled_attempts = 0
+
+        while True:
+            try:
+                with self.rate_limiter.acquire(estimated_tokens):
+                    response = self.llm.invoke(input, config)
+
+                break
+            except Exception as e:
+                # The rate limiter pauses the next attempt for as long as the
+                # provider asked us to wait.
+                if is_throttled(e):
+                    self.rate_limiter.record_throttled(get_retry_after(e))
+                    throttled_attempts += 1
+
+                    if throttled_attempts < MAX_THROTTLED_ATTEMPTS:
+                        continue
+
+                raise
+
+        self.rate_limiter.record_success()
+
+        token_usage = getattr(response, "response_metadata", {}).get("token_usage")
+
+        if token_usage and "total_tokens" in token_usage:
+            self.rate_limiter.record_usage(
+                estimated_tokens, token_usage["total_tokens"]
+            )
+
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the settings of the wrapped LLM, like the model name. The LLM
+        # isn't set yet while the wrapper is unpickled or copied.
+        if "llm" not in self.__dict__:
+            raise AttributeError(name)
+
+        return getattr(self.__dict__["llm"], name)
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def configure_rate_limiter(
+    provider: str,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+):
+    """
+    Configures the budgets of the rate limiter for a provider. The rate limiter is
+    shared by all LLMs of the provider in this process.
+
+    Parameters:
+    -----------
+    provider: str
+        The provider of the LLM
+    requests_per_minute: Optional[int]
+        The maximum number of requests per minute
+    tokens_per_minute: Optional[int]
+        The maximum number of tokens per minute
+    """
+    with _rate_limiters_lock:
+        _rate_limiters[provider] = RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Gets the rate limiter for a provider. A rate limiter without budgets is created
+    when the provider wasn't configured.
+
+    Parameters:
+    -----------
+    provider: str
+        The provider of the LLM
+
+    Returns:
+    --------
+    RateLimiter
+        The rate limiter for the provider
+    """
+    with _rate_limiters_lock:
+        if provider not in _rate_limiters:
+            _rate_limiters[provider] = RateLimiter()
+
+        return _rate_limiters[provider]
+
+
+def is_throttled(error: Exception) -> bool:
+    """
+    Checks whether a request failed because the provider throttled it.
+
+    Parameters:
+    -----------
+    error: Exception
+        The error raised by the LLM
+
+    Returns:
+    --------
+    bool
+        True if the provider throttled the request
+    """
+    return getattr(error, "status_code", None) == 429
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Checks whether a request failed because of a transient error, in which case
+    sending the request again is likely to succeed.
+
+    Parameters:
+    -----------
+    error: Exception
+        The error raised by the LLM
+
+    Returns:
+    --------
+    bool
+        True if the request failed because of a transient error
+    """
+    # The provider SDK is imported here, so the CLI doesn't load it at startup.
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):
+        return True
+
+    status_code = getattr(error, "status_code", None)
+
+    return status_code is not None and (status_code in [408, 409] or status_code >= 500)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Reads the number of seconds to wait from the headers of a throttled response.
+
+    Parameters:
+    -----------
+    error: Exception
+        The error raised by the LLM for the throttled response
+
+    Returns:
+    --------
+    Optional[float]
+        The number of seconds to wait, or None if the provider didn't say
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", {})
+
+    retry_after_ms = headers.get("retry-after-ms")
+
+    if retry_after_ms is not None:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    return None
+
+
+def estimate_tokens(input: Any) -> int:
+    """
+    Estimates the number of tokens in the input for the LLM. We assume about four
+    characters per token, which is close enough for budgeting purposes.
+
+    Parameters:
+    -----------
+    input: Any
+        The input for the LLM, a prompt value, a string or a list of messages
+
+    Returns:
+    --------
+    int
+        The estimated number of tokens
+    """
+    if hasattr(input, "to_string"):
+        text = input.to_string()
+    elif isinstance(input, list):
+        text = "".join(str(getattr(message, "content", message)) for message in input)
+    else:
+        text = str(input)
+
+    return len(text) // 4 + 1
@@ -0,0 +1,185 @@
+"""The recording of pipeline responses used to replay a session."""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+# The number of responses that are kept in memory before they're appended to the
+# recording. At most this many responses are lost when the process is killed.
+RECORDING_FLUSH_SIZE = 100
+
+
+class ResponseRecording:
+    """
+    Stores the responses generated by the pipeline, so a session can be replayed
+    without invoking the pipeline again.
+
+    Responses are keyed by the ID of the test case and a hash of the input and
+    history that were sent to the pipeline. When the input of a test case changes,
+    the recorded response is no longer used. A test case without a response of its
+    own gets the response recorded for another test case with the same input and
+    history, like the duplicates that weren't executed in a deduplicated session.
+    The recording is stored as gzip compressed JSON lines.
+
+    Responses are appended to the recording in batches, each batch as a separate
+    gzip member that is synced to disk. A crash loses at most one batch, and a
+    resumed or incremental run adds its responses to the ones recorded before.
+    When a test case is recorded more than once, the last response is used.
+
+    Attributes:
+    -----------
+    path: Path
+        The path to the recording file
+    flush_size: int
+        The number of responses that are appended to the recording at once
+    """
+
+    path: Path
+    flush_size: int
+
+    def __init__(self, path: Path, flush_size: int = RECORDING_FLUSH_SIZE):
+        self.path = path
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, str], str] = {}
+        self._responses_by_input: Dict[str, str] = {}
+        self._pending: List[str] = []
+
+    @staticmethod
+    def load(path: Path) -> "ResponseRecording":
+        """
+        Loads a recording from disk.
+
+        Parameters:
+        -----------
+        path: Path
+            The path to the recording file
+
+        Returns:
+        --------
+        ResponseRecording
+            The loaded recording
+
+        Raises:
+        -------
+        FileNotFoundError
+            If the recording file could not be found.
+        """
+        if not path.exists():
+            raise FileNotFoundError(f"Could not find the recording {path}")
+
+        recording = ResponseRecording(path)
+
+        # The last batch is incomplete when the process died while it was
+        # appended. The responses before it are still used.
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    input_hash, response = entry["input_hash"], entry["response"]
+                    recording._responses[(entry["id"], input_hash)] = response
+                    recording._responses_by_input[input_hash] = response
+        except (EOFError, gzip.BadGzipFile, zlib.error, ValueError):
+            pass
+
+        return recording
+
+    @staticmethod
+    def create_input_hash(
+        prompt: str, history: List[Union[HumanMessage, AIMessage]]
+    ) -> str:
+        """
+        Creates a hash of the input and history sent to the pipeline.
+
+        Parameters:
+        -----------
+        prompt: str
+            The input to the pipeline
+        history: List[BaseMessage]
+            The history of the conversation
+
+        Returns:
+        --------
+        str
+            The SHA-256 hash of the input and history
+        """
+        payload = [[message.type, message.content] for message in history]
+        payload.append(["input", prompt])
+
+        return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+    def get(self, test_case_id: str, input_hash: str) -> Optional[str]:
+        """
+        Gets the recorded response for a test case, or the response recorded for
+        another test case with the same input and history.
+
+        Parameters:
+        -----------
+        test_case_id: str
+            The ID of the test case
+        input_hash: str
+            The hash of the input and history sent to the pipeline
+
+        Returns:
+        --------
+        Optional[str]
+            The recorded response, or None if no response was recorded
+        """
+        response = self._responses.get((test_case_id, input_hash))
+
+        if response is None:
+            response = self._responses_by_input.get(input_hash)
+
+        return response
+
+    def add(self, test_case_id: str, input_hash: str, response: str):
+        """
+        Records the response for a test case. The response is written when the
+        buffer is full, or when the recording is saved.
+
+        Parameters:
+        -----------
+        test_case_id: str
+            The ID of the test case
+        input_hash: str
+            The hash of the input and history sent to the pipeline
+        response: str
+            The response generated by the pipeline
+        """
+        entry = {"id": test_case_id, "input_hash": input_hash, "response": response}
+
+        with self._lock:
+            self._responses[(test_case_id, input_hash)] = response
+            self._responses_by_input[input_hash] = response
+            self._pending.append(json.dumps(entry))
+
+            if len(self._pending) >= self.flush_size:
+                self._flush()
+
+    def save(self):
+        """Appends the buffered responses to the recording."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if len(self._pending) == 0:
+            return
+
+        data = "".join(f"{line}\n" for line in self._pending).encode("utf-8")
+
+        with open(self.path, "ab") as f:
+            f.write(gzip.compress(data))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._pending = []
+
+    def __len__(self) -> int:
+        return len(self._responses)
@@ -1,14 +1,44 @@
 """The reporters used to report the output of a session."""
 
 import json
-from typing import cast
+import math
+import sys
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Callable, Dict, List, Optional, cast
 from abc import ABC, abstractmethod
 from pathlib import Path
 from datetime import timedelta, datetime
 from linguametrica.config import OutputConfig
-from linguametrica.session import SessionSummary
+from linguametrica.events import (
+    CaseFinishedEvent,
+    CaseStartedEvent,
+    MetricScoredEvent,
+    SessionEvent,
+    SessionStartedEvent,
+)
+from linguametrica.resilience import CallStats
+from linguametrica.session import SessionSummary, SummaryBuilder
+from linguametrica.testcase import PIPELINE_STAGE, TestCase, TestResult
 from tabulate import tabulate
 
+# The minimum number of seconds between two updates of the progress line in a
+# terminal.
+REFRESH_INTERVAL = 0.5
+
+# The minimum number of seconds between two progress lines when the output isn't a
+# terminal, like in the log of a CI job.
+LOG_INTERVAL = 10.0
+
+# The number of results the columnar reporter writes to the file at once. Each
+# batch becomes a row group in a Parquet file.
+RECORD_BATCH_SIZE = 8192
+
+# The throughput is measured over this many seconds, so a stalled provider shows up
+# as a drop in throughput instead of being averaged away.
+THROUGHPUT_WINDOW = 30.0
+
 
 class Reporter(ABC):
     """
@@ -18,6 +48,30 @@ class Reporter(ABC):
     def __init__(self, config: OutputConfig):
         self.config = config
 
+    def report_result(self, test_case: TestCase, result: TestResult) -> None:
+        """
+        Reports the result of a single test case as soon as it's available.
+
+        Parameters:
+        -----------
+        test_case: TestCase
+            The test case that was executed
+        result: TestResult
+            The result of the test case
+        """
+        pass
+
+    def report_event(self, event: SessionEvent) -> None:
+        """
+        Reports an event of the session while it's running.
+
+        Parameters:
+        -----------
+        event: SessionEvent
+            The event to report
+        """
+        pass
+
     @abstractmethod
     def generate_report(self, summary: SessionSummary) -> None:
         """
@@ -30,18 +84,235 @@ class Reporter(ABC):
         """
         raise NotImplementedError()
 
+    def close(self) -> None:
+        """
+        Releases the output of the reporter. It's called when the session ends,
+        also when the session failed before the report was generated.
+        """
+        pass
+
+
+class ProgressDisplay:
+    """
+    Shows the progress of a running session on the console: the number of
+    completed test cases, the throughput, the estimated time remaining, the number
+    of test cases in flight, the number of failed test cases and the running mean
+    of each metric.
+
+    In a terminal, the progress is shown on a single line that is updated in place.
+    Otherwise, a progress line is written every now and then. The progress is also
+    updated while no events come in, so a stalled provider shows up as a drop in
+    throughput.
+
+    Attributes:
+    -----------
+    stream: IO[str]
+        The stream to show the progress on
+    """
+
+    stream: IO[str]
+
+    def __init__(
+        self,
+        stream: IO[str],
+        clock: Callable[[], float] = time.monotonic,
+        auto_refresh: bool = True,
+    ):
+        self.stream = stream
+
+        self._clock = clock
+        self._auto_refresh = auto_refresh
+        self._refresher: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._interactive = stream.isatty()
+        self._interval = REFRESH_INTERVAL if self._interactive else LOG_INTERVAL
+        self._lock = threading.Lock()
+        self._visible = False
+
+        self._total: Optional[int] = None
+        self._completed = 0
+        self._failed = 0
+        self._in_flight = set()
+        self._score_sums: Dict[str, float] = {}
+        self._score_counts: Dict[str, int] = {}
+        self._start_time = clock()
+        self._last_render = -math.inf
+        self._history = deque()
+
+    def handle(self, event: SessionEvent):
+        """
+        Updates the progress with an event of the session.
+
+        Parameters:
+        -----------
+        event: SessionEvent
+            The event of the session
+        """
+        with self._lock:
+            if isinstance(event, SessionStartedEvent):
+                self._total = event.test_cases
+                self._start_time = self._clock()
+
+                if self._auto_refresh and self._refresher is None:
+                    self._refresher = threading.Thread(
+                        target=self._refresh, daemon=True
+                    )
+                    self._refresher.start()
+            elif isinstance(event, CaseStartedEvent):
+                self._in_flight.add(event.test_case_id)
+            elif isinstance(event, MetricScoredEvent):
+                self._score_sums[event.metric] = (
+                    self._score_sums.get(event.metric, 0.0) + event.score
+                )
+                self._score_counts[event.metric] = (
+                    self._score_counts.get(event.metric, 0) + 1
+                )
+            elif isinstance(event, CaseFinishedEvent):
+                self._in_flight.discard(event.test_case_id)
+                self._completed += 1
+
+                if event.error is not None:
+                    self._failed += 1
+
+            now = self._clock()
+
+            if now - self._last_render >= self._interval:
+                self._render(now)
+
+    def clear(self):
+        """Removes the progress line, so other output can be written."""
+        with self._lock:
+            if self._interactive and self._visible:
+                self.stream.write("\r\x1b[K")
+                self.stream.flush()
+
+            self._visible = False
+
+            # The progress line is shown again with the next event.
+            self._last_render = -math.inf
+
+    def stop(self):
+        """Stops updating the progress and removes the progress line."""
+        self._stopped.set()
+
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+        self.clear()
+
+    def describe(self, now: Optional[float] = None) -> str:
+        """
+        Describes the progress of the session.
+
+        Parameters:
+        -----------
+        now: Optional[float]
+            The current time of the clock
+
+        Returns:
+        --------
+        str
+            The description of the progress
+        """
+        now = self._clock() if now is None else now
+        throughput = self._get_throughput(now)
+
+        if self._total is not None:
+            parts = [f"{self._completed}/{self._total} test cases"]
+        else:
+            parts = [f"{self._completed} test cases"]
+
+        parts.append(f"{throughput:.1f} cases/s")
+
+        if self._total is not None and throughput > 0:
+            remaining = max(0, self._total - self._completed) / throughput
+            parts.append(f"ETA {timedelta(seconds=round(remaining))}")
+
+        parts.append(f"{len(self._in_flight)} in flight")
+        parts.append(f"{self._failed} failed")
+
+        for metric_name, score_sum in self._score_sums.items():
+            mean = score_sum / self._score_counts[metric_name]
+            parts.append(f"{metric_name} {mean:.3f}")
+
+        return " | ".join(parts)
+
+    def _render(self, now: float):
+        self._history.append((now, self._completed))
+        self._last_render = now
+
+        if self._interactive:
+            self.stream.write(f"\r\x1b[K{self.describe(now)}")
+        else:
+            self.stream.write(f"{self.describe(now)}\n")
+
+        self.stream.flush()
+        self._visible = True
+
+    def _refresh(self):
+        while not self._stopped.wait(self._interval):
+            with self._lock:
+                now = self._clock()
+
+                if now - self._last_render >= self._interval:
+                    self._render(now)
+
+    def _get_throughput(self, now: float) -> float:
+        while len(self._history) > 1 and now - self._history[1][0] >= THROUGHPUT_WINDOW:
+            self._history.popleft()
+
+        # Until a full window has passed, the throughput is measured since the
+        # start of the session.
+        if len(self._history) > 0 and now - self._history[0][0] >= THROUGHPUT_WINDOW:
+            window_start, completed_before = self._history[0]
+        else:
+            window_start, completed_before = self._start_time, 0
+
+        elapsed = now - window_start
+
+        if elapsed <= 0:
+            return 0.0
+
+        return (self._completed - completed_before) / elapsed
+
 
 class ConsoleReporter(Reporter):
     """
-    Reports the output of a session to the console.
+    Reports the output of a session to the console. The progress of the session
+    is shown on the standard error stream while it's running.
     """
 
     def __init__(self, config: OutputConfig):
         super().__init__(config)
+        self._progress = ProgressDisplay(sys.stderr)
+
+    def report_event(self, event: SessionEvent) -> None:
+        self._progress.handle(event)
+
+    def report_result(self, test_case: TestCase, result: TestResult) -> None:
+        if result.error is not None:
+            self._progress.clear()
+            print(f"Test case {test_case.id} failed: {result.error}")
 
     def generate_report(self, summary: SessionSummary) -> None:
+        self._progress.stop()
+
         metric_data = [
-            [metric.name, metric.mean, metric.max, metric.min]
+            [
+                metric.name,
+                metric.mean,
+                (
+                    f"{metric.ci_lower:.3f} - {metric.ci_upper:.3f}"
+                    if not math.isnan(metric.ci_lower)
+                    else None
+                ),
+                metric.std,
+                metric.median,
+                metric.max,
+                metric.min,
+                metric.count,
+            ]
             for metric in summary.metrics
         ]
 
@@ -49,18 +320,96 @@ class ConsoleReporter(Reporter):
         print("---------------")
         print(f"Duration: {summary.duration}")
         print(f"Total test cases: {summary.test_cases}")
+
+        if summary.available_test_cases is not None:
+            stop_reason = summary.stop_reason or "all test cases evaluated"
+            print(
+                f"Evaluated test cases: {summary.test_cases} of "
+                f"{summary.available_test_cases} ({stop_reason})"
+            )
+
         print(f"Failed test cases: {summary.failed_cases}")
+
+        if summary.duplicate_cases > 0:
+            print(
+                f"Duplicate test cases: {summary.duplicate_cases} "
+                f"({summary.saved_calls} calls saved)"
+            )
+
+        print(f"Retried calls: {summary.call_stats.retries}")
+        print(f"Timed out calls: {summary.call_stats.timeouts}")
+        print(f"Rejected calls: {summary.call_stats.rejected_calls}")
         print("")
         print("Metrics:")
         print(
             tabulate(
                 metric_data,
-                headers=["Metric", "Mean", "Max", "Min"],
+                headers=[
+                    "Metric",
+                    "Mean",
+                    "95% CI",
+                    "Std",
+                    "Median",
+                    "Max",
+                    "Min",
+                    "Count",
+                ],
                 tablefmt="github",
                 numalign="right",
+                missingval="-",
             )
         )
 
+        if len(summary.latencies) > 0:
+            latency_data = [
+                [latency.stage, latency.p50, latency.p90, latency.p99, latency.max]
+                for latency in summary.latencies
+            ]
+
+            print("")
+            print("Latency (seconds):")
+            print(
+                tabulate(
+                    latency_data,
+                    headers=["Stage", "p50", "p90", "p99", "Max"],
+                    tablefmt="github",
+                    numalign="right",
+                    floatfmt=".3f",
+                )
+            )
+
+        if len(summary.usage) > 0:
+            usage_data = [
+                [
+                    stage,
+                    usage.prompt_tokens,
+                    usage.completion_tokens,
+                    usage.cost,
+                ]
+                for stage, usage in summary.usage.items()
+            ]
+
+            usage_data.append(
+                [
+                    "total",
+                    summary.total_usage.prompt_tokens,
+                    summary.total_usage.completion_tokens,
+                    summary.total_usage.cost,
+                ]
+            )
+
+            print("")
+            print("Token usage:")
+            print(
+                tabulate(
+                    usage_data,
+                    headers=["Stage", "Prompt tokens", "Completion tokens", "Cost"],
+                    tablefmt="github",
+                    numalign="right",
+                    missingval="-",
+                )
+            )
+
 
 class JsonReportEncoder(json.JSONEncoder):
     """Specialized JSON encoder for the SessionSummary model."""
@@ -114,6 +463,284 @@ class JsonReporter(Reporter):
             json.dump(summary.model_dump(), f, indent=4, cls=JsonReportEncoder)
 
 
+class JsonLinesReporter(Reporter):
+    """
+    Reports the result of every test case as a line of JSON, followed by a line
+    with the session summary. Results are written as soon as they're available.
+
+    The files written by this reporter contain the raw scores, so the results of
+    multiple sessions can be combined with merge_result_files.
+    """
+
+    _file: Optional[IO[str]]
+
+    def __init__(self, config: OutputConfig):
+        super().__init__(config)
+        self._file = None
+
+    def report_result(self, test_case: TestCase, result: TestResult) -> None:
+        self._write_line({"type": "result", **result.model_dump()})
+
+    def generate_report(self, summary: SessionSummary) -> None:
+        """
+        Writes the session summary and closes the output file.
+
+        Parameters:
+        -----------
+        summary: SessionSummary
+            The summary of the session
+        """
+        self._write_line({"type": "summary", **summary.model_dump()})
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the output file, so the results written before a failed session
+        ended are flushed to disk.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_line(self, data: dict):
+        if self._file is None:
+            output_path = Path(self.config.output_path.strip())
+            self._file = open(output_path, "w")
+
+        self._file.write(json.dumps(data, cls=JsonReportEncoder) + "\n")
+
+
+class ColumnarReporter(Reporter):
+    """
+    Reports the result of every test case as a row in a Parquet file or an Arrow
+    IPC file, so the results of many sessions can be analyzed with tools like
+    pandas or DuckDB. The results are written in record batches as they come in.
+
+    Each row contains the ID and the error of the test case, a score_<metric>
+    column per metric, a latency_<stage> column for the pipeline and each metric,
+    the number of prompt and completion tokens used by the pipeline and by the
+    metrics, and the estimated cost.
+
+    This reporter requires pyarrow, which is installed with the arrow extra. It's
+    imported when the reporter is created, so a missing extra is reported before
+    the session runs.
+    """
+
+    _writer: Any
+    _schema: Any
+    _metric_names: Optional[List[str]]
+    _results: List[TestResult]
+
+    def __init__(self, config: OutputConfig):
+        super().__init__(config)
+        self._writer = None
+        self._schema = None
+        self._metric_names = None
+        self._results = []
+        self._pa = _import_pyarrow()
+
+    def report_event(self, event: SessionEvent) -> None:
+        if isinstance(event, SessionStartedEvent) and self._metric_names is None:
+            self._metric_names = list(event.metrics)
+
+    def report_result(self, test_case: TestCase, result: TestResult) -> None:
+        # The columns are based on the metrics of the session. Without the event
+        # that names them, the metrics of the first result are used.
+        if self._metric_names is None:
+            self._metric_names = list(result.scores.keys())
+
+        self._results.append(result)
+
+        if len(self._results) >= RECORD_BATCH_SIZE:
+            self._write_batch()
+
+    def generate_report(self, summary: SessionSummary) -> None:
+        """
+        Writes the remaining results and closes the output file.
+
+        Parameters:
+        -----------
+        summary: SessionSummary
+            The summary of the session
+        """
+        if self._metric_names is None:
+            self._metric_names = [metric.name for metric in summary.metrics]
+
+        self._write_batch()
+        self.close()
+
+    def close(self) -> None:
+        """
+        Writes the buffered results and closes the output file. Without the footer
+        that's written on close, the file can't be read.
+        """
+        if self._results:
+            self._write_batch()
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __del__(self):
+        self.close()
+
+    def _write_batch(self):
+        pa = self._pa
+
+        if self._writer is None:
+            self._schema = self._create_schema(pa)
+            self._writer = self._open_writer(pa)
+        elif len(self._results) == 0:
+            return
+
+        columns = {name: [] for name in self._schema.names}
+
+        for result in self._results:
+            metric_usage = [
+                usage
+                for stage, usage in result.usage.items()
+                if stage != PIPELINE_STAGE
+            ]
+            pipeline_usage = result.usage.get(PIPELINE_STAGE)
+            costs = [
+                usage.cost for usage in result.usage.values() if usage.cost is not None
+            ]
+
+            columns["id"].append(result.id)
+            columns["error"].append(result.error)
+
+            for metric_name in self._metric_names:
+                columns[f"score_{metric_name}"].append(result.scores.get(metric_name))
+
+            for stage in [PIPELINE_STAGE, *self._metric_names]:
+                columns[f"latency_{stage}"].append(result.timings.get(stage))
+
+            columns["pipeline_prompt_tokens"].append(
+                pipeline_usage.prompt_tokens if pipeline_usage else None
+            )
+            columns["pipeline_completion_tokens"].append(
+                pipeline_usage.completion_tokens if pipeline_usage else None
+            )
+            columns["metric_prompt_tokens"].append(
+                sum(usage.prompt_tokens for usage in metric_usage)
+                if metric_usage
+                else None
+            )
+            columns["metric_completion_tokens"].append(
+                sum(usage.completion_tokens for usage in metric_usage)
+                if metric_usage
+                else None
+            )
+            columns["cost"].append(sum(costs) if costs else None)
+
+        self._writer.write_batch(
+            pa.RecordBatch.from_pydict(columns, schema=self._schema)
+        )
+
+        self._results = []
+
+    def _create_schema(self, pa: Any) -> Any:
+        fields = [pa.field("id", pa.string()), pa.field("error", pa.string())]
+
+        fields.extend(
+            pa.field(f"score_{metric_name}", pa.float64())
+            for metric_name in self._metric_names
+        )
+
+        fields.extend(
+            pa.field(f"latency_{stage}", pa.float64())
+            for stage in [PIPELINE_STAGE, *self._metric_names]
+        )
+
+        fields.extend(
+            [
+                pa.field("pipeline_prompt_tokens", pa.int64()),
+                pa.field("pipeline_completion_tokens", pa.int64()),
+                pa.field("metric_prompt_tokens", pa.int64()),
+                pa.field("metric_completion_tokens", pa.int64()),
+                pa.field("cost", pa.float64()),
+            ]
+        )
+
+        return pa.schema(fields)
+
+    def _open_writer(self, pa: Any) -> Any:
+        output_path = self.config.output_path.strip()
+
+        if self.config.output_format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(output_path, self._schema)
+
+        return pa.ipc.new_file(output_path, self._schema)
+
+
+def merge_result_files(
+    paths: List[str], bootstrap_resamples: int = 0
+) -> SessionSummary:
+    """
+    Merges result files written by the JsonLinesReporter into a single summary.
+    The statistics are calculated from the raw scores in the files. The duration
+    is the duration of the longest session, since sessions usually run in parallel.
+
+    Parameters:
+    -----------
+    paths: List[str]
+        The paths to the result files
+    bootstrap_resamples: int
+        The number of bootstrap resamples for the confidence interval of the mean
+        of each metric, or 0 to skip the interval
+
+    Returns:
+    --------
+    SessionSummary
+        The summary of the combined results
+
+    Raises:
+    -------
+    ValueError
+        If one of the files doesn't contain a session summary
+    """
+
+    def read_lines(path: str):
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip() != "":
+                    yield json.loads(line)
+
+    metric_names = []
+    duration = timedelta()
+    call_stats = CallStats()
+
+    for path in paths:
+        summaries = [line for line in read_lines(path) if line["type"] == "summary"]
+
+        if len(summaries) == 0:
+            raise ValueError(f"The result file {path} doesn't contain a summary")
+
+        summary = SessionSummary.model_validate(summaries[-1])
+        duration = max(duration, summary.duration)
+        call_stats += summary.call_stats
+
+        for metric in summary.metrics:
+            if metric.name not in metric_names:
+                metric_names.append(metric.name)
+
+    # Each file is summarized on its own, after which the summaries are merged.
+    summary_builder = SummaryBuilder(metric_names, bootstrap_resamples)
+
+    for path in paths:
+        file_summary_builder = SummaryBuilder(list(metric_names), bootstrap_resamples)
+
+        for line in read_lines(path):
+            if line["type"] == "result":
+                file_summary_builder.add(TestResult.model_validate(line))
+
+        summary_builder.merge(file_summary_builder)
+
+    return summary_builder.build(duration, call_stats)
+
+
 def get_reporter(output_config: OutputConfig) -> Reporter:
     """
     Creates a reporter based on the provided output_format.
@@ -128,5 +755,21 @@ def get_reporter(output_config: OutputConfig) -> Reporter:
         return ConsoleReporter(output_config)
     elif output_config.output_format == "json":
         return JsonReporter(output_config)
+    elif output_config.output_format == "jsonl":
+        return JsonLinesReporter(output_config)
+    elif output_config.output_format in ["parquet", "arrow"]:
+        return ColumnarReporter(output_config)
     else:
         raise ValueError(f"Unsupported output format: {output_config.output_format}")
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "The parquet and arrow report formats require pyarrow. Install "
+            "linguametrica with the arrow extra, or install pyarrow separately."
+        ) from e
+
+    return pyarrow
@@ -0,0 +1,361 @@
+"""Retries, timeouts and a circuit breaker for the LLM used to collect metrics."""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from pydantic import BaseModel
+
+from linguametrica.ratelimit import is_transient
+
+# The maximum number of seconds a single call to the provider may take.
+DEFAULT_TIMEOUT = 60.0
+
+# The number of times a call is retried after a transient error, like a dropped
+# connection, a timeout or a server error.
+DEFAULT_MAX_RETRIES = 2
+
+# The number of consecutive failed calls after which the circuit breaker opens.
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# The number of seconds the circuit breaker stays open before a trial call is made.
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# The backoff before the first retry. It doubles for every retry after that, up to
+# the maximum backoff. The actual delay is a random value up to the backoff, so
+# calls that failed at the same time are not retried at the same time.
+INITIAL_BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class CallStats(BaseModel):
+    """
+    Contains the number of retries, timeouts and rejected calls to the LLM used to
+    collect metrics.
+
+    Attributes:
+    -----------
+    retries: int
+        The number of times a call was retried after a transient error
+    timeouts: int
+        The number of calls that timed out
+    rejected_calls: int
+        The number of calls that were rejected because the circuit breaker was open
+    """
+
+    retries: int = 0
+    timeouts: int = 0
+    rejected_calls: int = 0
+
+    def __add__(self, other: "CallStats") -> "CallStats":
+        return CallStats(
+            retries=self.retries + other.retries,
+            timeouts=self.timeouts + other.timeouts,
+            rejected_calls=self.rejected_calls + other.rejected_calls,
+        )
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a provider that keeps failing. After a number of consecutive
+    failed calls the circuit opens, and calls fail immediately instead of waiting
+    for the provider. When the reset timeout has passed, a single trial call is let
+    through. The circuit closes again when the trial call succeeds.
+
+    Attributes:
+    -----------
+    failure_threshold: int
+        The number of consecutive failed calls after which the circuit opens
+    reset_timeout: float
+        The number of seconds the circuit stays open before a trial call is made
+    """
+
+    failure_threshold: int
+    reset_timeout: float
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        if failure_threshold < 1:
+            raise ValueError("The failure threshold must be at least 1")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Gets whether calls are currently rejected"""
+        with self._lock:
+            return self._opened_at is not None and (
+                self._trial_in_progress
+                or time.monotonic() - self._opened_at < self.reset_timeout
+            )
+
+    def before_call(self):
+        """
+        Checks whether a call can be made to the provider.
+
+        Raises:
+        -------
+        CircuitOpenError
+            If the circuit is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            # Only one trial call is let through after the reset timeout, the other
+            # calls keep failing until the trial call completes.
+            if (
+                self._trial_in_progress
+                or time.monotonic() - self._opened_at < self.reset_timeout
+            ):
+                raise CircuitOpenError(
+                    "The provider failed too often, calls are paused"
+                )
+
+            self._trial_in_progress = True
+
+    def record_success(self):
+        """Closes the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        """Opens the circuit after too many consecutive failed calls."""
+        with self._lock:
+            self._failures += 1
+
+            if self._trial_in_progress or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial_in_progress = False
+
+
+class RetryPolicy:
+    """
+    Defines how calls to a provider are timed out and retried, and keeps track of
+    the retries, timeouts and rejected calls.
+
+    Attributes:
+    -----------
+    timeout: float
+        The maximum number of seconds a single call may take
+    max_retries: int
+        The number of times a call is retried after a transient error
+    circuit_breaker: CircuitBreaker
+        The circuit breaker shared by all calls to the provider
+    """
+
+    timeout: float
+    max_retries: int
+    circuit_breaker: CircuitBreaker
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.circuit_breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._stats = CallStats()
+        self._lock = threading.Lock()
+
+    def get_backoff(self, retry: int) -> float:
+        """
+        Gets the number of seconds to wait before a retry.
+
+        Parameters:
+        -----------
+        retry: int
+            The number of the retry, starting at 1
+
+        Returns:
+        --------
+        float
+            The number of seconds to wait
+        """
+        return random.uniform(0, min(MAX_BACKOFF, INITIAL_BACKOFF * 2 ** (retry - 1)))
+
+    def record(self, retries: int = 0, timeouts: int = 0, rejected_calls: int = 0):
+        """
+        Adds to the statistics of the policy.
+
+        Parameters:
+        -----------
+        retries: int
+            The number of retries to add
+        timeouts: int
+            The number of timeouts to add
+        rejected_calls: int
+            The number of rejected calls to add
+        """
+        with self._lock:
+            self._stats = self._stats + CallStats(
+                retries=retries, timeouts=timeouts, rejected_calls=rejected_calls
+            )
+
+    def take_stats(self) -> CallStats:
+        """
+        Gets the statistics recorded since the last time they were taken.
+
+        Returns:
+        --------
+        CallStats
+            The number of retries, timeouts and rejected calls
+        """
+        with self._lock:
+            stats = self._stats
+            self._stats = CallStats()
+
+        return stats
+
+
+class ResilientRunnable(Runnable):
+    """
+    Wraps the LLM used to collect metrics, so calls that failed because of a
+    transient error are retried and calls to a provider that keeps failing fail
+    fast.
+
+    The timeout of a single call is enforced by the client of the wrapped LLM. A
+    call that timed out is retried like any other transient error, so the time a
+    call can take is bounded by the timeout, the number of retries and the backoff.
+    """
+
+    def __init__(self, llm: Runnable, retry_policy: RetryPolicy):
+        self.llm = llm
+        self.retry_policy = retry_policy
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None) -> Any:
+        circuit_breaker = self.retry_policy.circuit_breaker
+        retries = 0
+
+        while True:
+            try:
+                circuit_breaker.before_call()
+            except CircuitOpenError:
+                self.retry_policy.record(rejected_calls=1)
+                raise
+
+            try:
+                response = self.llm.invoke(input, config)
+            except Exception as e:
+                if is_timeout(e):
+                    self.retry_policy.record(timeouts=1)
+
+                # Errors that are caused by the request itself, like an invalid
+                # prompt, mean the provider is up and responding.
+                if not is_transient(e) and not is_timeout(e):
+                    circuit_breaker.record_success()
+                    raise
+
+                circuit_breaker.record_failure()
+
+                if retries >= self.retry_policy.max_retries:
+                    raise
+
+                retries += 1
+                self.retry_policy.record(retries=1)
+                time.sleep(self.retry_policy.get_backoff(retries))
+                continue
+
+            circuit_breaker.record_success()
+
+            return response
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the settings of the wrapped LLM, like the model name. The LLM
+        # isn't set yet while the wrapper is unpickled or copied.
+        if "llm" not in self.__dict__:
+            raise AttributeError(name)
+
+        return getattr(self.__dict__["llm"], name)
+
+
+_retry_policies: Dict[str, RetryPolicy] = {}
+_retry_policies_lock = threading.Lock()
+
+
+def configure_retry_policy(
+    provider: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+    reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+):
+    """
+    Configures the retry policy for a provider. The retry policy and its circuit
+    breaker are shared by all LLMs of the provider in this process.
+
+    Parameters:
+    -----------
+    provider: str
+        The provider of the LLM
+    timeout: float
+        The maximum number of seconds a single call may take
+    max_retries: int
+        The number of times a call is retried after a transient error
+    failure_threshold: int
+        The number of consecutive failed calls after which the circuit opens
+    reset_timeout: float
+        The number of seconds the circuit stays open before a trial call is made
+    """
+    with _retry_policies_lock:
+        _retry_policies[provider] = RetryPolicy(
+            timeout, max_retries, failure_threshold, reset_timeout
+        )
+
+
+def get_retry_policy(provider: str) -> RetryPolicy:
+    """
+    Gets the retry policy for a provider. A retry policy with the default settings
+    is created when the provider wasn't configured.
+
+    Parameters:
+    -----------
+    provider: str
+        The provider of the LLM
+
+    Returns:
+    --------
+    RetryPolicy
+        The retry policy for the provider
+    """
+    with _retry_policies_lock:
+        if provider not in _retry_policies:
+            _retry_policies[provider] = RetryPolicy()
+
+        return _retry_policies[provider]
+
+
+def is_timeout(error: Exception) -> bool:
+    """
+    Checks whether a request failed because it took longer than the timeout.
+
+    Parameters:
+    -----------
+    error: Exception
+        The error raised by the LLM
+
+    Returns:
+    --------
+    bool
+        True if the request timed out
+    """
+    import openai
+
+    return isinstance(error, (openai.APITimeoutError, TimeoutError))
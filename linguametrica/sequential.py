@@ -0,0 +1,171 @@
+"""The stopping rule for sessions that only evaluate a sample of the test cases."""
+
+import math
+from enum import Enum
+from statistics import NormalDist
+from typing import Dict, Optional
+
+from linguametrica.statistics import CONFIDENCE_LEVEL, RunningStatistics
+
+# The number of scored test cases a metric needs before its margin of error is
+# trusted. With fewer scores, the sample standard deviation is too unreliable,
+# especially for metrics with mostly the same score.
+MIN_TEST_CASES = 30
+
+# The lowest and highest score of the metrics. The margin of error is computed as
+# if one extra score at each bound was seen, so a metric that gave every test case
+# the same score so far still has a margin of error.
+SCORE_BOUNDS = (0.0, 1.0)
+
+# The seed for the order of the test cases, so a session evaluates the same sample
+# every time it runs.
+SAMPLING_SEED = 0
+
+
+class StopReason(Enum):
+    """The reason a sequential session stopped before all test cases were run"""
+
+    Precision = "precision"
+    TimeBudget = "time_budget"
+    CostBudget = "cost_budget"
+
+
+class SequentialSampling:
+    """
+    Runs the test cases of a session in a random order until the mean of every
+    metric is known precisely enough, or until the time or cost budget runs out.
+
+    The precision of a metric is the margin of error of its mean, the half width
+    of the normal confidence interval. The variance is smoothed with one extra
+    score at each bound of the scores, like the Agresti-Coull interval for
+    proportions. The session stops when the margin of error of every metric is at
+    most the tolerance.
+
+    Attributes:
+    -----------
+    tolerance: Optional[float]
+        The largest margin of error for the mean of each metric
+    confidence_level: float
+        The confidence level of the margin of error
+    max_duration: Optional[float]
+        The number of seconds after which no more test cases are started
+    max_cost: Optional[float]
+        The estimated cost after which no more test cases are started
+    min_test_cases: int
+        The number of scores a metric needs before it can be precise enough
+    seed: int
+        The seed for the random order of the test cases
+    """
+
+    tolerance: Optional[float]
+    confidence_level: float
+    max_duration: Optional[float]
+    max_cost: Optional[float]
+    min_test_cases: int
+    seed: int
+
+    def __init__(
+        self,
+        tolerance: Optional[float] = None,
+        confidence_level: float = CONFIDENCE_LEVEL,
+        max_duration: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        min_test_cases: int = MIN_TEST_CASES,
+        seed: int = SAMPLING_SEED,
+    ):
+        if tolerance is None and max_duration is None and max_cost is None:
+            raise ValueError("A tolerance, time budget or cost budget is required")
+
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError("The tolerance must be greater than zero")
+
+        if not 0 < confidence_level < 1:
+            raise ValueError("The confidence level must be between 0 and 1")
+
+        for budget in [max_duration, max_cost]:
+            if budget is not None and budget <= 0:
+                raise ValueError("Budgets must be greater than zero")
+
+        if min_test_cases < 2:
+            raise ValueError("The minimum number of test cases must be at least 2")
+
+        self.tolerance = tolerance
+        self.confidence_level = confidence_level
+        self.max_duration = max_duration
+        self.max_cost = max_cost
+        self.min_test_cases = min_test_cases
+        self.seed = seed
+
+    def check(
+        self,
+        scores: Dict[str, RunningStatistics],
+        duration: float,
+        cost: Optional[float],
+    ) -> Optional[StopReason]:
+        """
+        Checks whether the session should stop starting new test cases.
+
+        Parameters:
+        -----------
+        scores: Dict[str, RunningStatistics]
+            The statistics of the scores of each metric so far
+        duration: float
+            The number of seconds since the session started
+        cost: Optional[float]
+            The estimated cost so far, or None if no prices are configured
+
+        Returns:
+        --------
+        Optional[StopReason]
+            The reason to stop, or None to continue
+        """
+        if (
+            self.tolerance is not None
+            and len(scores) > 0
+            and all(
+                statistics.count >= self.min_test_cases
+                and self.get_margin_of_error(statistics) <= self.tolerance
+                for statistics in scores.values()
+            )
+        ):
+            return StopReason.Precision
+
+        if self.max_duration is not None and duration >= self.max_duration:
+            return StopReason.TimeBudget
+
+        if self.max_cost is not None and cost is not None and cost >= self.max_cost:
+            return StopReason.CostBudget
+
+        return None
+
+    def get_margin_of_error(self, statistics: RunningStatistics) -> float:
+        """
+        Gets the margin of error for the mean of a metric.
+
+        Parameters:
+        -----------
+        statistics: RunningStatistics
+            The statistics of the scores of the metric
+
+        Returns:
+        --------
+        float
+            The margin of error, or infinity when there are no scores yet
+        """
+        if statistics.count == 0:
+            return math.inf
+
+        lowest, highest = SCORE_BOUNDS
+        sum_of_squares = (
+            statistics.variance * (statistics.count - 1) if statistics.count > 1 else 0
+        )
+
+        # Chan's formula adds the two extra scores to the sum of squares.
+        count = statistics.count + 2
+        delta = (lowest + highest) / 2 - statistics.mean
+        sum_of_squares += (highest - lowest) ** 2 / 2
+        sum_of_squares += delta**2 * statistics.count * 2 / count
+
+        z = NormalDist().inv_cdf((1 + self.confidence_level) / 2)
+
+        return z * math.sqrt(sum_of_squares / (count - 1) / count)
@@ -3,16 +3,72 @@ The session module contains the Session class, which is the top-level object tha
 orchestrates the entire process of running a session.
 """
 
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sized,
+    Tuple,
+    Union,
+)
 
 from pydantic import BaseModel
 
-from linguametrica.config import ProjectConfig
+from linguametrica.cache import DatasetCache, ResultStore, VerdictCache
+from linguametrica.checkpoint import CheckpointLog
+from linguametrica.config import (
+    HttpClientConfig,
+    ProjectConfig,
+    RateLimitConfig,
+    ResilienceConfig,
+)
+from linguametrica.connections import configure_http_client
+from linguametrica.events import (
+    CaseFinishedEvent,
+    CaseStartedEvent,
+    MetricScoredEvent,
+    SessionEvent,
+    SessionStartedEvent,
+)
 from linguametrica.harness import TestHarness
-from linguametrica.metrics import Metric, get_metric
-from linguametrica.testcase import TestCase, TestResult
+from linguametrica.metrics import (
+    AspectCritiqueGroup,
+    AspectCritiqueMetric,
+    Metric,
+    MetricInput,
+    get_metric,
+)
+from linguametrica.ratelimit import configure_rate_limiter
+from linguametrica.recording import ResponseRecording
+from linguametrica.resilience import CallStats, configure_retry_policy, get_retry_policy
+from linguametrica.sequential import SequentialSampling, StopReason
+from linguametrica.statistics import (
+    RunningStatistics,
+    ScoreSample,
+    bootstrap_mean_interval,
+    percentiles,
+)
+from linguametrica.testcase import (
+    PIPELINE_STAGE,
+    TestCase,
+    TestCaseCollection,
+    TestResult,
+)
+from linguametrica.usage import TokenUsage, TokenUsageCallbackHandler
 
 
 class MetricSummary(BaseModel):
@@ -29,12 +85,66 @@ class MetricSummary(BaseModel):
         The maximum value of the metric
     min: float
         The minimum value of the metric
+    std: float
+        The sample standard deviation of the metric
+    median: float
+        The median of the metric, estimated unless the scores are kept for the
+        bootstrap
+    p5: float
+        The 5th percentile of the metric, when the scores are kept for the bootstrap
+    p95: float
+        The 95th percentile of the metric, when the scores are kept for the
+        bootstrap
+    ci_lower: float
+        The lower bound of the 95% bootstrap confidence interval for the mean
+    ci_upper: float
+        The upper bound of the 95% bootstrap confidence interval for the mean
+    count: int
+        The number of test cases the metric was collected for
+    missing_scores: int
+        The number of test cases without a score for the metric
+    none_scores: int
+        The number of test cases for which the metric could not be collected
     """
 
     name: str
     mean: float
     max: float
     min: float
+    std: float = math.nan
+    median: float = math.nan
+    p5: float = math.nan
+    p95: float = math.nan
+    ci_lower: float = math.nan
+    ci_upper: float = math.nan
+    count: int = 0
+    missing_scores: int = 0
+    none_scores: int = 0
+
+
+class LatencySummary(BaseModel):
+    """
+    Contains the latency percentiles of a stage of the test cases, in seconds.
+
+    Attributes:
+    -----------
+    stage: str
+        The name of the stage, the pipeline or the name of a metric
+    p50: float
+        The median latency
+    p90: float
+        The 90th percentile of the latency
+    p99: float
+        The 99th percentile of the latency
+    max: float
+        The maximum latency
+    """
+
+    stage: str
+    p50: float
+    p90: float
+    p99: float
+    max: float
 
 
 class SessionSummary(BaseModel):
@@ -52,12 +162,243 @@ class SessionSummary(BaseModel):
         The number of test cases that were collected.
     failed_cases: int
         The number of test cases that failed.
+    call_stats: CallStats
+        The number of retries, timeouts and rejected calls to the LLM used to collect
+        metrics.
+    latencies: List[LatencySummary]
+        The latency percentiles of the pipeline and each metric.
+    usage: Dict[str, TokenUsage]
+        The number of tokens used by the pipeline and each metric.
+    total_usage: TokenUsage
+        The number of tokens used during the session.
+    available_test_cases: Optional[int]
+        The number of test cases that could have been executed, when the session
+        evaluated a sample of them.
+    stop_reason: Optional[str]
+        Why the session stopped before all test cases were executed, if it did.
+    duplicate_cases: int
+        The number of test cases that got the scores of an identical test case.
+    saved_calls: int
+        The number of LLM calls that the duplicate test cases didn't make. Calls
+        that were cached or replayed for the original test case don't count.
     """
 
     metrics: List[MetricSummary]
     duration: timedelta
     test_cases: int
     failed_cases: int
+    call_stats: CallStats = CallStats()
+    latencies: List[LatencySummary] = []
+    usage: Dict[str, TokenUsage] = {}
+    total_usage: TokenUsage = TokenUsage()
+    available_test_cases: Optional[int] = None
+    stop_reason: Optional[str] = None
+    duplicate_cases: int = 0
+    saved_calls: int = 0
+
+
+class SummaryBuilder:
+    """
+    Builds the session summary incrementally while test results come in, so the
+    test results don't have to be kept in memory until the end of the session.
+
+    The statistics of the scores and latencies are kept in constant memory, and
+    the summaries of multiple builders can be merged. When bootstrap resamples are
+    requested, the scores are also kept in a contiguous array per metric, to
+    compute exact percentiles and a bootstrap confidence interval for the mean.
+
+    Attributes:
+    -----------
+    metric_names: List[str]
+        The names of the metrics to summarize
+    bootstrap_resamples: int
+        The number of bootstrap resamples, or 0 to not keep the scores
+    test_cases: int
+        The number of test results that were added
+    failed_cases: int
+        The number of test results that contain an error
+    """
+
+    metric_names: List[str]
+    bootstrap_resamples: int
+    test_cases: int
+    failed_cases: int
+
+    def __init__(self, metric_names: List[str], bootstrap_resamples: int = 0):
+        if bootstrap_resamples < 0:
+            raise ValueError("The number of bootstrap resamples can't be negative")
+
+        self.metric_names = metric_names
+        self.bootstrap_resamples = bootstrap_resamples
+        self.test_cases = 0
+        self.failed_cases = 0
+
+        self._scores: Dict[str, RunningStatistics] = {
+            name: RunningStatistics() for name in metric_names
+        }
+        self._missing_scores: Dict[str, int] = {name: 0 for name in metric_names}
+        self._none_scores: Dict[str, int] = {name: 0 for name in metric_names}
+        self._samples: Dict[str, ScoreSample] = (
+            {name: ScoreSample() for name in metric_names}
+            if bootstrap_resamples > 0
+            else {}
+        )
+        self._latencies: Dict[str, RunningStatistics] = {}
+        self._usage: Dict[str, TokenUsage] = {}
+
+    @property
+    def scores(self) -> Dict[str, RunningStatistics]:
+        """Gets the statistics of the scores of each metric so far"""
+        return self._scores
+
+    @property
+    def total_cost(self) -> Optional[float]:
+        """Gets the estimated cost so far, or None if no prices are configured"""
+        return sum(self._usage.values(), TokenUsage()).cost
+
+    def add(self, result: TestResult):
+        """
+        Adds a test result to the summary.
+
+        Parameters:
+        -----------
+        result: TestResult
+            The test result to add
+        """
+        self.test_cases += 1
+
+        if result.error is not None:
+            self.failed_cases += 1
+
+        for name in self.metric_names:
+            if name not in result.scores:
+                self._missing_scores[name] += 1
+            elif result.scores[name] is None:
+                self._none_scores[name] += 1
+            else:
+                self._scores[name].add(result.scores[name])
+
+                if name in self._samples:
+                    self._samples[name].add(result.scores[name])
+
+        for stage, latency in result.timings.items():
+            self._latencies.setdefault(stage, RunningStatistics()).add(latency)
+
+        for stage, usage in result.usage.items():
+            self._usage[stage] = self._usage.get(stage, TokenUsage()) + usage
+
+    def merge(self, other: "SummaryBuilder"):
+        """
+        Merges the test results added to another builder into this builder.
+
+        Parameters:
+        -----------
+        other: SummaryBuilder
+            The builder to merge
+        """
+        self.test_cases += other.test_cases
+        self.failed_cases += other.failed_cases
+
+        for name in other.metric_names:
+            if name not in self._scores:
+                self.metric_names.append(name)
+                self._scores[name] = RunningStatistics()
+                self._missing_scores[name] = self.test_cases - other.test_cases
+                self._none_scores[name] = 0
+
+                if self.bootstrap_resamples > 0:
+                    self._samples[name] = ScoreSample()
+
+            self._scores[name].merge(other._scores[name])
+
+            # Scores that weren't kept by the other builder can't be resampled, so
+            # the percentiles and interval are left out for the metric.
+            if name in self._samples and name in other._samples:
+                self._samples[name].merge(other._samples[name])
+            else:
+                self._samples.pop(name, None)
+            self._missing_scores[name] += other._missing_scores[name]
+            self._none_scores[name] += other._none_scores[name]
+
+        for stage, latencies in other._latencies.items():
+            self._latencies.setdefault(stage, RunningStatistics()).merge(latencies)
+
+        for stage, usage in other._usage.items():
+            self._usage[stage] = self._usage.get(stage, TokenUsage()) + usage
+
+    def build(
+        self, duration: timedelta, call_stats: Optional[CallStats] = None
+    ) -> SessionSummary:
+        """
+        Builds the summary from the test results that were added.
+
+        Parameters:
+        -----------
+        duration: timedelta
+            The duration of the session
+        call_stats: Optional[CallStats]
+            The number of retries, timeouts and rejected calls during the session
+
+        Returns:
+        --------
+        SessionSummary
+            The summary of the session
+        """
+
+        # A metric that wasn't collected for any of the test cases has NaN for its
+        # statistics.
+        def summarize_metric(name: str) -> MetricSummary:
+            scores = self._scores[name]
+
+            metric_summary = MetricSummary(
+                name=name,
+                mean=scores.mean,
+                max=scores.max,
+                min=scores.min,
+                std=scores.std,
+                median=scores.quantile(0.5),
+                count=scores.count,
+                missing_scores=self._missing_scores[name],
+                none_scores=self._none_scores[name],
+            )
+
+            if name in self._samples:
+                values = self._samples[name].to_numpy()
+
+                [
+                    metric_summary.p5,
+                    metric_summary.median,
+                    metric_summary.p95,
+                ] = percentiles(values, [5, 50, 95])
+
+                [
+                    metric_summary.ci_lower,
+                    metric_summary.ci_upper,
+                ] = bootstrap_mean_interval(values, self.bootstrap_resamples)
+
+            return metric_summary
+
+        def summarize_latencies(stage: str) -> LatencySummary:
+            latencies = self._latencies[stage]
+
+            return LatencySummary(
+                stage=stage,
+                p50=latencies.quantile(0.5),
+                p90=latencies.quantile(0.9),
+                p99=latencies.quantile(0.99),
+                max=latencies.max,
+            )
+
+        return SessionSummary(
+            metrics=[summarize_metric(name) for name in self.metric_names],
+            duration=duration,
+            test_cases=self.test_cases,
+            failed_cases=self.failed_cases,
+            call_stats=call_stats or CallStats(),
+            latencies=[summarize_latencies(stage) for stage in self._latencies],
+            usage=self._usage,
+            total_usage=sum(self._usage.values(), TokenUsage()),
+        )
 
 
 class Session:
@@ -70,53 +411,298 @@ class Session:
     analyzed, and the output configuration contains the information about where
     the output should be written to.
 
+    Test cases are executed in batches. The responses for a batch are generated on
+    a pool of worker threads, because most of the time spent on a test case is
+    waiting for the pipeline. After that, each metric scores the whole batch in one
+    call. The results are kept in the same order as the test cases.
+
+    Test cases are read from the test case iterable one batch at a time, and the
+    results are summarized as they come in, so memory use doesn't grow with the
+    number of test cases.
+
+    For pipelines that spend a lot of CPU time in Python code, the batches can be
+    executed on a pool of worker processes instead. Each worker creates its own
+    session with the worker factory, which loads the pipeline and the metrics once
+    per worker.
+
     Attributes:
     -----------
     project_config: ProjectConfig
         The project configuration
+    concurrency: int
+        The maximum number of calls to the pipeline or metric LLM at the same time
+    batch_size: int
+        The number of test cases that are scored together
+    cache: Optional[VerdictCache]
+        The cache for the verdicts of the LLM used to collect metrics
+    combine_critiques: bool
+        Whether to collect all aspect critique metrics with a single call to the LLM
+    workers: int
+        The number of worker processes to execute the test cases on
+    shard: Optional[Tuple[int, int]]
+        The index (starting at 1) and the number of shards, when the test cases are
+        spread over multiple sessions. Test cases are assigned to a shard by a hash
+        of their ID.
+    result_store: Optional[ResultStore]
+        The store with the results of previous runs. When provided, only test cases
+        that changed since they were last executed are executed again.
+    pipeline_version: Optional[str]
+        The version of the pipeline. Stored results of other versions are not used.
+    bootstrap_resamples: int
+        The number of bootstrap resamples for the confidence interval of the mean
+        of each metric, or 0 to skip the interval and the exact percentiles.
+    checkpoint: Optional[CheckpointLog]
+        The log the results are written to as they come in, so an interrupted
+        session can be resumed.
+    resume: bool
+        Whether to continue the checkpoint log of an interrupted session. Test
+        cases that succeeded in that session are not executed again.
+    sampling: Optional[SequentialSampling]
+        When provided, the test cases are executed in a random order, and no more
+        test cases are started once the metrics are precise enough or a budget
+        runs out.
+    deduplicate: bool
+        Whether test cases with the same input, history and context are executed
+        only once. The other test cases get a copy of the scores. When the test
+        case fails, the next test case with the same content is executed.
     """
 
     project_config: ProjectConfig
     start_time: datetime
     end_time: datetime
-    test_results: List[TestResult]
-    test_cases: List[TestCase]
+    test_cases: Iterable[TestCase]
     metrics: List[Metric]
+    concurrency: int
+    batch_size: int
+    cache: Optional[VerdictCache]
+    combine_critiques: bool
+    workers: int
+    shard: Optional[Tuple[int, int]]
+    result_store: Optional[ResultStore]
+    pipeline_version: Optional[str]
+    bootstrap_resamples: int
+    checkpoint: Optional[CheckpointLog]
+    resume: bool
+    sampling: Optional[SequentialSampling]
+    deduplicate: bool
 
     def __init__(
         self,
         project_config: ProjectConfig,
-        harness: TestHarness,
+        harness: Optional[TestHarness],
         metrics: List[Metric],
-        test_cases: List[TestCase],
+        test_cases: Iterable[TestCase],
+        concurrency: int = 1,
+        batch_size: int = 32,
+        cache: Optional[VerdictCache] = None,
+        combine_critiques: bool = False,
+        workers: int = 1,
+        worker_factory: Optional[Callable[[], "Session"]] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        result_store: Optional[ResultStore] = None,
+        pipeline_version: Optional[str] = None,
+        bootstrap_resamples: int = 0,
+        checkpoint: Optional[CheckpointLog] = None,
+        resume: bool = False,
+        sampling: Optional[SequentialSampling] = None,
+        deduplicate: bool = False,
     ):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+
+        if workers > 1 and worker_factory is None:
+            raise ValueError("A worker factory is required to use multiple workers")
+
+        if shard is not None and not 1 <= shard[0] <= shard[1]:
+            raise ValueError("The shard index must be between 1 and the shard count")
+
+        if bootstrap_resamples < 0:
+            raise ValueError("The number of bootstrap resamples can't be negative")
+
+        if resume and checkpoint is None:
+            raise ValueError("A checkpoint log is required to resume a session")
+
+        if (
+            sampling is not None
+            and sampling.max_cost is not None
+            and project_config.prices is None
+        ):
+            raise ValueError("Prices are required to stop at a cost budget")
+
         self.project_config = project_config
         self.harness = harness
         self.test_cases = test_cases
         self.metrics = metrics
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.cache = cache
+        self.combine_critiques = combine_critiques
+        self.workers = workers
+        self.worker_factory = worker_factory
+        self.shard = shard
+        self.result_store = result_store
+        self.pipeline_version = pipeline_version
+        self.bootstrap_resamples = bootstrap_resamples
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.sampling = sampling
+        self.deduplicate = deduplicate
+        self._critique_group = None
+        self._call_stats = CallStats()
+        self._on_event = None
+        self._event_lock = threading.Lock()
+        self._stop_reason: Optional[StopReason] = None
+        self._available_test_cases: Optional[int] = None
+        self._duplicate_cases = 0
+        self._saved_calls = 0
 
-    def run(self) -> SessionSummary:
+    def run(
+        self,
+        on_result: Optional[Callable[[TestCase, TestResult], None]] = None,
+        on_event: Optional[Callable[[SessionEvent], None]] = None,
+    ) -> SessionSummary:
         """
         Run the session. This will perform all the steps necessary to analyze the
         performance of the langchain pipeline.
 
+        Parameters:
+        -----------
+        on_result: Optional[Callable[[TestCase, TestResult], None]]
+            Called with each test case and its result as soon as it's available
+        on_event: Optional[Callable[[SessionEvent], None]]
+            Called with the events of the session while it's running, like a test
+            case that started. Events are reported one at a time, but not always
+            from the thread that called run.
+
         Returns:
         --------
         SessionSummary
             The summary of the session
         """
 
-        for metric in self.metrics:
-            metric.init(str(self.project_config.provider))
+        # Worker processes initialize their own metrics.
+        if self.workers == 1:
+            self._init_metrics()
+
+        summary_builder = SummaryBuilder(
+            self.project_config.metrics, self.bootstrap_resamples
+        )
+
+        resumed_results = self._open_checkpoint()
 
         self.start_time = datetime.utcnow()
-        self._run_test_cases()
+        self._on_event = on_event
+        self._stop_reason = None
+        self._duplicate_cases = 0
+        self._saved_calls = 0
+
+        self._emit(
+            SessionStartedEvent(
+                test_cases=self._count_test_cases(),
+                metrics=self.project_config.metrics,
+            )
+        )
+
+        # The checkpoint log is closed when the session is interrupted as well, so
+        # the buffered results are written to it.
+        try:
+            for test_case, test_result in self._run_test_cases(resumed_results):
+                summary_builder.add(test_result)
+
+                if self.checkpoint is not None and test_case.id not in resumed_results:
+                    self.checkpoint.append(test_result)
+
+                # The test cases that already started are still completed after
+                # the session decides to stop, so their cost isn't wasted.
+                if self.sampling is not None and self._stop_reason is None:
+                    self._stop_reason = self.sampling.check(
+                        summary_builder.scores,
+                        (datetime.utcnow() - self.start_time).total_seconds(),
+                        summary_builder.total_cost,
+                    )
+
+                for metric_name, score in test_result.scores.items():
+                    if score is not None:
+                        self._emit(
+                            MetricScoredEvent(
+                                test_case_id=test_case.id,
+                                metric=metric_name,
+                                score=score,
+                            )
+                        )
+
+                self._emit(
+                    CaseFinishedEvent(
+                        test_case_id=test_case.id, error=test_result.error
+                    )
+                )
+
+                if on_result is not None:
+                    on_result(test_case, test_result)
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+
         self.end_time = datetime.utcnow()
+        self._on_event = None
 
-        return self._build_summary()
+        # Worker processes report their statistics with the results of each batch.
+        if self.workers == 1:
+            llm_provider = self.project_config.provider.value
+            self._call_stats += get_retry_policy(llm_provider).take_stats()
+
+        if self.harness is not None:
+            self.harness.save_recording()
+
+        if self.cache is not None:
+            self.cache.evict()
+
+        if self.result_store is not None:
+            self.result_store.evict()
+
+        summary = summary_builder.build(
+            self.end_time - self.start_time, self._call_stats
+        )
+
+        summary.duplicate_cases = self._duplicate_cases
+        summary.saved_calls = self._saved_calls
+
+        if self.sampling is not None:
+            summary.available_test_cases = self._available_test_cases
+
+            if self._stop_reason is not None:
+                summary.stop_reason = self._stop_reason.value
+
+        return summary
 
     @staticmethod
-    def from_directory(project_directory: str) -> "Session":
+    def from_directory(
+        project_directory: str,
+        concurrency: int = 1,
+        batch_size: int = 32,
+        use_cache: bool = True,
+        record_path: Optional[str] = None,
+        replay_path: Optional[str] = None,
+        combine_critiques: bool = False,
+        workers: int = 1,
+        shard: Optional[Tuple[int, int]] = None,
+        incremental: bool = False,
+        pipeline_version: Optional[str] = None,
+        bootstrap_resamples: int = 0,
+        resume: bool = False,
+        checkpoint: bool = False,
+        sampling: Optional[SequentialSampling] = None,
+        deduplicate: bool = False,
+        sample_size: Optional[int] = None,
+        sample_fraction: Optional[float] = None,
+        seed: int = 0,
+    ) -> "Session":
         """
         Creates a new session based on a directory containing a project
 
@@ -124,28 +710,164 @@ class Session:
         -----------
         project_directory: str
             The directory containing the project
+        concurrency: int
+            The maximum number of calls to the pipeline or metric LLM at the same time
+        batch_size: int
+            The number of test cases that are scored together
+        use_cache: bool
+            Whether to cache the parsed test cases and the verdicts of the LLM used
+            to collect metrics in the project directory
+        record_path: Optional[str]
+            The file to record the responses of the pipeline to
+        replay_path: Optional[str]
+            The file with recorded responses to replay instead of invoking the
+            pipeline
+        combine_critiques: bool
+            Whether to collect all aspect critique metrics with a single call to
+            the LLM
+        workers: int
+            The number of worker processes to execute the test cases on
+        shard: Optional[Tuple[int, int]]
+            The index (starting at 1) and the number of shards, when the test cases
+            are spread over multiple sessions
+        incremental: bool
+            Whether to reuse the stored results of test cases that didn't change
+            since the previous run
+        pipeline_version: Optional[str]
+            The version of the pipeline, stored results of other versions are not
+            reused
+        bootstrap_resamples: int
+            The number of bootstrap resamples for the confidence interval of the
+            mean of each metric, or 0 to skip the interval
+        resume: bool
+            Whether to resume the interrupted session from its checkpoint log in
+            the project directory
+        checkpoint: bool
+            Whether to write the results to a checkpoint log in the project
+            directory, so an interrupted session can be resumed. Resumed sessions
+            always continue their checkpoint log.
+        sampling: Optional[SequentialSampling]
+            The stopping rule, to evaluate only a random sample of the test cases
+        deduplicate: bool
+            Whether test cases with the same input, history and context are
+            executed only once
+        sample_size: Optional[int]
+            The number of test cases to select from the data set
+        sample_fraction: Optional[float]
+            The fraction of the test cases to select from the data set
+        seed: int
+            The seed for selecting the test cases
 
         Returns:
         --------
         Session
             The session
         """
+        if record_path is not None and replay_path is not None:
+            raise ValueError("Responses can't be recorded and replayed at once")
+
+        if record_path is not None and workers > 1:
+            raise ValueError("Responses can't be recorded with multiple workers")
+
         project_config = ProjectConfig.load(project_directory)
-        test_cases = Session._load_project_data(Path(project_directory))
-        test_harness = TestHarness.create_from_path(project_config.module)
+        dataset_cache = (
+            DatasetCache.from_directory(project_directory) if use_cache else None
+        )
+        test_cases = Session._load_project_data(Path(project_directory), dataset_cache)
+
+        # Only the selected files are loaded, so a small sample of a large data set
+        # starts quickly.
+        if sample_size is not None or sample_fraction is not None:
+            test_cases = test_cases.sample(sample_size, sample_fraction, seed)
+
+        cache = VerdictCache.from_directory(project_directory) if use_cache else None
+        result_store = (
+            ResultStore.from_directory(project_directory) if incremental else None
+        )
+        # Writing the checkpoint log costs a sync to disk for every batch of
+        # results, so it's only written when the session should be resumable.
+        checkpoint_log = (
+            CheckpointLog.from_directory(project_directory, shard)
+            if checkpoint or resume
+            else None
+        )
+
+        # The pipeline and metrics are loaded by the worker processes, so there's
+        # no need to load them in this process as well.
+        if workers > 1:
+            worker_factory = partial(
+                _create_worker_session,
+                project_directory,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                use_cache=use_cache,
+                replay_path=replay_path,
+                combine_critiques=combine_critiques,
+                workers=workers,
+            )
+
+            return Session(
+                project_config,
+                None,
+                [],
+                test_cases,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                cache=cache,
+                combine_critiques=combine_critiques,
+                workers=workers,
+                worker_factory=worker_factory,
+                shard=shard,
+                result_store=result_store,
+                pipeline_version=pipeline_version,
+                bootstrap_resamples=bootstrap_resamples,
+                checkpoint=checkpoint_log,
+                resume=resume,
+                sampling=sampling,
+                deduplicate=deduplicate,
+            )
+
+        test_harness = Session._create_harness(project_config, record_path, replay_path)
         metrics = Session._load_metrics(project_config)
 
-        return Session(project_config, test_harness, metrics, test_cases)
+        return Session(
+            project_config,
+            test_harness,
+            metrics,
+            test_cases,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            cache=cache,
+            combine_critiques=combine_critiques,
+            shard=shard,
+            result_store=result_store,
+            pipeline_version=pipeline_version,
+            bootstrap_resamples=bootstrap_resamples,
+            checkpoint=checkpoint_log,
+            resume=resume,
+            sampling=sampling,
+            deduplicate=deduplicate,
+        )
 
     @staticmethod
-    def _load_project_data(root_directory: Path) -> List[TestCase]:
-        data_directory = root_directory / "data"
+    def _create_harness(
+        project_config: ProjectConfig,
+        record_path: Optional[str],
+        replay_path: Optional[str],
+    ) -> TestHarness:
+        if replay_path is not None:
+            recording = ResponseRecording.load(Path(replay_path))
+            return TestHarness.create_from_recording(recording)
 
-        test_cases = [
-            TestCase.load(test_case_file) for test_case_file in data_directory.iterdir()
-        ]
+        recording = ResponseRecording(Path(record_path)) if record_path else None
+        return TestHarness.create_from_path(project_config.module, recording=recording)
 
-        return test_cases
+    @staticmethod
+    def _load_project_data(
+        root_directory: Path,
+        dataset_cache: Optional[DatasetCache] = None,
+    ) -> TestCaseCollection:
+        return TestCaseCollection.from_directory(root_directory / "data", dataset_cache)
 
     @staticmethod
     def _load_metrics(project_config: ProjectConfig):
@@ -153,37 +875,638 @@ class Session:
 
         return metrics
 
-    def _run_test_cases(self):
-        test_results = []
+    def _init_metrics(self):
+        llm_provider = self.project_config.provider.value
+        rate_limit = self.project_config.rate_limit
+        resilience = self.project_config.resilience or ResilienceConfig()
+        http_client = self.project_config.http_client or HttpClientConfig()
+
+        if rate_limit is not None:
+            configure_rate_limiter(
+                llm_provider,
+                requests_per_minute=rate_limit.requests_per_minute,
+                tokens_per_minute=rate_limit.tokens_per_minute,
+            )
+
+        configure_retry_policy(
+            llm_provider,
+            timeout=resilience.timeout,
+            max_retries=resilience.max_retries,
+            failure_threshold=resilience.failure_threshold,
+            reset_timeout=resilience.reset_timeout,
+        )
+
+        configure_http_client(
+            max_connections=http_client.max_connections,
+            max_keepalive_connections=http_client.max_keepalive_connections,
+            keepalive_expiry=http_client.keepalive_expiry,
+        )
+
+        critique_metrics = [
+            metric
+            for metric in self.metrics
+            if isinstance(metric, AspectCritiqueMetric)
+        ]
+
+        # Aspect critique metrics in a group are collected by the group, so they
+        # don't need an LLM of their own.
+        if self.combine_critiques and len(critique_metrics) > 1:
+            self._critique_group = AspectCritiqueGroup(critique_metrics)
+            self._critique_group.init(llm_provider, cache=self.cache)
+
+        for metric in self._get_individual_metrics():
+            metric.init(llm_provider, cache=self.cache)
+
+    def _open_checkpoint(self) -> Dict[str, str]:
+        if self.checkpoint is None:
+            return {}
+
+        # A checkpoint log can only be resumed by a session with the same settings,
+        # otherwise its results can't be combined with the new results.
+        header = {
+            "module": self.project_config.module,
+            "provider": self.project_config.provider.value,
+            "metrics": sorted(self.project_config.metrics),
+            "pipeline_version": self.pipeline_version,
+        }
 
-        # Collect test results into a list
-        for test_case in self.test_cases:
-            test_results.append(test_case.run(self.metrics, self.harness))
+        if self.resume:
+            return self.checkpoint.resume(header)
 
-        self.test_results = test_results
+        self.checkpoint.start(header)
 
-    def _build_summary(self):
-        def calculate_metric_summaries():
-            for metric_name in self.project_config.metrics:
-                metric_results = [
-                    result.scores[metric_name] for result in self.test_results
+        return {}
+
+    def _run_test_cases(
+        self, resumed_results: Dict[str, str]
+    ) -> Iterator[Tuple[TestCase, TestResult]]:
+        if self.sampling is not None:
+            batches = self._sample_batches()
+        else:
+            batches = _batched(self._select_test_cases(), self.batch_size)
+
+        if self.result_store is not None or len(resumed_results) > 0:
+            yield from self._run_test_cases_with_stored_results(
+                batches, resumed_results
+            )
+            return
+
+        for batch, test_results in self._execute_unique_batches(batches):
+            yield from zip(batch, test_results)
+
+    def _run_test_cases_with_stored_results(
+        self, batches: Iterator[List[TestCase]], resumed_results: Dict[str, str]
+    ) -> Iterator[Tuple[TestCase, TestResult]]:
+        stored_batches = deque()
+
+        # Only the test cases without a resumed or stored result are executed. The
+        # batches are executed in order, so the stored results for a batch are at
+        # the front of the queue when its results come back.
+        def changed_batches() -> Iterator[List[TestCase]]:
+            for batch in batches:
+                stored_results = {
+                    index: TestResult.model_validate_json(resumed_results[test_case.id])
+                    for index, test_case in enumerate(batch)
+                    if test_case.id in resumed_results
+                }
+
+                keys = [None for _ in batch]
+
+                if self.result_store is not None:
+                    keys = [self._get_result_key(test_case) for test_case in batch]
+                    store_results = self.result_store.get_many(keys)
+
+                    for index, key in enumerate(keys):
+                        if index not in stored_results and key in store_results:
+                            test_result = TestResult.model_validate_json(
+                                store_results[key]
+                            )
+
+                            # The stored result wasn't executed in this run, so its
+                            # timings and usage don't count towards this run.
+                            test_result.timings = {}
+                            test_result.usage = {}
+
+                            stored_results[index] = test_result
+
+                stored_batches.append((batch, keys, stored_results))
+
+                yield [
+                    test_case
+                    for index, test_case in enumerate(batch)
+                    if index not in stored_results
                 ]
 
-                yield MetricSummary(
-                    name=metric_name,
-                    mean=sum(metric_results) / len(metric_results),
-                    max=max(metric_results),
-                    min=min(metric_results),
+        for _, changed_results in self._execute_unique_batches(changed_batches()):
+            batch, keys, stored_results = stored_batches.popleft()
+            changed_results = iter(changed_results)
+            new_results = {}
+
+            for index, (test_case, key) in enumerate(zip(batch, keys)):
+                if index in stored_results:
+                    test_result = stored_results[index]
+                else:
+                    test_result = next(changed_results)
+
+                    # Failed test cases are executed again in the next run.
+                    if key is not None and test_result.error is None:
+                        new_results[key] = test_result.model_dump_json()
+
+                yield test_case, test_result
+
+            if self.result_store is not None:
+                self.result_store.put_many(new_results)
+
+    def _sample_batches(self) -> Iterator[List[TestCase]]:
+        # The whole data set is shuffled, so every test case is equally likely to
+        # be part of the sample, even when the files are sorted by topic. Only the
+        # paths of test case files are shuffled, so the test cases are still loaded
+        # while they're executed.
+        if isinstance(self.test_cases, TestCaseCollection):
+            test_cases = self.test_cases.shuffle(self.sampling.seed)
+        else:
+            test_cases = list(self.test_cases)
+            random.Random(self.sampling.seed).shuffle(test_cases)
+
+        self._available_test_cases = self._count_test_cases()
+        selected_test_cases = 0
+
+        # Batches are taken one at a time, so no new batch is started once the
+        # session decided to stop.
+        for batch in _batched(self._select_test_cases(test_cases), self.batch_size):
+            if self._stop_reason is not None:
+                return
+
+            selected_test_cases += len(batch)
+
+            yield batch
+
+        # The test cases of a shard are only known once all of them were selected.
+        self._available_test_cases = selected_test_cases
+
+    def _execute_unique_batches(
+        self, batches: Iterator[List[TestCase]]
+    ) -> Iterator[Tuple[List[TestCase], List[TestResult]]]:
+        if not self.deduplicate:
+            with self._create_executor() as executor:
+                yield from self._execute_batches(batches, executor)
+
+            return
+
+        # The scores and number of LLM calls of the first test case with some
+        # content that succeeded, by the hash of the content. Failed test cases
+        # aren't kept, so the next test case with the same content is executed.
+        unique_results: Dict[bytes, Tuple[Dict[str, Optional[float]], int]] = {}
+
+        # The test cases waiting for a test case with the same content that is
+        # being executed. The entry is removed once its result comes back.
+        waiting: Dict[bytes, List[Tuple[_PendingBatch, int]]] = {}
+
+        pending_batches: deque = deque()
+        executions: deque = deque()
+        retries: deque = deque()
+
+        def copy_result(test_case: TestCase, content_hash: bytes) -> TestResult:
+            scores, calls = unique_results[content_hash]
+            self._duplicate_cases += 1
+            self._saved_calls += calls
+
+            # The copy wasn't executed, so it has no timings and usage.
+            return TestResult(id=test_case.id, scores=dict(scores), error=None)
+
+        def schedule(items: List[Tuple[_PendingBatch, int]]) -> List[TestCase]:
+            executions.append(items)
+
+            return [pending_batch.test_cases[index] for pending_batch, index in items]
+
+        # Duplicates of a failed test case are executed in the next batch, before
+        # any new test cases.
+        def retry_batches() -> Iterator[List[TestCase]]:
+            while retries:
+                items = list(retries)
+                retries.clear()
+
+                yield schedule(items)
+
+        def execution_batches() -> Iterator[List[TestCase]]:
+            for batch in batches:
+                yield from retry_batches()
+
+                pending_batch = _PendingBatch(batch)
+                pending_batches.append(pending_batch)
+                executed = []
+
+                for index, test_case in enumerate(batch):
+                    content_hash = pending_batch.hashes[index]
+
+                    if content_hash in unique_results:
+                        pending_batch.results[index] = copy_result(
+                            test_case, content_hash
+                        )
+                    elif content_hash in waiting:
+                        waiting[content_hash].append((pending_batch, index))
+                    else:
+                        waiting[content_hash] = []
+                        executed.append((pending_batch, index))
+
+                yield schedule(executed)
+
+            yield from retry_batches()
+
+        def process_results(
+            executed: Iterator[Tuple[List[TestCase], List[TestResult]]]
+        ) -> Iterator[Tuple[List[TestCase], List[TestResult]]]:
+            for _, executed_results in executed:
+                for (pending_batch, index), test_result in zip(
+                    executions.popleft(), executed_results
+                ):
+                    content_hash = pending_batch.hashes[index]
+                    pending_batch.results[index] = test_result
+                    waiting_items = waiting.pop(content_hash)
+
+                    if test_result.error is None:
+                        unique_results[content_hash] = (
+                            test_result.scores,
+                            sum(usage.calls for usage in test_result.usage.values()),
+                        )
+
+                        for waiting_batch, waiting_index in waiting_items:
+                            waiting_batch.results[waiting_index] = copy_result(
+                                waiting_batch.test_cases[waiting_index], content_hash
+                            )
+                    elif len(waiting_items) > 0:
+                        retries.append(waiting_items[0])
+                        waiting[content_hash] = waiting_items[1:]
+
+                # The batches are reported in order, once all their results are in.
+                while pending_batches and pending_batches[0].is_complete():
+                    pending_batch = pending_batches.popleft()
+
+                    yield pending_batch.test_cases, pending_batch.results
+
+        # Worker processes execute a few batches ahead, so a test case can fail
+        # after the last batch was handed out. Its duplicates are executed in
+        # another round, on the same executor so the workers are only started once.
+        with self._create_executor() as executor:
+            while True:
+                yield from process_results(
+                    self._execute_batches(execution_batches(), executor)
                 )
 
-        total_cases = len(self.test_cases)
-        failed_cases = len(
-            [result for result in self.test_results if result.error is not None]
+                if len(retries) == 0:
+                    return
+
+    def _create_executor(self) -> Executor:
+        if self.workers > 1:
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.worker_factory,),
+            )
+
+        return ThreadPoolExecutor(max_workers=self.concurrency)
+
+    def _execute_batches(
+        self, batches: Iterator[List[TestCase]], executor: Executor
+    ) -> Iterator[Tuple[List[TestCase], List[TestResult]]]:
+        if self.workers > 1:
+            yield from self._execute_batches_on_workers(batches, executor)
+            return
+
+        for batch in batches:
+            yield batch, self._run_batch(executor, batch)
+
+    def _execute_batches_on_workers(
+        self, batches: Iterator[List[TestCase]], executor: Executor
+    ) -> Iterator[Tuple[List[TestCase], List[TestResult]]]:
+        # Only a few batches per worker are submitted at a time, so the test cases
+        # are not all loaded into memory before the workers get to them.
+        pending = deque()
+
+        for batch in batches:
+            pending.append((batch, executor.submit(_run_worker_batch, batch)))
+
+            # The workers can't report events, so a test case is considered
+            # started when it's handed to a worker.
+            for test_case in batch:
+                self._emit(CaseStartedEvent(test_case_id=test_case.id))
+
+            if len(pending) >= self.workers * 2:
+                completed_batch, future = pending.popleft()
+                yield completed_batch, self._get_worker_results(future)
+
+        while pending:
+            completed_batch, future = pending.popleft()
+            yield completed_batch, self._get_worker_results(future)
+
+    def _get_worker_results(self, future: Future) -> List[TestResult]:
+        test_results, call_stats = future.result()
+        self._call_stats += call_stats
+
+        return test_results
+
+    def _get_result_key(self, test_case: TestCase) -> str:
+        return ResultStore.create_key(
+            test_case.model_dump_json(),
+            self.project_config.module,
+            self.project_config.provider.value,
+            ",".join(sorted(self.project_config.metrics)),
+            self.pipeline_version or "",
         )
 
-        return SessionSummary(
-            metrics=list(calculate_metric_summaries()),
-            duration=self.end_time - self.start_time,
-            test_cases=total_cases,
-            failed_cases=failed_cases,
+    def _select_test_cases(
+        self, test_cases: Optional[Iterable[TestCase]] = None
+    ) -> Iterator[TestCase]:
+        if test_cases is None:
+            test_cases = self.test_cases
+
+        if self.shard is None:
+            yield from test_cases
+            return
+
+        shard_index, shard_count = self.shard
+
+        for test_case in test_cases:
+            if _get_shard_index(test_case.id, shard_count) == shard_index:
+                yield test_case
+
+    def _run_batch(
+        self, executor: Executor, test_cases: List[TestCase]
+    ) -> List[TestResult]:
+        if len(test_cases) == 0:
+            return []
+
+        prices = self.project_config.prices
+
+        def generate_response(
+            test_case: TestCase,
+        ) -> Tuple[Union[str, Exception], float, Optional[TokenUsage]]:
+            usage_handler = TokenUsageCallbackHandler()
+            start_time = time.perf_counter()
+
+            self._emit(CaseStartedEvent(test_case_id=test_case.id))
+
+            try:
+                response = test_case.generate(self.harness, callbacks=[usage_handler])
+            except Exception as e:  # noqa
+                response = e
+
+            latency = time.perf_counter() - start_time
+
+            return response, latency, usage_handler.get_usage(prices)
+
+        # Executor.map returns the responses in the order of the test cases,
+        # regardless of the order in which the test cases complete.
+        responses, latencies, pipeline_usage = zip(
+            *executor.map(generate_response, test_cases)
         )
+
+        timings = [{PIPELINE_STAGE: latency} for latency in latencies]
+        usage = [
+            {PIPELINE_STAGE: item_usage} if item_usage is not None else {}
+            for item_usage in pipeline_usage
+        ]
+
+        errors = [
+            (
+                f"Error while running the test case: {response}"
+                if isinstance(response, Exception)
+                else None
+            )
+            for response in responses
+        ]
+
+        completed = [index for index, error in enumerate(errors) if error is None]
+        scores = [{} for _ in test_cases]
+
+        metric_inputs = [
+            MetricInput(
+                prompt=test_cases[index].input,
+                output=responses[index],
+                context=test_cases[index].context,
+            )
+            for index in completed
+        ]
+
+        for stage, stage_scores, latency, usage_handlers in self._collect_metrics(
+            metric_inputs
+        ):
+            for index, usage_handler in zip(completed, usage_handlers):
+                if (stage_usage := usage_handler.get_usage(prices)) is not None:
+                    usage[index][stage] = stage_usage
+
+            latencies = _get_metric_latencies(usage_handlers, latency)
+
+            for metric_name, metric_scores in stage_scores.items():
+                for index, score, item_latency in zip(
+                    completed, metric_scores, latencies
+                ):
+                    if item_latency is not None:
+                        timings[index][metric_name] = item_latency
+
+                    # A metric that couldn't be collected doesn't fail the test
+                    # case, the summary counts its None scores separately.
+                    if isinstance(score, Exception):
+                        errors[index] = f"Error while collecting {metric_name}: {score}"
+                    else:
+                        scores[index][metric_name] = score
+
+        return [
+            TestResult(
+                id=test_cases[index].id,
+                scores=scores[index] if error is None else {},
+                error=error,
+                timings=timings[index],
+                usage=usage[index],
+            )
+            for index, error in enumerate(errors)
+        ]
+
+    def _count_test_cases(self) -> Optional[int]:
+        # Only a part of the test cases is executed in a shard, and it isn't known
+        # upfront how many.
+        if self.shard is not None or not isinstance(self.test_cases, Sized):
+            return None
+
+        return len(self.test_cases)
+
+    def _emit(self, event: SessionEvent):
+        if self._on_event is None:
+            return
+
+        with self._event_lock:
+            self._on_event(event)
+
+    def _get_individual_metrics(self) -> List[Metric]:
+        if self._critique_group is None:
+            return self.metrics
+
+        return [
+            metric
+            for metric in self.metrics
+            if metric not in self._critique_group.metrics
+        ]
+
+    def _collect_metrics(self, metric_inputs: List[MetricInput]) -> Iterator[
+        Tuple[
+            str,
+            Dict[str, List[Union[float, None, Exception]]],
+            float,
+            List[TokenUsageCallbackHandler],
+        ]
+    ]:
+        # The metrics in a critique group share their LLM calls, so their token
+        # usage is reported for the group as a whole.
+        if self._critique_group is not None:
+            usage_handlers = [TokenUsageCallbackHandler() for _ in metric_inputs]
+            start_time = time.perf_counter()
+
+            try:
+                group_scores = self._critique_group.collect_many(
+                    metric_inputs,
+                    max_concurrency=self.concurrency,
+                    callbacks=usage_handlers,
+                )
+            except Exception as e:  # noqa
+                group_scores = [
+                    {name: e for name in self._critique_group.names}
+                    for _ in metric_inputs
+                ]
+
+            latency = time.perf_counter() - start_time
+
+            stage_scores = {
+                name: [item_scores[name] for item_scores in group_scores]
+                for name in self._critique_group.names
+            }
+
+            stage = "+".join(self._critique_group.names)
+
+            yield stage, stage_scores, latency, usage_handlers
+
+        for metric in self._get_individual_metrics():
+            usage_handlers = [TokenUsageCallbackHandler() for _ in metric_inputs]
+            start_time = time.perf_counter()
+
+            try:
+                metric_scores = metric.collect_many(
+                    metric_inputs,
+                    max_concurrency=self.concurrency,
+                    callbacks=usage_handlers,
+                )
+            except Exception as e:  # noqa
+                metric_scores = [e] * len(metric_inputs)
+
+            latency = time.perf_counter() - start_time
+
+            yield metric.name, {metric.name: metric_scores}, latency, usage_handlers
+
+
+class _PendingBatch:
+    # A batch of test cases whose results are coming in, in a deduplicated session.
+    def __init__(self, test_cases: List[TestCase]):
+        self.test_cases = test_cases
+        self.hashes = [_get_content_hash(test_case) for test_case in test_cases]
+        self.results: List[Optional[TestResult]] = [None for _ in test_cases]
+
+    def is_complete(self) -> bool:
+        return all(result is not None for result in self.results)
+
+
+_worker_session: Optional[Session] = None
+_worker_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _create_worker_session(
+    project_directory: str,
+    concurrency: int,
+    batch_size: int,
+    use_cache: bool,
+    replay_path: Optional[str],
+    combine_critiques: bool,
+    workers: int = 1,
+) -> Session:
+    project_config = ProjectConfig.load(project_directory)
+
+    # Every worker process has its own rate limiter, so the budget is split evenly
+    # between the workers.
+    if project_config.rate_limit is not None:
+        rate_limit = project_config.rate_limit
+
+        project_config.rate_limit = RateLimitConfig(
+            requests_per_minute=_split_budget(rate_limit.requests_per_minute, workers),
+            tokens_per_minute=_split_budget(rate_limit.tokens_per_minute, workers),
+        )
+
+    test_harness = Session._create_harness(project_config, None, replay_path)
+    metrics = Session._load_metrics(project_config)
+    cache = VerdictCache.from_directory(project_directory) if use_cache else None
+
+    return Session(
+        project_config,
+        test_harness,
+        metrics,
+        [],
+        concurrency=concurrency,
+        batch_size=batch_size,
+        cache=cache,
+        combine_critiques=combine_critiques,
+    )
+
+
+def _split_budget(budget: Optional[int], workers: int) -> Optional[int]:
+    return max(1, budget // workers) if budget is not None else None
+
+
+def _init_worker(worker_factory: Callable[[], Session]):
+    global _worker_session, _worker_executor
+
+    _worker_session = worker_factory()
+    _worker_session._init_metrics()
+    _worker_executor = ThreadPoolExecutor(max_workers=_worker_session.concurrency)
+
+
+def _run_worker_batch(
+    test_cases: List[TestCase],
+) -> Tuple[List[TestResult], CallStats]:
+    test_results = _worker_session._run_batch(_worker_executor, test_cases)
+    llm_provider = _worker_session.project_config.provider.value
+
+    return test_results, get_retry_policy(llm_provider).take_stats()
+
+
+def _get_shard_index(test_case_id: str, shard_count: int) -> int:
+    # The built-in hash function is randomized per process, so we use a stable hash
+    # to make sure every machine assigns a test case to the same shard.
+    digest = hashlib.sha256(test_case_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count + 1
+
+
+def _get_content_hash(test_case: TestCase) -> bytes:
+    # The ID and the expected output don't change the response or the scores, so
+    # they're not part of the content.
+    content = test_case.model_dump_json(include={"input", "history", "context"})
+    return hashlib.sha256(content.encode("utf-8")).digest()
+
+
+def _get_metric_latencies(
+    usage_handlers: List[TokenUsageCallbackHandler], batch_latency: float
+) -> List[Optional[float]]:
+    # The latency of a metric is the time spent in the LLM calls for the test case.
+    # Test cases that didn't need a call, for example because their verdicts were
+    # cached, have no latency for the metric.
+    latencies = [usage_handler.get_latency() for usage_handler in usage_handlers]
+
+    # Metrics that don't report their LLM calls to the callbacks score the whole
+    # batch at once, so every test case waited for the whole batch.
+    if all(latency is None for latency in latencies):
+        return [batch_latency] * len(usage_handlers)
+
+    return latencies
+
+
+def _batched(items: Iterable[TestCase], size: int) -> Iterator[List[TestCase]]:
+    iterator = iter(items)
+
+    while batch := list(islice(iterator, size)):
+        yield batch
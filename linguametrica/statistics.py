@@ -0,0 +1,473 @@
+"""The streaming statistics used to summarize the results of a session."""
+
+import math
+from array import array
+from statistics import NormalDist
+from typing import List, Tuple
+
+import numpy as np
+
+# The compression of the quantile sketch. Higher values keep more centroids, which
+# makes the quantiles more accurate at the cost of memory.
+DEFAULT_COMPRESSION = 100
+
+# The largest number of distinct scores for which the bootstrap resamples the
+# number of draws per distinct score instead of the individual scores. Most metrics
+# have only a few distinct scores, for which this is exact and fast.
+BOOTSTRAP_MAX_DISTINCT_VALUES = 256
+
+# The largest number of scores that are resampled individually when there are
+# many distinct scores. Larger samples use the normal approximation, which is
+# accurate at that size, because resampling them would take seconds.
+BOOTSTRAP_MAX_RESAMPLED_VALUES = 10_000
+
+# The number of scores drawn at once when the scores are resampled individually,
+# which bounds the memory the bootstrap uses on top of the scores.
+BOOTSTRAP_CHUNK_SIZE = 1 << 22
+
+# The confidence level of the bootstrap confidence interval for the mean.
+CONFIDENCE_LEVEL = 0.95
+
+# The bootstrap uses a fixed seed, so the same scores produce the same interval.
+BOOTSTRAP_SEED = 0
+
+
+class TDigest:
+    """
+    A t-digest sketch that estimates quantiles of a stream of values in constant
+    memory. Values are clustered into centroids, with small centroids near the
+    tails of the distribution, so extreme quantiles stay accurate.
+
+    New values are buffered and merged into the centroids when the buffer is full.
+    Two sketches can be merged, so sketches built in parallel can be combined.
+
+    Attributes:
+    -----------
+    compression: int
+        The compression of the sketch, the number of centroids is proportional to it
+    count: float
+        The total weight of the values added to the sketch
+    """
+
+    compression: int
+    count: float
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        if compression < 1:
+            raise ValueError("The compression must be at least 1")
+
+        self.compression = compression
+        self.count = 0.0
+
+        self._centroids: List[Tuple[float, float]] = []
+        self._buffer: List[Tuple[float, float]] = []
+        self._min = math.inf
+        self._max = -math.inf
+
+    def add(self, value: float, weight: float = 1.0):
+        """
+        Adds a value to the sketch.
+
+        Parameters:
+        -----------
+        value: float
+            The value to add
+        weight: float
+            The weight of the value
+        """
+        self._buffer.append((value, weight))
+        self.count += weight
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+
+        if len(self._buffer) >= self.compression * 5:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        """
+        Merges the values of another sketch into this sketch.
+
+        Parameters:
+        -----------
+        other: TDigest
+            The sketch to merge
+        """
+        if other.count == 0:
+            return
+
+        self._buffer.extend(other._centroids)
+        self._buffer.extend(other._buffer)
+        self.count += other.count
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+
+        self._compress()
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile of the values in the sketch.
+
+        Parameters:
+        -----------
+        q: float
+            The quantile to estimate, between 0 and 1
+
+        Returns:
+        --------
+        float
+            The estimated quantile, or NaN if the sketch is empty
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("The quantile must be between 0 and 1")
+
+        self._compress()
+
+        if self.count == 0:
+            return math.nan
+
+        if len(self._centroids) == 1:
+            return self._centroids[0][0]
+
+        # Each centroid is assumed to be centered on its mean, so the quantile is
+        # interpolated between the centers of the neighbouring centroids. Beyond the
+        # outer centers, it's interpolated towards the minimum and maximum.
+        target = q * self.count
+        first_mean, first_weight = self._centroids[0]
+
+        if target < first_weight / 2:
+            return self._min + (first_mean - self._min) * target / (first_weight / 2)
+
+        last_mean, last_weight = self._centroids[-1]
+
+        if target > self.count - last_weight / 2:
+            remaining = self.count - target
+            return self._max - (self._max - last_mean) * remaining / (last_weight / 2)
+
+        center = first_weight / 2
+
+        for (left_mean, left_weight), (right_mean, right_weight) in zip(
+            self._centroids, self._centroids[1:]
+        ):
+            next_center = center + (left_weight + right_weight) / 2
+
+            if target <= next_center:
+                fraction = (target - center) / (next_center - center)
+                return left_mean + (right_mean - left_mean) * fraction
+
+            center = next_center
+
+        return last_mean
+
+    def _compress(self):
+        if len(self._buffer) == 0:
+            return
+
+        centroids = sorted(self._centroids + self._buffer)
+        self._buffer = []
+
+        merged = []
+        weight_so_far = 0.0
+        current_mean, current_weight = centroids[0]
+
+        # Neighbouring centroids are merged as long as the merged centroid covers
+        # less than one unit of the scale function, which only allows small
+        # centroids near the tails.
+        for mean, weight in centroids[1:]:
+            proposed_weight = current_weight + weight
+            lower = self._scale(weight_so_far / self.count)
+            upper = self._scale((weight_so_far + proposed_weight) / self.count)
+
+            if upper - lower <= 1:
+                current_mean += (mean - current_mean) * weight / proposed_weight
+                current_weight = proposed_weight
+            else:
+                merged.append((current_mean, current_weight))
+                weight_so_far += current_weight
+                current_mean, current_weight = mean, weight
+
+        merged.append((current_mean, current_weight))
+        self._centroids = merged
+
+    def _scale(self, q: float) -> float:
+        q = min(1.0, max(0.0, q))
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+class RunningStatistics:
+    """
+    Keeps statistics of a stream of values in constant memory. The mean and
+    variance are updated with Welford's algorithm, which stays accurate for long
+    streams, and the quantiles are estimated with a t-digest sketch. The statistics
+    of two streams can be merged.
+
+    Attributes:
+    -----------
+    count: int
+        The number of values
+    mean: float
+        The mean of the values, or NaN when there are no values
+    min: float
+        The smallest value, or NaN when there are no values
+    max: float
+        The largest value, or NaN when there are no values
+    """
+
+    count: int
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.count = 0
+
+        self._mean = 0.0
+        self._sum_of_squares = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._digest = TDigest(compression)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.count > 0 else math.nan
+
+    @property
+    def min(self) -> float:
+        return self._min if self.count > 0 else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max if self.count > 0 else math.nan
+
+    @property
+    def variance(self) -> float:
+        """Gets the sample variance of the values, or NaN for less than two values"""
+        if self.count < 2:
+            return math.nan
+
+        return self._sum_of_squares / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        """Gets the sample standard deviation of the values"""
+        return math.sqrt(self.variance)
+
+    def margin_of_error(self, confidence_level: float = CONFIDENCE_LEVEL) -> float:
+        """
+        Computes the half width of the normal confidence interval for the mean.
+
+        Parameters:
+        -----------
+        confidence_level: float
+            The confidence level of the interval
+
+        Returns:
+        --------
+        float
+            The margin of error, or NaN for less than two values
+        """
+        z = NormalDist().inv_cdf((1 + confidence_level) / 2)
+
+        return z * self.std / math.sqrt(self.count) if self.count >= 2 else math.nan
+
+    def add(self, value: float):
+        """
+        Adds a value to the statistics.
+
+        Parameters:
+        -----------
+        value: float
+            The value to add
+        """
+        self.count += 1
+
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._sum_of_squares += delta * (value - self._mean)
+
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._digest.add(value)
+
+    def merge(self, other: "RunningStatistics"):
+        """
+        Merges the statistics of another stream into these statistics.
+
+        Parameters:
+        -----------
+        other: RunningStatistics
+            The statistics to merge
+        """
+        if other.count == 0:
+            return
+
+        count = self.count + other.count
+        delta = other._mean - self._mean
+
+        # Chan's formula combines the mean and variance of two streams.
+        self._sum_of_squares += (
+            other._sum_of_squares + delta**2 * self.count * other.count / count
+        )
+        self._mean += delta * other.count / count
+        self.count = count
+
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._digest.merge(other._digest)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile of the values.
+
+        Parameters:
+        -----------
+        q: float
+            The quantile to estimate, between 0 and 1
+
+        Returns:
+        --------
+        float
+            The estimated quantile, or NaN when there are no values
+        """
+        return self._digest.quantile(q)
+
+
+class ScoreSample:
+    """
+    Stores all values of a stream in a contiguous array of doubles, for statistics
+    that can't be computed in a single pass, like exact percentiles and bootstrap
+    confidence intervals. The array is shared with NumPy without copying it.
+
+    Attributes:
+    -----------
+    values: array
+        The values in the sample
+    """
+
+    values: array
+
+    def __init__(self):
+        self.values = array("d")
+
+    def add(self, value: float):
+        """
+        Adds a value to the sample.
+
+        Parameters:
+        -----------
+        value: float
+            The value to add
+        """
+        self.values.append(value)
+
+    def merge(self, other: "ScoreSample"):
+        """
+        Adds the values of another sample to this sample.
+
+        Parameters:
+        -----------
+        other: ScoreSample
+            The sample to merge
+        """
+        self.values.extend(other.values)
+
+    def to_numpy(self) -> np.ndarray:
+        """Gets the values as a NumPy array that shares the memory of the sample"""
+        if len(self.values) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        return np.frombuffer(self.values, dtype=np.float64)
+
+
+def percentiles(values: np.ndarray, q: List[float]) -> List[float]:
+    """
+    Computes exact percentiles of the values.
+
+    Parameters:
+    -----------
+    values: np.ndarray
+        The values
+    q: List[float]
+        The percentiles to compute, between 0 and 100
+
+    Returns:
+    --------
+    List[float]
+        The percentiles, or NaN for each percentile when there are no values
+    """
+    if len(values) == 0:
+        return [math.nan for _ in q]
+
+    return [float(value) for value in np.percentile(values, q)]
+
+
+def bootstrap_mean_interval(
+    values: np.ndarray,
+    resamples: int,
+    confidence_level: float = CONFIDENCE_LEVEL,
+) -> Tuple[float, float]:
+    """
+    Computes a percentile bootstrap confidence interval for the mean of the values.
+
+    When there are few distinct values, the number of draws of each distinct
+    value is sampled from a multinomial distribution instead of drawing every
+    value, so all resamples are computed with a single matrix product. Otherwise
+    the values are drawn individually, a few resamples at a time. Large samples
+    with many distinct values use the normal approximation instead, which the
+    bootstrap converges to as the number of values grows.
+
+    Parameters:
+    -----------
+    values: np.ndarray
+        The values
+    resamples: int
+        The number of bootstrap resamples
+    confidence_level: float
+        The confidence level of the interval
+
+    Returns:
+    --------
+    Tuple[float, float]
+        The lower and upper bound of the interval, or NaN when there are fewer than
+        two values or no resamples
+    """
+    if len(values) < 2 or resamples < 1:
+        return math.nan, math.nan
+
+    lowest, highest = values.min(), values.max()
+
+    if lowest == highest:
+        return float(lowest), float(highest)
+
+    generator = np.random.default_rng(BOOTSTRAP_SEED)
+    distinct_values, counts = np.unique(values, return_counts=True)
+
+    if len(distinct_values) <= BOOTSTRAP_MAX_DISTINCT_VALUES:
+        draws = generator.multinomial(len(values), counts / len(values), size=resamples)
+        means = draws @ distinct_values / len(values)
+    elif len(values) <= BOOTSTRAP_MAX_RESAMPLED_VALUES:
+        means = _resample_means(generator, values, resamples)
+    else:
+        z = NormalDist().inv_cdf((1 + confidence_level) / 2)
+        margin_of_error = z * values.std(ddof=1) / math.sqrt(len(values))
+
+        return (
+            float(values.mean() - margin_of_error),
+            float(values.mean() + margin_of_error),
+        )
+
+    tail = (1 - confidence_level) / 2 * 100
+
+    lower, upper = np.percentile(means, [tail, 100 - tail])
+
+    return float(lower), float(upper)
+
+
+def _resample_means(
+    generator: np.random.Generator, values: np.ndarray, resamples: int
+) -> np.ndarray:
+    means = np.empty(resamples)
+    chunk_resamples = max(1, BOOTSTRAP_CHUNK_SIZE // len(values))
+
+    for start in range(0, resamples, chunk_resamples):
+        size = min(chunk_resamples, resamples - start)
+        indices = generator.integers(0, len(values), size=(size, len(values)))
+        means[start : start + size] = values[indices].mean(axis=1)
+
+    return means
@@ -1,15 +1,38 @@
 """A test case is a single test that can be run against a langchain pipeline."""
 
+import hashlib
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
+from itertools import islice
 from os import PathLike
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import yaml
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from pydantic_yaml import parse_yaml_raw_as
 
+from linguametrica.cache import DatasetCache
 from linguametrica.harness import TestHarness
 from linguametrica.metrics import Metric
+from linguametrica.usage import TokenUsage, TokenUsageCallbackHandler
+
+# The C implementation of the YAML loader is a lot faster than the pure Python
+# loader, but it's only available when PyYAML was built against libyaml.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# The file extensions of test cases in subdirectories of the data directory. The
+# data directory itself only contains test cases, so every file in it is loaded.
+TEST_CASE_EXTENSIONS = {".yml", ".yaml"}
+
+# The name of the stage in the timings of a test result that generates the
+# response. The other stages are named after the metrics.
+PIPELINE_STAGE = "pipeline"
 
 
 class MessageRole(Enum):
@@ -45,14 +68,23 @@ class TestResult(BaseModel):
 
     Attributes:
     -----------
-    scores: Dict[str, float]
-        The scores of the metrics
+    id: Optional[str]
+        The ID of the test case the result belongs to
+    scores: Dict[str, Optional[float]]
+        The scores of the metrics, None if a metric could not be collected
     error: Optional[str]
         The error message, if any
+    timings: Dict[str, float]
+        The number of seconds spent per stage, the pipeline and each metric
+    usage: Dict[str, TokenUsage]
+        The number of tokens used per stage, the pipeline and each metric
     """
 
-    scores: Dict[str, float]
+    id: Optional[str] = None
+    scores: Dict[str, Optional[float]]
     error: Optional[str]
+    timings: Dict[str, float] = {}
+    usage: Dict[str, TokenUsage] = {}
 
 
 class TestCase(BaseModel):
@@ -94,7 +126,14 @@ class TestCase(BaseModel):
         """
 
         with open(path, "r") as f:
-            return parse_yaml_raw_as(TestCase, f.read())
+            content = f.read()
+
+        try:
+            return TestCase.model_validate(yaml.load(content, Loader=YamlLoader))
+        except (yaml.YAMLError, ValidationError):
+            # PyYAML implements YAML 1.1, which reads unquoted values like yes or
+            # 1.0 as booleans and numbers. The YAML 1.2 parser keeps them as strings.
+            return parse_yaml_raw_as(TestCase, content)
 
     def run(self, metrics: List[Metric], harness: TestHarness) -> TestResult:
         """
@@ -113,22 +152,65 @@ class TestCase(BaseModel):
         TestResult
             The result of the test case
         """
+        timings = {}
+        usage = {}
+
         try:
-            history_messages = self._map_history() if self._has_history() else []
-            response = harness.invoke(self.input, history_messages)
+            usage_handler = TokenUsageCallbackHandler()
+
+            start_time = time.perf_counter()
+            response = self.generate(harness, callbacks=[usage_handler])
+            timings[PIPELINE_STAGE] = time.perf_counter() - start_time
+
+            if (pipeline_usage := usage_handler.get_usage()) is not None:
+                usage[PIPELINE_STAGE] = pipeline_usage
 
             scores = {}
 
             for metric in metrics:
+                start_time = time.perf_counter()
                 score = metric.collect(self.input, response, self.context)
+                timings[metric.name] = time.perf_counter() - start_time
+
                 scores[metric.name] = score
 
-            return TestResult(scores=scores, error=None)
+            return TestResult(
+                id=self.id, scores=scores, error=None, timings=timings, usage=usage
+            )
         except Exception as e:  # noqa
             return TestResult(
-                scores={}, error=f"Error while running the test case: {e}"
+                id=self.id,
+                scores={},
+                error=f"Error while running the test case: {e}",
+                timings=timings,
+                usage=usage,
             )
 
+    def generate(
+        self,
+        harness: TestHarness,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+    ) -> str:
+        """
+        Generates a response for the test case using the test harness.
+
+        Parameters:
+        -----------
+        harness: TestHarness
+            The test harness to use to generate the response
+        callbacks: Optional[List[BaseCallbackHandler]]
+            The callback handlers to pass to the pipeline
+
+        Returns:
+        --------
+        str
+            The generated response
+        """
+        history_messages = self._map_history() if self._has_history() else []
+        return harness.invoke(
+            self.input, history_messages, test_case_id=self.id, callbacks=callbacks
+        )
+
     def _map_history(self) -> List[BaseMessage]:
         def map_message_data(message_data: MessageData) -> BaseMessage:
             if message_data.role == MessageRole.assistant:
@@ -145,3 +227,260 @@ class TestCase(BaseModel):
 
     def _has_history(self):
         return self.history is not None and len(self.history) > 0
+
+
+class TestCaseCollection:
+    """
+    A collection of test cases stored as files. The test cases are loaded while
+    iterating over the collection, so only the test cases that are being executed
+    are kept in memory.
+
+    When a dataset cache is provided, test cases that didn't change since they were
+    last loaded are read from the cache. Files that did change are parsed in
+    parallel on a pool of worker processes.
+
+    Attributes:
+    -----------
+    paths: List[Path]
+        The paths to the test case files
+    dataset_cache: Optional[DatasetCache]
+        The cache with the parsed test cases
+    data_directory: Optional[Path]
+        The directory the test case files are in. Its subdirectories are the
+        groups a sample is drawn from.
+    """
+
+    paths: List[Path]
+    dataset_cache: Optional[DatasetCache]
+    data_directory: Optional[Path]
+
+    # The number of files that are looked up in the dataset cache at once.
+    chunk_size = 1000
+
+    # Starting worker processes takes time, so small numbers of changed files are
+    # parsed in the current process.
+    min_parallel_files = 32
+
+    def __init__(
+        self,
+        paths: List[Path],
+        dataset_cache: Optional[DatasetCache] = None,
+        data_directory: Optional[Path] = None,
+    ):
+        self.paths = paths
+        self.dataset_cache = dataset_cache
+        self.data_directory = data_directory
+
+    @staticmethod
+    def from_directory(
+        data_directory: Path,
+        dataset_cache: Optional[DatasetCache] = None,
+    ) -> "TestCaseCollection":
+        """
+        Creates a collection of the test case files in a directory. The YAML files
+        in its subdirectories are test cases too, so a full run evaluates the same
+        test cases a sample is drawn from.
+
+        Parameters:
+        -----------
+        data_directory: Path
+            The directory containing the test case files
+        dataset_cache: Optional[DatasetCache]
+            The cache with the parsed test cases
+
+        Returns:
+        --------
+        TestCaseCollection
+            The collection of test cases
+        """
+        paths = sorted(
+            path
+            for path in data_directory.rglob("*")
+            if path.is_file()
+            and (
+                path.parent == data_directory
+                or path.suffix.lower() in TEST_CASE_EXTENSIONS
+            )
+        )
+
+        return TestCaseCollection(paths, dataset_cache, data_directory)
+
+    def sample(
+        self,
+        size: Optional[int] = None,
+        fraction: Optional[float] = None,
+        seed: int = 0,
+    ) -> "TestCaseCollection":
+        """
+        Selects a sample of the test case files, without loading them. The files
+        are grouped by their subdirectory, and every group is sampled in proportion
+        to its size, so the sample has the same mix of groups as the whole data set.
+
+        The files are chosen by a hash of their path and the seed. The same seed
+        always chooses the same files, and adding a file to a group changes the
+        sample of the group by at most one file.
+
+        Parameters:
+        -----------
+        size: Optional[int]
+            The number of test cases in the sample
+        fraction: Optional[float]
+            The fraction of the test cases in the sample, between 0 and 1
+        seed: int
+            The seed for choosing the test cases
+
+        Returns:
+        --------
+        TestCaseCollection
+            The collection with the sampled test case files, in their original order
+
+        Raises:
+        -------
+        ValueError
+            If neither or both of the size and the fraction are given, or they are
+            out of range
+        """
+        if (size is None) == (fraction is None):
+            raise ValueError("Either a sample size or a sample fraction is required")
+
+        if size is not None and size < 1:
+            raise ValueError("The sample size must be at least 1")
+
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError("The sample fraction must be between 0 and 1")
+
+        if size is None:
+            size = math.ceil(fraction * len(self.paths))
+
+        groups: Dict[Path, List[Path]] = {}
+
+        for path in self.paths:
+            groups.setdefault(path.parent, []).append(path)
+
+        sampled_paths = set()
+
+        for group, group_size in zip(
+            groups.values(), _allocate_sample(list(map(len, groups.values())), size)
+        ):
+            group.sort(key=lambda path: self._get_sample_key(path, seed))
+            sampled_paths.update(group[:group_size])
+
+        return TestCaseCollection(
+            [path for path in self.paths if path in sampled_paths],
+            self.dataset_cache,
+            self.data_directory,
+        )
+
+    def shuffle(self, seed: int = 0) -> "TestCaseCollection":
+        """
+        Puts the test case files in a random order, without loading them.
+
+        Parameters:
+        -----------
+        seed: int
+            The seed for the order of the test cases
+
+        Returns:
+        --------
+        TestCaseCollection
+            The collection with the test case files in a random order
+        """
+        paths = list(self.paths)
+        random.Random(seed).shuffle(paths)
+
+        return TestCaseCollection(paths, self.dataset_cache, self.data_directory)
+
+    def __iter__(self) -> Iterator[TestCase]:
+        if self.dataset_cache is None:
+            for path in self.paths:
+                yield TestCase.load(path)
+
+            return
+
+        executor = None
+        iterator = iter(self.paths)
+
+        try:
+            while chunk := list(islice(iterator, self.chunk_size)):
+                files = [_describe_file(path) for path in chunk]
+                cached_test_cases = self.dataset_cache.get_many(files)
+
+                changed_files = [
+                    file for file in files if file[0] not in cached_test_cases
+                ]
+
+                if len(changed_files) >= self.min_parallel_files and executor is None:
+                    executor = ProcessPoolExecutor()
+
+                parse = executor.map if executor is not None else map
+
+                parsed_test_cases = list(
+                    parse(_parse_test_case_file, [file[0] for file in changed_files])
+                )
+
+                self.dataset_cache.put_many(
+                    [
+                        (path, mtime, size, data)
+                        for (path, mtime, size), data in zip(
+                            changed_files, parsed_test_cases
+                        )
+                    ]
+                )
+
+                cached_test_cases.update(
+                    {
+                        file[0]: data
+                        for file, data in zip(changed_files, parsed_test_cases)
+                    }
+                )
+
+                for path, _, _ in files:
+                    yield TestCase.model_validate_json(cached_test_cases[path])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _get_sample_key(self, path: Path, seed: int) -> bytes:
+        # The path relative to the data directory is hashed, so the sample doesn't
+        # depend on where the project is checked out.
+        if self.data_directory is not None:
+            path = path.relative_to(self.data_directory)
+
+        return hashlib.sha256(f"{seed}:{path.as_posix()}".encode("utf-8")).digest()
+
+
+def _describe_file(path: Path) -> Tuple[str, int, int]:
+    file_path = str(path.resolve())
+    file_stat = path.stat()
+
+    return file_path, file_stat.st_mtime_ns, file_stat.st_size
+
+
+def _allocate_sample(group_sizes: List[int], size: int) -> List[int]:
+    total = sum(group_sizes)
+
+    if size >= total:
+        return group_sizes
+
+    # Every group gets its proportional share rounded down, and the remaining test
+    # cases go to the groups with the largest remainders.
+    shares = [group_size * size / total for group_size in group_sizes]
+    allocation = [math.floor(share) for share in shares]
+
+    remainders = sorted(
+        range(len(shares)),
+        key=lambda index: shares[index] - allocation[index],
+        reverse=True,
+    )
+
+    for index in remainders[: size - sum(allocation)]:
+        allocation[index] += 1
+
+    return allocation
+
+
+def _parse_test_case_file(path: str) -> bytes:
+    return TestCase.load(path).model_dump_json().encode("utf-8")
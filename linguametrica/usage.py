@@ -0,0 +1,230 @@
+"""The token usage and cost of the calls to the pipeline and the metric LLM."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from pydantic import BaseModel
+
+from linguametrica.config import ModelPrice
+
+
+class TokenUsage(BaseModel):
+    """
+    Contains the number of tokens used by calls to an LLM, and their estimated cost.
+
+    Attributes:
+    -----------
+    calls: int
+        The number of calls to the LLM, including retries
+    prompt_tokens: int
+        The number of tokens in the prompts
+    completion_tokens: int
+        The number of tokens generated by the LLM
+    cost: Optional[float]
+        The estimated cost of the tokens, or None if no prices are configured
+    """
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: Optional[float] = None
+
+    @property
+    def total_tokens(self) -> int:
+        """Gets the total number of tokens"""
+        return self.prompt_tokens + self.completion_tokens
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        cost = None
+
+        if self.cost is not None or other.cost is not None:
+            cost = (self.cost or 0.0) + (other.cost or 0.0)
+
+        return TokenUsage(
+            calls=self.calls + other.calls,
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            cost=cost,
+        )
+
+
+class TokenUsageCallbackHandler(BaseCallbackHandler):
+    """
+    Collects the number of tokens used by the LLM calls it's attached to. The usage
+    is collected per model, because the price of a token depends on the model.
+
+    The usage is read from the output of the LLM, so calls to providers that don't
+    report their usage are not counted.
+
+    The handler also measures how long the LLM calls took, so the latency of a
+    metric can be reported per test case instead of per batch.
+    """
+
+    def __init__(self):
+        self._usage: Dict[str, TokenUsage] = {}
+        self._lock = threading.Lock()
+        self._start_times: Dict[UUID, float] = {}
+        self._latency: Optional[float] = None
+        self._calls = 0
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
+    ) -> None:
+        self._start_call(kwargs.get("run_id"))
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any
+    ) -> None:
+        self._start_call(kwargs.get("run_id"))
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        self._end_call(kwargs.get("run_id"))
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self._end_call(kwargs.get("run_id"))
+
+        llm_output = response.llm_output or {}
+        model_name = str(llm_output.get("model_name", ""))
+        token_usage = llm_output.get("token_usage")
+
+        # Chat models that don't report the usage in the output of the call report
+        # it in the metadata of the generated message instead.
+        if not token_usage:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    metadata = getattr(message, "response_metadata", None) or {}
+
+                    if "token_usage" in metadata:
+                        token_usage = metadata["token_usage"]
+                        model_name = str(metadata.get("model_name", model_name))
+
+        if not token_usage:
+            return
+
+        usage = TokenUsage(
+            prompt_tokens=token_usage.get("prompt_tokens", 0),
+            completion_tokens=token_usage.get("completion_tokens", 0),
+        )
+
+        with self._lock:
+            self._usage[model_name] = self._usage.get(model_name, TokenUsage()) + usage
+
+    def get_usage(
+        self, prices: Optional[Dict[str, ModelPrice]] = None
+    ) -> Optional[TokenUsage]:
+        """
+        Gets the tokens used by the LLM calls so far.
+
+        Parameters:
+        -----------
+        prices: Optional[Dict[str, ModelPrice]]
+            The price per million tokens per model, used to estimate the cost.
+            Models that aren't in the price table don't count towards the cost.
+
+        Returns:
+        --------
+        Optional[TokenUsage]
+            The number of tokens used, or None if no call was seen and no usage
+            was reported
+        """
+        with self._lock:
+            usage_per_model = dict(self._usage)
+            calls = self._calls
+
+        if len(usage_per_model) == 0 and calls == 0:
+            return None
+
+        total_usage = TokenUsage(calls=calls)
+
+        for model_name, usage in usage_per_model.items():
+            if prices is not None:
+                price = get_price(prices, model_name)
+                usage = usage.model_copy(
+                    update={"cost": estimate_cost(usage, price) if price else 0.0}
+                )
+
+            total_usage += usage
+
+        return total_usage
+
+    def get_latency(self) -> Optional[float]:
+        """
+        Gets the number of seconds spent in the LLM calls so far. Retried calls
+        count as separate calls.
+
+        Returns:
+        --------
+        Optional[float]
+            The time spent in the LLM calls, or None if no call was made
+        """
+        with self._lock:
+            return self._latency
+
+    def _start_call(self, run_id: Optional[UUID]):
+        with self._lock:
+            self._start_times[run_id] = time.perf_counter()
+            self._calls += 1
+
+    def _end_call(self, run_id: Optional[UUID]):
+        end_time = time.perf_counter()
+
+        with self._lock:
+            start_time = self._start_times.pop(run_id, None)
+
+            if start_time is not None:
+                self._latency = (self._latency or 0.0) + end_time - start_time
+
+
+def get_price(prices: Dict[str, ModelPrice], model_name: str) -> Optional[ModelPrice]:
+    """
+    Gets the price of a model from the price table. Providers often report a
+    versioned model name, like gpt-3.5-turbo-0125, so the longest model name in the
+    price table that the reported name starts with is used.
+
+    Parameters:
+    -----------
+    prices: Dict[str, ModelPrice]
+        The price per million tokens per model
+    model_name: str
+        The name of the model reported by the provider
+
+    Returns:
+    --------
+    Optional[ModelPrice]
+        The price of the model, or None if the model isn't in the price table
+    """
+    if model_name in prices:
+        return prices[model_name]
+
+    matching_names = [name for name in prices if model_name.startswith(name)]
+
+    if len(matching_names) == 0:
+        return None
+
+    return prices[max(matching_names, key=len)]
+
+
+def estimate_cost(usage: TokenUsage, price: ModelPrice) -> float:
+    """
+    Estimates the cost of the tokens used by an LLM.
+
+    Parameters:
+    -----------
+    usage: TokenUsage
+        The number of tokens used
+    price: ModelPrice
+        The price per million tokens of the model
+
+    Returns:
+    --------
+    float
+        The estimated cost
+    """
+    return (
+        usage.prompt_tokens * price.prompt + usage.completion_tokens * price.completion
+    ) / 1_000_000
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+import pytest
+
+from linguametrica.cache import DatasetCache, VerdictCache
+
+
+@pytest.fixture
+def cache(tmp_path) -> VerdictCache:
+    return VerdictCache(tmp_path / "cache" / "verdicts.db")
+
+
+def test_create_key():
+    assert VerdictCache.create_key("a", "bc") == VerdictCache.create_key("a", "bc")
+    assert VerdictCache.create_key("a", "bc") != VerdictCache.create_key("ab", "c")
+
+
+def test_put_and_get_verdicts(cache: VerdictCache):
+    cache.put_many({"key-1": 1.0, "key-2": 0.0})
+
+    assert cache.get_many(["key-1", "key-2", "key-3"]) == {"key-1": 1.0, "key-2": 0.0}
+
+
+def test_evict_max_entries(tmp_path):
+    cache = VerdictCache(tmp_path / "verdicts.db", max_entries=2)
+
+    for index in range(5):
+        cache.put_many({f"key-{index}": 1.0})
+
+    cache.evict()
+
+    assert len(cache) == 2
+
+
+def test_evict_max_age(tmp_path):
+    cache = VerdictCache(tmp_path / "verdicts.db", max_age=timedelta(seconds=-1))
+    cache.put_many({"key-1": 1.0})
+
+    cache.evict()
+
+    assert len(cache) == 0
+
+
+def test_dataset_cache_invalidates_changed_files(tmp_path):
+    cache = DatasetCache(tmp_path / "dataset.db")
+    cache.put_many([("test-1.yml", 1, 10, b"{}"), ("test-2.yml", 1, 10, b"{}")])
+
+    entries = cache.get_many([("test-1.yml", 1, 10), ("test-2.yml", 2, 10)])
+
+    assert entries == {"test-1.yml": b"{}"}
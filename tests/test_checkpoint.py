@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from linguametrica.checkpoint import CheckpointLog
+from linguametrica.testcase import TestResult
+
+HEADER = {"module": "tests.sample_pipeline:pipeline", "metrics": ["harmfulness"]}
+
+
+@pytest.fixture
+def checkpoint(tmp_path) -> CheckpointLog:
+    return CheckpointLog(tmp_path / "checkpoint.jsonl", flush_size=2)
+
+
+def test_from_directory(tmp_path):
+    checkpoint = CheckpointLog.from_directory(str(tmp_path))
+    shard_checkpoint = CheckpointLog.from_directory(str(tmp_path), (2, 4))
+
+    assert checkpoint.path == tmp_path / ".linguametrica" / "checkpoint.jsonl"
+    assert shard_checkpoint.path.name == "checkpoint-2-of-4.jsonl"
+
+
+def test_flush_in_batches(checkpoint: CheckpointLog):
+    checkpoint.start(HEADER)
+    checkpoint.append(TestResult(id="test-1", scores={}, error=None))
+
+    assert len(checkpoint.path.read_text().splitlines()) == 1
+
+    checkpoint.append(TestResult(id="test-2", scores={}, error=None))
+
+    assert len(checkpoint.path.read_text().splitlines()) == 3
+
+
+def test_resume(checkpoint: CheckpointLog):
+    checkpoint.start(HEADER)
+    checkpoint.append(TestResult(id="test-1", scores={}, error=None))
+    checkpoint.append(TestResult(id="test-2", scores={}, error="Error"))
+    checkpoint.close()
+
+    results = CheckpointLog(checkpoint.path).resume(HEADER)
+
+    assert list(results.keys()) == ["test-1"]
+    assert TestResult.model_validate_json(results["test-1"]).error is None
+
+
+def test_resume_failure_after_success(checkpoint: CheckpointLog):
+    checkpoint.start(HEADER)
+    checkpoint.append(TestResult(id="test-1", scores={}, error=None))
+    checkpoint.append(TestResult(id="test-1", scores={}, error="Error"))
+    checkpoint.close()
+
+    assert CheckpointLog(checkpoint.path).resume(HEADER) == {}
+
+
+def test_resume_truncated_log(checkpoint: CheckpointLog):
+    checkpoint.start(HEADER)
+    checkpoint.append(TestResult(id="test-1", scores={}, error=None))
+    checkpoint.close()
+
+    valid_content = checkpoint.path.read_text()
+
+    with open(checkpoint.path, "a") as f:
+        f.write('{"type": "result", "id": "test-2", "out')
+
+    resumed_checkpoint = CheckpointLog(checkpoint.path, flush_size=1)
+    results = resumed_checkpoint.resume(HEADER)
+
+    assert list(results.keys()) == ["test-1"]
+    assert checkpoint.path.read_text() == valid_content
+
+    resumed_checkpoint.append(TestResult(id="test-2", scores={}, error=None))
+    resumed_checkpoint.close()
+
+    lines = checkpoint.path.read_text().splitlines()
+
+    assert [json.loads(line)["type"] for line in lines] == [
+        "session",
+        "result",
+        "result",
+    ]
+
+
+def test_resume_different_settings(checkpoint: CheckpointLog):
+    checkpoint.start(HEADER)
+    checkpoint.close()
+
+    with pytest.raises(ValueError):
+        CheckpointLog(checkpoint.path).resume({**HEADER, "metrics": ["maliciousness"]})
+
+
+def test_resume_without_log(checkpoint: CheckpointLog):
+    assert checkpoint.resume(HEADER) == {}
+
+    checkpoint.close()
+
+    assert json.loads(checkpoint.path.read_text()) == {"type": "session", **HEADER}
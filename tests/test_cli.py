@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import pytest
+import typer
+
+from linguametrica.cli import _check_sample, _parse_shard
+
+
+def get_imported_packages(module_name: str):
+    # The module is imported in a fresh interpreter, because the tests already
+    # imported everything in this one.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module_name}; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+
+def test_cli_starts_without_loading_langchain():
+    packages = get_imported_packages("linguametrica.cli")
+
+    assert "linguametrica" in packages
+    assert packages.isdisjoint(
+        {"langchain_core", "langchain_openai", "openai", "dotenv", "pydantic", "numpy"}
+    )
+
+
+def test_session_loads_provider_sdks_on_demand():
+    packages = get_imported_packages("linguametrica.session")
+
+    assert "langchain_core" in packages
+    assert packages.isdisjoint({"langchain_openai", "openai", "dotenv"})
+
+
+def test_parse_shard():
+    assert _parse_shard(None) is None
+    assert _parse_shard("2/4") == (2, 4)
+
+
+def test_check_sample():
+    _check_sample(None, None)
+    _check_sample(10, None)
+    _check_sample(None, 0.5)
+
+    with pytest.raises(typer.BadParameter):
+        _check_sample(10, 0.5)
+
+    with pytest.raises(typer.BadParameter):
+        _check_sample(None, 0.0)
@@ -41,3 +41,33 @@ def test_project_config_no_metrics():
             kind=ApplicationKind.ChatApplication,
             metrics=[],
         )
+
+
+def test_project_config_invalid_rate_limit():
+    with pytest.raises(ValueError):
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.test_session:pipeline",
+            metrics=["harmfulness"],
+            rate_limit={"requests_per_minute": 0},
+        )
+
+
+def test_project_config_invalid_resilience():
+    with pytest.raises(ValueError):
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.test_session:pipeline",
+            metrics=["harmfulness"],
+            resilience={"timeout": 0},
+        )
+
+
+def test_project_config_invalid_http_client():
+    with pytest.raises(ValueError):
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.test_session:pipeline",
+            metrics=["harmfulness"],
+            http_client={"max_connections": 10, "max_keepalive_connections": 20},
+        )
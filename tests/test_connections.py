@@ -0,0 +1,52 @@
+import pytest
+
+from linguametrica.connections import configure_http_client, get_http_client
+from linguametrica.llm import create_llm
+
+
+def test_configure_http_client_keeps_client_with_same_settings():
+    configure_http_client(max_connections=10, max_keepalive_connections=5)
+    http_client = get_http_client()
+
+    configure_http_client(max_connections=10, max_keepalive_connections=5)
+
+    assert get_http_client() is http_client
+
+
+def test_configure_http_client_replaces_client_with_new_settings():
+    configure_http_client(max_connections=10, max_keepalive_connections=5)
+    http_client = get_http_client()
+
+    configure_http_client(max_connections=20, max_keepalive_connections=5)
+
+    assert get_http_client() is not http_client
+
+
+def test_llms_share_http_client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    first_llm = create_llm("OpenAI")
+    second_llm = create_llm("OpenAI")
+
+    assert first_llm.client._client._client is get_http_client()
+    assert second_llm.client._client._client is get_http_client()
+
+
+def test_create_openai_compatible_llm(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OPENAI_COMPATIBLE_BASE_URL", "http://localhost:8000/v1")
+    monkeypatch.setenv("OPENAI_COMPATIBLE_MODEL", "local-model")
+
+    llm = create_llm("OpenAICompatible")
+
+    assert llm.model_name == "local-model"
+    assert str(llm.client._client.base_url) == "http://localhost:8000/v1/"
+    assert llm.client._client._client is get_http_client()
+
+
+def test_create_openai_compatible_llm_requires_base_url(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setenv("OPENAI_COMPATIBLE_BASE_URL", "")
+
+    with pytest.raises(ValueError):
+        create_llm("OpenAICompatible")
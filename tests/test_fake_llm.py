@@ -0,0 +1,104 @@
+import json
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.session_throughput import BenchmarkResult, find_regressions
+from linguametrica.fake_llm import FakeChatModel
+from linguametrica.llm import create_llm
+from linguametrica.metrics import (
+    AspectCritiqueGroup,
+    HarmfulnessMetric,
+    MaliciousnessMetric,
+    MetricInput,
+)
+from linguametrica.resilience import ResilientRunnable
+
+
+def create_benchmark_result(test_cases: int, cases_per_second: float):
+    return BenchmarkResult(
+        test_cases=test_cases,
+        concurrency=8,
+        batch_size=32,
+        latency=0.0,
+        jitter=0.0,
+        metrics=["harmfulness"],
+        duration=test_cases / cases_per_second,
+        cases_per_second=cases_per_second,
+        overhead_per_case=1 / cases_per_second,
+        peak_rss_mb=100.0,
+        failed_cases=0,
+    )
+
+
+def test_fake_chat_model_is_deterministic():
+    llm = FakeChatModel()
+    messages = [HumanMessage(content="Write a poem")]
+
+    assert llm.invoke(messages).content == llm.invoke(messages).content
+    assert (
+        llm.invoke(messages).content != FakeChatModel(seed=1).invoke(messages).content
+    )
+
+
+def test_fake_chat_model_answers_verdict():
+    llm = FakeChatModel()
+    response = llm.invoke([HumanMessage(content="criteria: Is it harmful?\noutput:")])
+
+    assert response.content in ["0", "1"]
+
+
+def test_fake_chat_model_answers_verdict_per_criterion():
+    llm = FakeChatModel()
+    prompt = (
+        "criteria:\n- harmfulness: Is it harmful?\n- maliciousness: Is it?\noutput:"
+    )
+
+    verdicts = json.loads(llm.invoke([HumanMessage(content=prompt)]).content)
+
+    assert set(verdicts.keys()) == {"harmfulness", "maliciousness"}
+
+
+def test_fake_chat_model_reports_token_usage():
+    result = FakeChatModel(model_name="fake-model")._generate(
+        [HumanMessage(content="Write a poem")]
+    )
+
+    assert result.llm_output["model_name"] == "fake-model"
+    assert result.llm_output["token_usage"]["prompt_tokens"] > 0
+    assert result.llm_output["token_usage"]["completion_tokens"] > 0
+
+
+def test_create_fake_llm(monkeypatch):
+    monkeypatch.setenv("LINGUAMETRICA_FAKE_LATENCY", "0.5")
+
+    llm = create_llm("Fake")
+
+    assert isinstance(llm, ResilientRunnable)
+    assert llm.latency == 0.5
+
+
+def test_metrics_with_fake_llm():
+    harmfulness = HarmfulnessMetric()
+    harmfulness.init("Fake")
+
+    assert harmfulness.collect("Hello", "Hi", None) in [0, 1]
+
+    group = AspectCritiqueGroup([HarmfulnessMetric(), MaliciousnessMetric()])
+    group.init("Fake")
+
+    scores = group.collect_many([MetricInput(prompt="Hello", output="Hi")])
+
+    assert set(scores[0].keys()) == {"harmfulness", "maliciousness"}
+
+
+def test_find_regressions():
+    baseline = [
+        create_benchmark_result(100, 100.0),
+        create_benchmark_result(1000, 100.0),
+    ]
+    results = [create_benchmark_result(100, 85.0), create_benchmark_result(1000, 70.0)]
+
+    regressions = find_regressions(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("1000 test cases")
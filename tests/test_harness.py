@@ -2,6 +2,7 @@ import pytest
 from langchain_core.messages import HumanMessage
 
 from linguametrica.harness import TestHarness
+from linguametrica.recording import ResponseRecording
 
 
 def test_create_test_harness():
@@ -19,3 +20,20 @@ def test_can_invoke_pipeline():
     result = harness.invoke("Test, how are you?", messages)
 
     assert result is not None
+
+
+def test_replay_recorded_response(tmp_path):
+    recording = ResponseRecording(tmp_path / "responses.jsonl.gz")
+    input_hash = ResponseRecording.create_input_hash("Hello", [])
+    recording.add("test-1", input_hash, "Hi there!")
+
+    harness = TestHarness.create_from_recording(recording)
+
+    assert harness.invoke("Hello", [], test_case_id="test-1") == "Hi there!"
+
+    # A test case with the same input gets the same response, like a duplicate
+    # that wasn't executed while recording.
+    assert harness.invoke("Hello", [], test_case_id="test-2") == "Hi there!"
+
+    with pytest.raises(KeyError):
+        harness.invoke("Goodbye", [], test_case_id="test-1")
@@ -1,7 +1,16 @@
 import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from pytest_mock import MockFixture
 
+from linguametrica.cache import VerdictCache
 from linguametrica.config import ApplicationKind, ProjectConfig
-from linguametrica.metrics import HarmfulnessMetric, MaliciousnessMetric, get_metric
+from linguametrica.metrics import (
+    AspectCritiqueGroup,
+    HarmfulnessMetric,
+    MaliciousnessMetric,
+    MetricInput,
+    get_metric,
+)
 
 
 @pytest.fixture
@@ -35,6 +44,53 @@ def test_maliciousness_metric(project_config: ProjectConfig):
     assert 0.0 <= score <= 1.0
 
 
+def test_collect_many(mocker: MockFixture):
+    mocker.patch(
+        "linguametrica.metrics.create_llm",
+        return_value=FakeListChatModel(responses=["1", "0", "not a number"]),
+    )
+
+    metric = HarmfulnessMetric()
+    metric.init("OpenAI")
+
+    items = [MetricInput(prompt="Test", output=f"Response {i}") for i in range(3)]
+    scores = metric.collect_many(items, max_concurrency=1)
+
+    assert scores == [1.0, 0.0, None]
+
+
+def test_collect_many_cached(mocker: MockFixture, tmp_path):
+    llm = FakeListChatModel(responses=["1", "0", "1"])
+    mocker.patch("linguametrica.metrics.create_llm", return_value=llm)
+
+    metric = HarmfulnessMetric()
+    metric.init("OpenAI", cache=VerdictCache(tmp_path / "verdicts.db"))
+
+    items = [MetricInput(prompt="Test", output=f"Response {i}") for i in range(2)]
+
+    assert metric.collect_many(items, max_concurrency=1) == [1.0, 0.0]
+    assert metric.collect_many(items, max_concurrency=1) == [1.0, 0.0]
+    assert llm.i == 2
+
+
+def test_collect_critique_group(mocker: MockFixture):
+    llm = FakeListChatModel(
+        responses=['{"harmfulness": 1, "maliciousness": 0}', "not json"]
+    )
+    mocker.patch("linguametrica.metrics.create_llm", return_value=llm)
+
+    group = AspectCritiqueGroup([HarmfulnessMetric(), MaliciousnessMetric()])
+    group.init("OpenAI")
+
+    items = [MetricInput(prompt="Test", output=f"Response {i}") for i in range(2)]
+    scores = group.collect_many(items, max_concurrency=1)
+
+    assert scores == [
+        {"harmfulness": 1.0, "maliciousness": 0.0},
+        {"harmfulness": None, "maliciousness": None},
+    ]
+
+
 def test_get_metric():
     supported_metrics = {
         "harmfulness": HarmfulnessMetric,
@@ -0,0 +1,152 @@
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+from pytest_mock import MockFixture
+
+from linguametrica.llm import create_llm
+from linguametrica.ratelimit import (
+    MAX_THROTTLED_ATTEMPTS,
+    RateLimitedRunnable,
+    RateLimiter,
+    TokenBucket,
+    get_rate_limiter,
+    get_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class ThrottledError(Exception):
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("Too many requests")
+        self.response = httpx.Response(429, headers={"retry-after": "0"})
+
+
+def test_token_bucket_waits_for_budget(mocker: MockFixture):
+    clock = FakeClock()
+    mocker.patch("linguametrica.ratelimit.time", clock)
+
+    bucket = TokenBucket(60)
+
+    for _ in range(10):
+        bucket.acquire(1)
+
+    assert clock.now == 0.0
+
+    bucket.acquire(1)
+
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_adjust(mocker: MockFixture):
+    clock = FakeClock()
+    mocker.patch("linguametrica.ratelimit.time", clock)
+
+    bucket = TokenBucket(600)
+    bucket.acquire(100)
+    bucket.adjust(-50)
+    bucket.acquire(50)
+
+    assert clock.now == 0.0
+
+
+def test_rate_limiter_adapts_concurrency():
+    rate_limiter = RateLimiter()
+
+    assert rate_limiter.concurrency_limit is None
+
+    with rate_limiter.acquire(10):
+        with rate_limiter.acquire(10):
+            rate_limiter.record_throttled(0)
+
+    assert rate_limiter.concurrency_limit == 1.0
+    assert rate_limiter.throttled_requests == 1
+
+    rate_limiter.record_success()
+
+    assert rate_limiter.concurrency_limit == 2.0
+
+
+def test_get_retry_after():
+    def create_error(headers):
+        error = Exception()
+        error.response = httpx.Response(429, headers=headers)
+        return error
+
+    assert get_retry_after(create_error({"retry-after": "2"})) == 2.0
+    assert get_retry_after(create_error({"retry-after-ms": "500"})) == 0.5
+    assert get_retry_after(create_error({"retry-after": "Wed, 21 Oct 2015"})) is None
+    assert get_retry_after(Exception()) is None
+
+
+def test_rate_limited_runnable():
+    rate_limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=60_000)
+    llm = RateLimitedRunnable(FakeListChatModel(responses=["1", "0"]), rate_limiter)
+
+    responses = [llm.invoke("first"), llm.invoke("second")]
+
+    assert [response.content for response in responses] == ["1", "0"]
+    assert llm.responses == ["1", "0"]
+
+
+def test_rate_limited_runnable_without_llm():
+    llm = RateLimitedRunnable.__new__(RateLimitedRunnable)
+
+    assert not hasattr(llm, "responses")
+    assert getattr(llm, "responses", None) is None
+
+
+def test_rate_limited_runnable_retries_throttled_requests():
+    attempts = []
+
+    def throttle_once(input):
+        attempts.append(input)
+
+        if len(attempts) == 1:
+            raise ThrottledError()
+
+        return "1"
+
+    rate_limiter = RateLimiter()
+    llm = RateLimitedRunnable(RunnableLambda(throttle_once), rate_limiter)
+
+    assert llm.invoke("test") == "1"
+    assert len(attempts) == 2
+    assert rate_limiter.throttled_requests == 1
+    assert rate_limiter.concurrency_limit == 2.0
+
+
+def test_rate_limited_runnable_gives_up():
+    def throttle(_):
+        raise ThrottledError()
+
+    rate_limiter = RateLimiter()
+    llm = RateLimitedRunnable(RunnableLambda(throttle), rate_limiter)
+
+    with pytest.raises(ThrottledError):
+        llm.invoke("test")
+
+    assert rate_limiter.throttled_requests == MAX_THROTTLED_ATTEMPTS
+
+
+def test_create_llm_uses_shared_rate_limiter(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    first_llm = create_llm("OpenAI")
+    second_llm = create_llm("OpenAI")
+
+    assert first_llm.rate_limiter is get_rate_limiter("OpenAI")
+    assert second_llm.rate_limiter is first_llm.rate_limiter
+    assert first_llm.model_name == "gpt-3.5-turbo"
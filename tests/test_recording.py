@@ -0,0 +1,92 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from linguametrica.recording import ResponseRecording
+
+
+def test_save_and_load_recording(tmp_path):
+    recording_path = tmp_path / "responses.jsonl.gz"
+    input_hash = ResponseRecording.create_input_hash("Hello", [])
+
+    recording = ResponseRecording(recording_path)
+    recording.add("test-1", input_hash, "Hi there!")
+    recording.save()
+
+    loaded_recording = ResponseRecording.load(recording_path)
+
+    assert len(loaded_recording) == 1
+    assert loaded_recording.get("test-1", input_hash) == "Hi there!"
+
+
+def test_get_response_recorded_for_same_input(tmp_path):
+    recording_path = tmp_path / "responses.jsonl.gz"
+    input_hash = ResponseRecording.create_input_hash("Hello", [])
+
+    recording = ResponseRecording(recording_path)
+    recording.add("test-1", input_hash, "Hi there!")
+    recording.save()
+
+    loaded_recording = ResponseRecording.load(recording_path)
+
+    assert loaded_recording.get("test-2", input_hash) == "Hi there!"
+    assert loaded_recording.get("test-1", "other-hash") is None
+
+
+def test_create_input_hash_includes_history():
+    history = [HumanMessage(content="Hello"), AIMessage(content="Hi!")]
+
+    assert ResponseRecording.create_input_hash(
+        "Hello", history
+    ) != ResponseRecording.create_input_hash("Hello", [])
+
+
+def test_save_appends_to_recording(tmp_path):
+    recording_path = tmp_path / "responses.jsonl.gz"
+    first_hash = ResponseRecording.create_input_hash("Hello", [])
+    second_hash = ResponseRecording.create_input_hash("Goodbye", [])
+
+    recording = ResponseRecording(recording_path)
+    recording.add("test-1", first_hash, "Hi there!")
+    recording.save()
+
+    # A resumed run only executes the remaining test cases.
+    resumed_recording = ResponseRecording(recording_path)
+    resumed_recording.add("test-2", second_hash, "Bye!")
+    resumed_recording.save()
+
+    loaded_recording = ResponseRecording.load(recording_path)
+
+    assert loaded_recording.get("test-1", first_hash) == "Hi there!"
+    assert loaded_recording.get("test-2", second_hash) == "Bye!"
+
+
+def test_flush_recording_in_batches(tmp_path):
+    recording_path = tmp_path / "responses.jsonl.gz"
+    input_hash = ResponseRecording.create_input_hash("Hello", [])
+
+    recording = ResponseRecording(recording_path, flush_size=2)
+    recording.add("test-1", input_hash, "First")
+
+    assert not recording_path.exists()
+
+    recording.add("test-2", input_hash, "Second")
+
+    assert len(ResponseRecording.load(recording_path)) == 2
+
+
+def test_load_truncated_recording(tmp_path):
+    recording_path = tmp_path / "responses.jsonl.gz"
+    first_hash = ResponseRecording.create_input_hash("Hello", [])
+    second_hash = ResponseRecording.create_input_hash("Goodbye", [])
+
+    recording = ResponseRecording(recording_path, flush_size=1)
+    recording.add("test-1", first_hash, "First")
+    recording.add("test-2", second_hash, "Second")
+
+    # The process died while the second batch was appended.
+    data = recording_path.read_bytes()
+    recording_path.write_bytes(data[:-10])
+
+    loaded_recording = ResponseRecording.load(recording_path)
+
+    assert loaded_recording.get("test-1", first_hash) == "First"
+    assert loaded_recording.get("test-2", second_hash) is None
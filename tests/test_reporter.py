@@ -1,11 +1,29 @@
+import io
+import json
 import os
+import sys
 from pathlib import Path
 
 import pytest
 
 from linguametrica.config import OutputConfig
-from linguametrica.reporter import JsonReporter
+from linguametrica.events import (
+    CaseFinishedEvent,
+    CaseStartedEvent,
+    MetricScoredEvent,
+    SessionStartedEvent,
+)
+from linguametrica.reporter import (
+    LOG_INTERVAL,
+    ColumnarReporter,
+    JsonLinesReporter,
+    JsonReporter,
+    ProgressDisplay,
+    merge_result_files,
+)
 from linguametrica.session import SessionSummary, MetricSummary
+from linguametrica.testcase import TestCase, TestResult
+from linguametrica.usage import TokenUsage
 from datetime import timedelta
 
 
@@ -31,3 +49,216 @@ def test_json_reporter(output_path):
     )
 
     assert Path(output_path).exists()
+
+
+def test_merge_result_files(tmp_path):
+    result_files = []
+
+    for shard, scores in enumerate([[0.0, 1.0], [0.5]]):
+        result_file = str(tmp_path / f"shard-{shard}.jsonl")
+        reporter = JsonLinesReporter(
+            OutputConfig(output_path=result_file, output_format="jsonl")
+        )
+
+        for index, score in enumerate(scores):
+            test_case = TestCase(id=f"test-{shard}-{index}", input="Hello")
+            reporter.report_result(
+                test_case,
+                TestResult(id=test_case.id, scores={"test": score}, error=None),
+            )
+
+        reporter.generate_report(
+            SessionSummary(
+                metrics=[MetricSummary(name="test", min=0, max=1, mean=0.5)],
+                test_cases=len(scores),
+                failed_cases=0,
+                duration=timedelta(seconds=10 + shard),
+            )
+        )
+
+        result_files.append(result_file)
+
+    summary = merge_result_files(result_files)
+
+    assert summary.test_cases == 3
+    assert summary.duration == timedelta(seconds=11)
+    assert summary.metrics[0].mean == 0.5
+    assert summary.metrics[0].min == 0.0
+    assert summary.metrics[0].max == 1.0
+
+
+def test_json_lines_reporter_closes_after_failed_session(tmp_path):
+    output_path = tmp_path / "results.jsonl"
+    reporter = JsonLinesReporter(
+        OutputConfig(output_path=str(output_path), output_format="jsonl")
+    )
+
+    # The session fails while reporting the third result.
+    with pytest.raises(RuntimeError):
+        try:
+            for index in range(3):
+                if index == 2:
+                    raise RuntimeError("The session failed")
+
+                reporter.report_result(
+                    TestCase(id=f"test-{index}", input="Hello"),
+                    TestResult(
+                        id=f"test-{index}", scores={"harmfulness": 1.0}, error=None
+                    ),
+                )
+        finally:
+            reporter.close()
+
+    lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+
+    assert [line["id"] for line in lines] == ["test-0", "test-1"]
+
+
+def write_columnar_report(output_path: Path, output_format: str):
+    reporter = ColumnarReporter(
+        OutputConfig(output_path=str(output_path), output_format=output_format)
+    )
+
+    reporter.report_event(SessionStartedEvent(test_cases=3, metrics=["harmfulness"]))
+
+    for index in range(3):
+        test_case = TestCase(id=f"test-{index}", input="Hello")
+        reporter.report_result(
+            test_case,
+            TestResult(
+                id=test_case.id,
+                scores={"harmfulness": index / 2} if index > 0 else {},
+                error="Failed" if index == 0 else None,
+                timings={"pipeline": 1.0, "harmfulness": 2.0},
+                usage={
+                    "pipeline": TokenUsage(prompt_tokens=10, completion_tokens=5),
+                    "harmfulness": TokenUsage(
+                        prompt_tokens=100, completion_tokens=1, cost=0.5
+                    ),
+                },
+            ),
+        )
+
+    reporter.generate_report(
+        SessionSummary(
+            metrics=[MetricSummary(name="harmfulness", min=0.5, max=1, mean=0.75)],
+            test_cases=3,
+            failed_cases=1,
+            duration=timedelta(seconds=15),
+        )
+    )
+
+
+def test_columnar_reporter_writes_parquet(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    # Write every result in a separate record batch.
+    monkeypatch.setattr("linguametrica.reporter.RECORD_BATCH_SIZE", 1)
+
+    output_path = tmp_path / "results.parquet"
+    write_columnar_report(output_path, "parquet")
+
+    table = pq.read_table(output_path)
+
+    assert table.num_rows == 3
+    assert pq.ParquetFile(output_path).num_row_groups == 3
+    assert table.column("id").to_pylist() == ["test-0", "test-1", "test-2"]
+    assert table.column("error").to_pylist() == ["Failed", None, None]
+    assert table.column("score_harmfulness").to_pylist() == [None, 0.5, 1.0]
+    assert table.column("latency_harmfulness").to_pylist() == [2.0, 2.0, 2.0]
+    assert table.column("pipeline_prompt_tokens").to_pylist() == [10, 10, 10]
+    assert table.column("metric_prompt_tokens").to_pylist() == [100, 100, 100]
+    assert table.column("cost").to_pylist() == [0.5, 0.5, 0.5]
+
+
+def test_columnar_reporter_writes_arrow(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+
+    output_path = tmp_path / "results.arrow"
+    write_columnar_report(output_path, "arrow")
+
+    with pa.ipc.open_file(output_path) as reader:
+        table = reader.read_all()
+
+    assert table.num_rows == 3
+    assert table.column("score_harmfulness").to_pylist() == [None, 0.5, 1.0]
+
+
+def test_columnar_reporter_requires_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError):
+        ColumnarReporter(
+            OutputConfig(
+                output_path=str(tmp_path / "results.parquet"), output_format="parquet"
+            )
+        )
+
+
+def test_columnar_reporter_closes_after_failed_session(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    output_path = tmp_path / "results.parquet"
+    reporter = ColumnarReporter(
+        OutputConfig(output_path=str(output_path), output_format="parquet")
+    )
+
+    reporter.report_event(SessionStartedEvent(test_cases=3, metrics=["harmfulness"]))
+    reporter.report_result(
+        TestCase(id="test-1", input="Hello"),
+        TestResult(id="test-1", scores={"harmfulness": 1.0}, error=None),
+    )
+    reporter.close()
+
+    assert pq.read_table(output_path).column("id").to_pylist() == ["test-1"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_progress_display():
+    clock = FakeClock()
+    progress = ProgressDisplay(io.StringIO(), clock=clock, auto_refresh=False)
+
+    progress.handle(SessionStartedEvent(test_cases=4))
+
+    for index in range(3):
+        progress.handle(CaseStartedEvent(test_case_id=f"test-{index}"))
+
+    clock.now = 10.0
+
+    progress.handle(
+        MetricScoredEvent(test_case_id="test-0", metric="harmfulness", score=0.5)
+    )
+    progress.handle(CaseFinishedEvent(test_case_id="test-0"))
+    progress.handle(CaseFinishedEvent(test_case_id="test-1", error="Failed"))
+
+    assert progress.describe() == (
+        "2/4 test cases | 0.2 cases/s | ETA 0:00:10 | 1 in flight | 1 failed | "
+        "harmfulness 0.500"
+    )
+
+
+def test_progress_display_writes_lines_when_not_interactive():
+    clock = FakeClock()
+    stream = io.StringIO()
+    progress = ProgressDisplay(stream, clock=clock, auto_refresh=False)
+
+    progress.handle(SessionStartedEvent())
+
+    for index in range(5):
+        clock.now = index * LOG_INTERVAL / 2
+        progress.handle(CaseFinishedEvent(test_case_id=f"test-{index}"))
+
+    assert stream.getvalue().splitlines() == [
+        "0 test cases | 0.0 cases/s | 0 in flight | 0 failed",
+        "3 test cases | 0.3 cases/s | 0 in flight | 0 failed",
+        "5 test cases | 0.2 cases/s | 0 in flight | 0 failed",
+    ]
@@ -0,0 +1,173 @@
+import pytest
+from langchain_core.runnables import RunnableLambda
+from pytest_mock import MockFixture
+
+from linguametrica.llm import create_llm
+from linguametrica.resilience import (
+    CallStats,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientRunnable,
+    RetryPolicy,
+    get_retry_policy,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+def test_circuit_breaker_opens_and_recovers(mocker: MockFixture):
+    clock = FakeClock()
+    mocker.patch("linguametrica.resilience.time", clock)
+
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    circuit_breaker.record_failure()
+    circuit_breaker.before_call()
+    circuit_breaker.record_failure()
+
+    assert circuit_breaker.is_open
+
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_call()
+
+    clock.sleep(10)
+
+    # Only a single trial call is let through after the reset timeout.
+    circuit_breaker.before_call()
+
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_call()
+
+    circuit_breaker.record_success()
+
+    assert not circuit_breaker.is_open
+
+
+def test_circuit_breaker_reopens_after_failed_trial(mocker: MockFixture):
+    clock = FakeClock()
+    mocker.patch("linguametrica.resilience.time", clock)
+
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    circuit_breaker.record_failure()
+
+    clock.sleep(10)
+    circuit_breaker.before_call()
+    circuit_breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.before_call()
+
+
+def test_retry_policy_backoff_is_bounded():
+    retry_policy = RetryPolicy()
+
+    for retry in range(1, 10):
+        backoff = retry_policy.get_backoff(retry)
+        assert 0 <= backoff <= min(8.0, 0.5 * 2 ** (retry - 1))
+
+
+def test_resilient_runnable_retries_transient_errors(mocker: MockFixture):
+    mocker.patch("linguametrica.resilience.time", FakeClock())
+    attempts = []
+
+    def fail_once(input):
+        attempts.append(input)
+
+        if len(attempts) == 1:
+            raise ServerError()
+
+        return "1"
+
+    retry_policy = RetryPolicy()
+    llm = ResilientRunnable(RunnableLambda(fail_once), retry_policy)
+
+    assert llm.invoke("test") == "1"
+    assert len(attempts) == 2
+    assert retry_policy.take_stats() == CallStats(retries=1)
+    assert retry_policy.take_stats() == CallStats()
+
+
+def test_resilient_runnable_without_llm():
+    llm = ResilientRunnable.__new__(ResilientRunnable)
+
+    assert not hasattr(llm, "model_name")
+    assert getattr(llm, "model_name", None) is None
+
+
+def test_resilient_runnable_counts_timeouts(mocker: MockFixture):
+    mocker.patch("linguametrica.resilience.time", FakeClock())
+
+    def time_out(_):
+        raise TimeoutError()
+
+    retry_policy = RetryPolicy(max_retries=2)
+    llm = ResilientRunnable(RunnableLambda(time_out), retry_policy)
+
+    with pytest.raises(TimeoutError):
+        llm.invoke("test")
+
+    assert retry_policy.take_stats() == CallStats(retries=2, timeouts=3)
+
+
+def test_resilient_runnable_does_not_retry_bad_requests():
+    attempts = []
+
+    def bad_request(input):
+        attempts.append(input)
+        raise BadRequestError()
+
+    retry_policy = RetryPolicy(failure_threshold=1)
+    llm = ResilientRunnable(RunnableLambda(bad_request), retry_policy)
+
+    with pytest.raises(BadRequestError):
+        llm.invoke("test")
+
+    assert len(attempts) == 1
+    assert not retry_policy.circuit_breaker.is_open
+
+
+def test_resilient_runnable_fails_fast_when_circuit_is_open(mocker: MockFixture):
+    mocker.patch("linguametrica.resilience.time", FakeClock())
+    attempts = []
+
+    def fail(input):
+        attempts.append(input)
+        raise ServerError()
+
+    retry_policy = RetryPolicy(max_retries=5, failure_threshold=2)
+    llm = ResilientRunnable(RunnableLambda(fail), retry_policy)
+
+    with pytest.raises(CircuitOpenError):
+        llm.invoke("test")
+
+    with pytest.raises(CircuitOpenError):
+        llm.invoke("test")
+
+    assert len(attempts) == 2
+    assert retry_policy.take_stats() == CallStats(retries=2, rejected_calls=2)
+
+
+def test_create_llm_uses_retry_policy(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    llm = create_llm("OpenAI")
+
+    assert llm.retry_policy is get_retry_policy("OpenAI")
+    assert llm.request_timeout == llm.retry_policy.timeout
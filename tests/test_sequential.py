@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+from linguametrica.sequential import SequentialSampling, StopReason
+from linguametrica.statistics import RunningStatistics
+
+
+def create_statistics(values) -> RunningStatistics:
+    statistics = RunningStatistics()
+
+    for value in values:
+        statistics.add(value)
+
+    return statistics
+
+
+def test_stop_at_precision():
+    sampling = SequentialSampling(tolerance=0.1, min_test_cases=10)
+
+    precise = create_statistics([0.0, 1.0] * 100)
+    imprecise = create_statistics([0.0, 1.0] * 10)
+
+    assert sampling.check({"harmfulness": precise}, 0.0, None) == StopReason.Precision
+    assert sampling.check({"harmfulness": imprecise}, 0.0, None) is None
+    assert (
+        sampling.check({"harmfulness": precise, "maliciousness": imprecise}, 0.0, None)
+        is None
+    )
+
+
+def test_minimum_test_cases():
+    sampling = SequentialSampling(tolerance=0.1)
+    statistics = create_statistics([0.0] * 29)
+
+    assert sampling.check({"harmfulness": statistics}, 0.0, None) is None
+
+    statistics.add(0.0)
+
+    assert (
+        sampling.check({"harmfulness": statistics}, 0.0, None) == StopReason.Precision
+    )
+
+
+def test_margin_of_error_without_spread():
+    sampling = SequentialSampling(tolerance=0.01)
+    statistics = create_statistics([1.0] * 100)
+
+    # The scores are smoothed with an extra 0 and 1, so the same score for every
+    # test case doesn't make the mean precise.
+    assert sampling.get_margin_of_error(statistics) > 0.01
+    assert sampling.check({"harmfulness": statistics}, 0.0, None) is None
+
+
+def test_stop_at_budgets():
+    sampling = SequentialSampling(max_duration=60.0, max_cost=1.0)
+    scores = {"harmfulness": create_statistics([0.5])}
+
+    assert sampling.check(scores, 30.0, 0.5) is None
+    assert sampling.check(scores, 60.0, 0.5) == StopReason.TimeBudget
+    assert sampling.check(scores, 30.0, 1.0) == StopReason.CostBudget
+    assert sampling.check(scores, 30.0, None) is None
+
+
+def test_margin_of_error():
+    sampling = SequentialSampling(tolerance=0.1)
+    statistics = create_statistics([0.0, 1.0] * 50)
+    smoothed = create_statistics([0.0, 1.0] * 51)
+
+    expected = 1.959964 * smoothed.std / math.sqrt(102)
+
+    assert sampling.get_margin_of_error(statistics) == pytest.approx(expected)
+    assert sampling.get_margin_of_error(RunningStatistics()) == math.inf
+
+
+def test_invalid_sampling():
+    with pytest.raises(ValueError):
+        SequentialSampling()
+
+    with pytest.raises(ValueError):
+        SequentialSampling(tolerance=0.0)
+
+    with pytest.raises(ValueError):
+        SequentialSampling(max_cost=-1.0)
@@ -1,21 +1,98 @@
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
 from pathlib import Path
+from uuid import uuid4
 
 import pytest
+from langchain_core.outputs import LLMResult
 from pydantic_yaml import to_yaml_file
 from pytest_mock import MockFixture
 
+from linguametrica.cache import ResultStore, VerdictCache
+from linguametrica.checkpoint import CheckpointLog
 from linguametrica.config import ApplicationKind, ProjectConfig
+from linguametrica.events import (
+    CaseFinishedEvent,
+    CaseStartedEvent,
+    MetricScoredEvent,
+    SessionStartedEvent,
+)
 from linguametrica.harness import TestHarness
 from linguametrica.metrics import Metric
-from linguametrica.session import Session
-from linguametrica.testcase import TestCase
+from linguametrica.sequential import SequentialSampling
+from linguametrica.session import Session, SummaryBuilder
+from linguametrica.testcase import TestCase, TestCaseCollection, TestResult
+from linguametrica.usage import TokenUsage
+
+
+class FakeHarness:
+    def invoke(self, prompt, history, test_case_id=None, callbacks=None):
+        return f"Response to {prompt}"
+
+    def save_recording(self):
+        pass
+
+
+class FakeMetric(Metric):
+    def init(self, llm_provider, cache=None):
+        pass
+
+    def collect(self, prompt, output, context):
+        return 0.5
+
+    @property
+    def name(self):
+        return "harmfulness"
+
+
+class CachingMetric(FakeMetric):
+    def init(self, llm_provider, cache=None):
+        self.cache = cache
+
+    def collect(self, prompt, output, context):
+        key = VerdictCache.create_key(prompt)
+        self.cache.put_many({key: 0.5})
+
+        return self.cache.get_many([key])[key]
+
+
+def create_caching_session(cache_path: Path) -> Session:
+    return Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        FakeHarness(),
+        [CachingMetric()],
+        [],
+        cache=VerdictCache(cache_path),
+    )
+
+
+def create_fake_session() -> Session:
+    return Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        FakeHarness(),
+        [FakeMetric()],
+        [],
+    )
 
 
 @pytest.fixture
 def metric(mocker: MockFixture) -> Metric:
     metric_instance = mocker.MagicMock()
     metric_instance.collect.return_value = 0.5
+    metric_instance.collect_many.side_effect = lambda items, **kwargs: [
+        0.5 for _ in items
+    ]
 
     name_property = mocker.PropertyMock(return_value="harmfulness")
     type(metric_instance).name = name_property
@@ -60,6 +137,33 @@ def project_config(tmp_path):
     shutil.rmtree(project_directory)
 
 
+def test_full_sample_selects_the_test_cases_of_a_full_run(project_config: str):
+    data_directory = Path(project_config) / "data"
+
+    for group in ["billing", "support"]:
+        (data_directory / group).mkdir()
+
+        for index in range(3):
+            to_yaml_file(
+                data_directory / group / f"{group}-{index}.yml",
+                TestCase(id=f"{group}-{index}", input=f"Question {index}"),
+            )
+
+    full_run = Session.from_directory(project_config)
+    full_sample = Session.from_directory(project_config, sample_fraction=1.0)
+
+    test_case_ids = [test_case.id for test_case in full_run.test_cases]
+
+    assert len(test_case_ids) == 7
+    assert [test_case.id for test_case in full_sample.test_cases] == test_case_ids
+
+
+def test_load_session_writes_checkpoint_only_when_asked(project_config: str):
+    assert Session.from_directory(project_config).checkpoint is None
+    assert Session.from_directory(project_config, checkpoint=True).checkpoint
+    assert Session.from_directory(project_config, resume=True).checkpoint
+
+
 def test_load_session(project_config: str):
     session = Session.from_directory(project_config)
 
@@ -83,3 +187,722 @@ def test_run_session(test_case, metric, test_harness):
     results = session.run()
 
     assert results is not None
+    assert [latency.stage for latency in results.latencies] == [
+        "pipeline",
+        "harmfulness",
+    ]
+
+
+class TimedMetric(FakeMetric):
+    def collect_many(self, items, max_concurrency=None, callbacks=None):
+        # Reports a call of a different duration for every test case, except the
+        # first one, which acts as if its verdict was cached.
+        for index, callback in enumerate(callbacks[1:], start=1):
+            run_id = uuid4()
+            callback.on_llm_start({}, ["Hello"], run_id=run_id)
+            time.sleep(index / 10)
+            callback.on_llm_end(LLMResult(generations=[[]]), run_id=run_id)
+
+        return [0.5 for _ in items]
+
+
+def test_run_session_measures_metric_latency_per_test_case():
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        FakeHarness(),
+        [TimedMetric()],
+        [TestCase(id=f"test-{index}", input=f"Hello {index}") for index in range(3)],
+    )
+
+    timings = {}
+    session.run(
+        on_result=lambda test_case, result: timings.update(
+            {result.id: result.timings.get("harmfulness")}
+        )
+    )
+
+    assert timings["test-0"] is None
+    assert timings["test-1"] == pytest.approx(0.1, abs=0.05)
+    assert timings["test-2"] == pytest.approx(0.2, abs=0.05)
+
+
+class UncollectableMetric(FakeMetric):
+    def collect(self, prompt, output, context):
+        return None
+
+    @property
+    def name(self):
+        return "maliciousness"
+
+
+def test_run_session_keeps_scores_when_metric_is_none():
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness", "maliciousness"],
+        ),
+        FakeHarness(),
+        [FakeMetric(), UncollectableMetric()],
+        [TestCase(id=f"test-{index}", input=f"Hello {index}") for index in range(2)],
+    )
+
+    results = []
+    summary = session.run(on_result=lambda test_case, result: results.append(result))
+
+    assert summary.failed_cases == 0
+    assert [result.scores for result in results] == [
+        {"harmfulness": 0.5, "maliciousness": None}
+    ] * 2
+
+    harmfulness, maliciousness = summary.metrics
+
+    assert harmfulness.count == 2
+    assert maliciousness.count == 0
+    assert maliciousness.none_scores == 2
+
+
+def test_summary_builder_latencies():
+    summary_builder = SummaryBuilder(["harmfulness"])
+
+    for index in range(100):
+        summary_builder.add(
+            TestResult(
+                scores={"harmfulness": 0.5},
+                error=None,
+                timings={"pipeline": (index + 1) / 100},
+            )
+        )
+
+    [latency] = summary_builder.build(timedelta(seconds=1)).latencies
+
+    # The percentiles are estimated with a quantile sketch, the maximum is exact.
+    assert latency.stage == "pipeline"
+    assert latency.p50 == pytest.approx(0.5, abs=0.01)
+    assert latency.p90 == pytest.approx(0.9, abs=0.01)
+    assert latency.p99 == pytest.approx(0.99, abs=0.01)
+    assert latency.max == 1.0
+
+
+def test_summary_builder_counts_missing_scores():
+    summary_builder = SummaryBuilder(["harmfulness"])
+
+    summary_builder.add(TestResult(scores={"harmfulness": 1.0}, error=None))
+    summary_builder.add(TestResult(scores={"harmfulness": 0.0}, error=None))
+    summary_builder.add(TestResult(scores={"harmfulness": None}, error=None))
+    summary_builder.add(TestResult(scores={}, error="Failed"))
+
+    [metric_summary] = summary_builder.build(timedelta(seconds=1)).metrics
+
+    assert metric_summary.count == 2
+    assert metric_summary.mean == 0.5
+    assert metric_summary.std == pytest.approx(0.7071, abs=1e-4)
+    assert metric_summary.none_scores == 1
+    assert metric_summary.missing_scores == 1
+
+
+def test_summary_builder_merge():
+    summary_builders = [SummaryBuilder(["harmfulness"]) for _ in range(2)]
+
+    for index in range(10):
+        summary_builders[index % 2].add(
+            TestResult(scores={"harmfulness": float(index)}, error=None)
+        )
+
+    summary_builders[0].merge(summary_builders[1])
+    [metric_summary] = summary_builders[0].build(timedelta(seconds=1)).metrics
+
+    assert metric_summary.count == 10
+    assert metric_summary.mean == pytest.approx(4.5)
+    assert metric_summary.std == pytest.approx(3.0277, abs=1e-4)
+    assert metric_summary.min == 0.0
+    assert metric_summary.max == 9.0
+
+
+def test_summary_builder_bootstrap():
+    summary_builder = SummaryBuilder(["harmfulness"], bootstrap_resamples=500)
+
+    for index in range(101):
+        summary_builder.add(
+            TestResult(scores={"harmfulness": float(index)}, error=None)
+        )
+
+    [metric_summary] = summary_builder.build(timedelta(seconds=1)).metrics
+
+    assert metric_summary.p5 == 5.0
+    assert metric_summary.median == 50.0
+    assert metric_summary.p95 == 95.0
+    assert metric_summary.ci_lower < 50.0 < metric_summary.ci_upper
+
+
+def test_summary_builder_usage():
+    summary_builder = SummaryBuilder(["harmfulness"])
+
+    for _ in range(2):
+        summary_builder.add(
+            TestResult(
+                scores={"harmfulness": 0.5},
+                error=None,
+                usage={
+                    "pipeline": TokenUsage(prompt_tokens=100, completion_tokens=10),
+                    "harmfulness": TokenUsage(prompt_tokens=50, completion_tokens=1),
+                },
+            )
+        )
+
+    summary = summary_builder.build(timedelta(seconds=1))
+
+    assert summary.usage["pipeline"].prompt_tokens == 200
+    assert summary.usage["harmfulness"].completion_tokens == 2
+    assert summary.total_usage.total_tokens == 322
+
+
+def test_run_session_concurrently(metric, test_harness):
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(10)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        test_cases,
+        concurrency=4,
+    )
+
+    test_results = []
+    results = session.run(
+        on_result=lambda test_case, result: test_results.append(test_case.id)
+    )
+
+    assert results.test_cases == 10
+    assert test_results == [test_case.id for test_case in test_cases]
+    assert test_harness.invoke.call_count == 10
+
+
+def test_run_session_scores_batches(metric, test_harness):
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(10)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        test_cases,
+        batch_size=4,
+    )
+
+    test_results = []
+    session.run(on_result=lambda test_case, result: test_results.append(result))
+
+    assert metric.collect_many.call_count == 3
+    assert all(result.scores["harmfulness"] == 0.5 for result in test_results)
+
+
+def test_run_session_with_failed_cases(metric, test_harness):
+    test_harness.invoke.side_effect = [RuntimeError("Pipeline failed"), "Response"]
+
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(2)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        test_cases,
+    )
+
+    results = session.run()
+
+    assert results.test_cases == 2
+    assert results.failed_cases == 1
+    assert results.metrics[0].mean == 0.5
+
+
+def test_run_session_reports_events(metric, test_harness):
+    test_harness.invoke.side_effect = [RuntimeError("Pipeline failed"), "Response"]
+
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(2)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        test_cases,
+    )
+
+    events = []
+    session.run(on_event=events.append)
+
+    assert events[0] == SessionStartedEvent(test_cases=2, metrics=["harmfulness"])
+    assert sorted(events[1:3], key=lambda event: event.test_case_id) == [
+        CaseStartedEvent(test_case_id="test-0"),
+        CaseStartedEvent(test_case_id="test-1"),
+    ]
+    assert events[3:] == [
+        CaseFinishedEvent(
+            test_case_id="test-0",
+            error="Error while running the test case: Pipeline failed",
+        ),
+        MetricScoredEvent(test_case_id="test-1", metric="harmfulness", score=0.5),
+        CaseFinishedEvent(test_case_id="test-1"),
+    ]
+
+
+def test_invalid_concurrency(metric, test_harness, test_case):
+    with pytest.raises(ValueError):
+        Session(
+            ProjectConfig(
+                kind=ApplicationKind.ChatApplication,
+                module="tests.sample_pipeline:pipeline",
+                metrics=["harmfulness"],
+            ),
+            test_harness,
+            [metric],
+            [test_case],
+            concurrency=0,
+        )
+
+
+def test_run_session_on_workers():
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(10)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        None,
+        [],
+        test_cases,
+        batch_size=3,
+        workers=2,
+        worker_factory=create_fake_session,
+    )
+
+    test_results = []
+    results = session.run(
+        on_result=lambda test_case, result: test_results.append(test_case.id)
+    )
+
+    assert results.test_cases == 10
+    assert results.failed_cases == 0
+    assert results.metrics[0].mean == 0.5
+    assert test_results == [test_case.id for test_case in test_cases]
+
+
+def test_run_session_on_workers_with_shared_cache(tmp_path):
+    cache_path = tmp_path / "cache" / "verdicts.db"
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(200)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        None,
+        [],
+        test_cases,
+        batch_size=2,
+        workers=2,
+        worker_factory=partial(create_caching_session, cache_path),
+    )
+
+    results = session.run()
+    keys = [VerdictCache.create_key(test_case.input) for test_case in test_cases]
+
+    assert results.failed_cases == 0
+    assert len(VerdictCache(cache_path).get_many(keys)) == 200
+
+
+def test_run_session_shards(metric, test_harness):
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(20)
+    ]
+
+    test_results = []
+
+    for shard_index in range(1, 4):
+        session = Session(
+            ProjectConfig(
+                kind=ApplicationKind.ChatApplication,
+                module="tests.sample_pipeline:pipeline",
+                metrics=["harmfulness"],
+            ),
+            test_harness,
+            [metric],
+            test_cases,
+            shard=(shard_index, 3),
+        )
+
+        session.run(on_result=lambda test_case, result: test_results.append(result.id))
+
+    assert sorted(test_results) == sorted(test_case.id for test_case in test_cases)
+
+
+def test_run_session_incrementally(metric, test_harness, tmp_path):
+    result_store = ResultStore(tmp_path / "results.db")
+
+    def run_session(test_cases):
+        session = Session(
+            ProjectConfig(
+                kind=ApplicationKind.ChatApplication,
+                module="tests.sample_pipeline:pipeline",
+                metrics=["harmfulness"],
+            ),
+            test_harness,
+            [metric],
+            test_cases,
+            result_store=result_store,
+        )
+
+        return session.run()
+
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(5)
+    ]
+
+    run_session(test_cases)
+    test_cases[2] = TestCase(id="test-2", history=[], input="Changed question")
+    summary = run_session(test_cases)
+
+    assert summary.test_cases == 5
+    assert summary.metrics[0].mean == 0.5
+    assert test_harness.invoke.call_count == 6
+
+
+def test_resume_session(metric, test_harness, tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+
+    def run_session(test_cases, resume):
+        session = Session(
+            ProjectConfig(
+                kind=ApplicationKind.ChatApplication,
+                module="tests.sample_pipeline:pipeline",
+                metrics=["harmfulness"],
+            ),
+            test_harness,
+            [metric],
+            test_cases,
+            checkpoint=CheckpointLog(checkpoint_path),
+            resume=resume,
+        )
+
+        return session.run()
+
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(5)
+    ]
+
+    # The session was interrupted after the first three test cases, and the third
+    # one failed.
+    test_harness.invoke.side_effect = [
+        "Response 0",
+        "Response 1",
+        Exception("Failed"),
+    ]
+    run_session(test_cases[:3], resume=False)
+
+    test_harness.invoke.reset_mock()
+    test_harness.invoke.side_effect = None
+    summary = run_session(test_cases, resume=True)
+
+    assert test_harness.invoke.call_count == 3
+    assert summary.test_cases == 5
+    assert summary.failed_cases == 0
+    assert summary.metrics[0].mean == 0.5
+
+
+def test_resume_without_checkpoint(metric, test_harness, test_case):
+    with pytest.raises(ValueError):
+        Session(
+            ProjectConfig(
+                kind=ApplicationKind.ChatApplication,
+                module="tests.sample_pipeline:pipeline",
+                metrics=["harmfulness"],
+            ),
+            test_harness,
+            [metric],
+            [test_case],
+            resume=True,
+        )
+
+
+def test_run_session_sequentially(metric, test_harness):
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index}")
+        for index in range(200)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        test_cases,
+        batch_size=10,
+        sampling=SequentialSampling(tolerance=0.05, min_test_cases=25),
+    )
+
+    executed_ids = []
+    summary = session.run(
+        on_result=lambda test_case, _: executed_ids.append(test_case.id)
+    )
+
+    # Every score is the same, so the metric is precise after a few scores, and the
+    # batch that was running is completed.
+    assert summary.test_cases == 30
+    assert summary.available_test_cases == 200
+    assert summary.stop_reason == "precision"
+    assert test_harness.invoke.call_count == 30
+    assert executed_ids != [test_case.id for test_case in test_cases[:30]]
+
+
+def test_run_session_sequentially_loads_test_cases_lazily(
+    tmp_path, mocker, metric, test_harness
+):
+    for index in range(200):
+        to_yaml_file(
+            tmp_path / f"test-{index}.yml",
+            TestCase(id=f"test-{index}", input=f"Question {index}"),
+        )
+
+    load = mocker.spy(TestCase, "load")
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        TestCaseCollection.from_directory(tmp_path),
+        batch_size=10,
+        sampling=SequentialSampling(tolerance=0.05, min_test_cases=25),
+    )
+
+    summary = session.run()
+
+    assert summary.test_cases == 30
+    assert summary.available_test_cases == 200
+    assert load.call_count < 200
+
+
+class CallingMetric(FakeMetric):
+    def collect_many(self, items, max_concurrency=None, callbacks=None):
+        # Makes one LLM call per test case, except for cached verdicts.
+        for item, callback in zip(items, callbacks):
+            if item.prompt != "Cached":
+                run_id = uuid4()
+                callback.on_llm_start({}, [item.prompt], run_id=run_id)
+                callback.on_llm_end(LLMResult(generations=[[]]), run_id=run_id)
+
+        return [0.5 for _ in items]
+
+
+def create_deduplicating_session(harness, test_cases, **kwargs) -> Session:
+    return Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        harness,
+        [CallingMetric()],
+        test_cases,
+        deduplicate=True,
+        **kwargs,
+    )
+
+
+def test_run_session_deduplicates(test_harness):
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input=f"Question {index % 3}")
+        for index in range(9)
+    ] + [TestCase(id=f"cached-{index}", input="Cached") for index in range(2)]
+
+    session = create_deduplicating_session(test_harness, test_cases, batch_size=2)
+
+    results = []
+    summary = session.run(on_result=lambda _, test_result: results.append(test_result))
+
+    assert test_harness.invoke.call_count == 4
+    assert [test_result.id for test_result in results] == [
+        test_case.id for test_case in test_cases
+    ]
+    assert all(test_result.scores == {"harmfulness": 0.5} for test_result in results)
+    assert summary.test_cases == 11
+    assert summary.duplicate_cases == 7
+
+    # The harness doesn't call an LLM and the verdict of the last duplicate was
+    # cached, so only the metric calls of the other duplicates were saved.
+    assert summary.saved_calls == 6
+
+
+class FlakyHarness(FakeHarness):
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt, history, test_case_id=None, callbacks=None):
+        self.prompts.append(prompt)
+
+        if self.prompts.count(prompt) == 1 and prompt == "Question 0":
+            raise RuntimeError("Timeout")
+
+        return super().invoke(prompt, history, test_case_id, callbacks)
+
+
+# With a single batch, the duplicates are waiting for the failed test case when
+# its result comes back.
+@pytest.mark.parametrize("batch_size", [2, 6])
+def test_run_session_executes_duplicates_of_failed_test_case(batch_size):
+    test_cases = [
+        TestCase(id=f"test-{index}", input=f"Question {index % 2}")
+        for index in range(6)
+    ]
+
+    harness = FlakyHarness()
+    session = create_deduplicating_session(harness, test_cases, batch_size=batch_size)
+
+    results = []
+    summary = session.run(on_result=lambda _, test_result: results.append(test_result))
+
+    assert [test_result.id for test_result in results] == [
+        test_case.id for test_case in test_cases
+    ]
+    assert results[0].error is not None
+    assert all(test_result.error is None for test_result in results[1:])
+    assert harness.prompts == ["Question 0", "Question 1", "Question 0"]
+    assert summary.duplicate_cases == 3
+
+
+class FailOnceHarness(FakeHarness):
+    def __init__(self, marker_path: Path):
+        self.marker_path = marker_path
+
+    def invoke(self, prompt, history, test_case_id=None, callbacks=None):
+        # The workers don't share memory, so the first failure is marked on disk.
+        if prompt == "Question 0" and not self.marker_path.exists():
+            self.marker_path.touch()
+            raise RuntimeError("Timeout")
+
+        return super().invoke(prompt, history, test_case_id, callbacks)
+
+
+def create_failing_session(marker_path: Path) -> Session:
+    return Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        FailOnceHarness(marker_path),
+        [FakeMetric()],
+        [],
+    )
+
+
+def test_run_session_reuses_workers_for_duplicates_of_failed_test_case(
+    mocker: MockFixture, tmp_path
+):
+    executor_class = mocker.patch(
+        "linguametrica.session.ProcessPoolExecutor", side_effect=ProcessPoolExecutor
+    )
+
+    test_cases = [
+        TestCase(id=f"test-{index}", input=f"Question {index % 2}")
+        for index in range(4)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        None,
+        [],
+        test_cases,
+        batch_size=2,
+        workers=2,
+        worker_factory=partial(create_failing_session, tmp_path / "failed"),
+        deduplicate=True,
+    )
+
+    results = []
+    summary = session.run(on_result=lambda _, test_result: results.append(test_result))
+
+    # The duplicates of the failed test case are executed in a second round, after
+    # all the batches were handed out.
+    assert [test_result.id for test_result in results] == [
+        test_case.id for test_case in test_cases
+    ]
+    assert results[0].error is not None
+    assert all(test_result.error is None for test_result in results[1:])
+    assert summary.duplicate_cases == 1
+    assert executor_class.call_count == 1
+
+
+def test_run_session_without_deduplication(metric, test_harness):
+    test_cases = [
+        TestCase(id=f"test-{index}", history=[], input="Question") for index in range(3)
+    ]
+
+    session = Session(
+        ProjectConfig(
+            kind=ApplicationKind.ChatApplication,
+            module="tests.sample_pipeline:pipeline",
+            metrics=["harmfulness"],
+        ),
+        test_harness,
+        [metric],
+        test_cases,
+    )
+
+    summary = session.run()
+
+    assert test_harness.invoke.call_count == 3
+    assert summary.duplicate_cases == 0
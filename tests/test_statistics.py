@@ -0,0 +1,141 @@
+import math
+import random
+import time
+
+import numpy as np
+import pytest
+
+from linguametrica.statistics import (
+    RunningStatistics,
+    ScoreSample,
+    TDigest,
+    bootstrap_mean_interval,
+    percentiles,
+)
+
+
+def test_tdigest_estimates_quantiles():
+    generator = random.Random(42)
+    values = [generator.random() for _ in range(10_000)]
+
+    digest = TDigest()
+
+    for value in values:
+        digest.add(value)
+
+    sorted_values = sorted(values)
+
+    for q in [0.01, 0.5, 0.9, 0.99]:
+        expected = sorted_values[int(q * len(values))]
+        assert digest.quantile(q) == pytest.approx(expected, abs=0.01)
+
+    assert digest.quantile(0) == sorted_values[0]
+    assert digest.quantile(1) == sorted_values[-1]
+
+
+def test_tdigest_merge():
+    generator = random.Random(42)
+    digests = [TDigest() for _ in range(4)]
+
+    for index in range(10_000):
+        digests[index % 4].add(generator.random())
+
+    for digest in digests[1:]:
+        digests[0].merge(digest)
+
+    assert digests[0].count == 10_000
+    assert digests[0].quantile(0.5) == pytest.approx(0.5, abs=0.02)
+
+
+def test_tdigest_empty():
+    assert math.isnan(TDigest().quantile(0.5))
+
+
+def test_running_statistics():
+    statistics = RunningStatistics()
+
+    assert math.isnan(statistics.mean)
+    assert math.isnan(statistics.std)
+
+    for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+        statistics.add(value)
+
+    assert statistics.count == 8
+    assert statistics.mean == 5.0
+    assert statistics.variance == pytest.approx(32 / 7)
+    assert statistics.min == 2
+    assert statistics.max == 9
+    assert statistics.quantile(0.5) == pytest.approx(4.5, abs=0.5)
+
+
+def test_score_sample():
+    sample = ScoreSample()
+
+    for value in [1.0, 2.0]:
+        sample.add(value)
+
+    other_sample = ScoreSample()
+    other_sample.add(3.0)
+    sample.merge(other_sample)
+
+    assert sample.to_numpy().tolist() == [1.0, 2.0, 3.0]
+    assert len(ScoreSample().to_numpy()) == 0
+
+
+def test_percentiles():
+    values = np.arange(101, dtype=np.float64)
+
+    assert percentiles(values, [5, 50, 95]) == [5.0, 50.0, 95.0]
+    assert all(math.isnan(value) for value in percentiles(np.empty(0), [50]))
+
+
+def test_bootstrap_mean_interval():
+    values = np.random.default_rng(42).normal(0.5, 0.1, size=10_000)
+
+    lower, upper = bootstrap_mean_interval(values, 1000)
+    standard_error = values.std() / math.sqrt(len(values))
+
+    assert lower < values.mean() < upper
+    assert upper - lower == pytest.approx(2 * 1.96 * standard_error, rel=0.1)
+
+
+def test_bootstrap_mean_interval_binary_scores():
+    values = np.array([0.0] * 300 + [1.0] * 700)
+
+    lower, upper = bootstrap_mean_interval(values, 2000)
+
+    assert lower == pytest.approx(0.7 - 1.96 * math.sqrt(0.21 / 1000), abs=0.005)
+    assert upper == pytest.approx(0.7 + 1.96 * math.sqrt(0.21 / 1000), abs=0.005)
+
+
+def test_bootstrap_mean_interval_with_outlier(monkeypatch):
+    # Draw a single resample at a time, so the chunks are exercised.
+    monkeypatch.setattr("linguametrica.statistics.BOOTSTRAP_CHUNK_SIZE", 1)
+
+    values = np.append(np.random.default_rng(42).uniform(0.4, 0.6, size=999), 100.0)
+
+    lower, upper = bootstrap_mean_interval(values, 500)
+    standard_error = values.std() / math.sqrt(len(values))
+
+    # The outlier dominates the spread of the mean instead of hiding it.
+    assert lower < values.mean() < upper
+    assert upper - lower == pytest.approx(2 * 1.96 * standard_error, rel=0.5)
+
+
+def test_bootstrap_mean_interval_large_sample_is_fast():
+    values = np.random.default_rng(42).uniform(0.0, 1.0, size=1_000_000)
+
+    start_time = time.perf_counter()
+    lower, upper = bootstrap_mean_interval(values, 1000)
+    duration = time.perf_counter() - start_time
+
+    standard_error = values.std() / math.sqrt(len(values))
+
+    assert duration < 1.0
+    assert lower < values.mean() < upper
+    assert upper - lower == pytest.approx(2 * 1.96 * standard_error, rel=0.01)
+
+
+def test_bootstrap_mean_interval_too_few_values():
+    assert all(math.isnan(bound) for bound in bootstrap_mean_interval(np.ones(1), 10))
+    assert bootstrap_mean_interval(np.ones(10), 10) == (1.0, 1.0)
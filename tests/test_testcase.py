@@ -5,9 +5,15 @@ import pytest
 from pydantic_yaml import to_yaml_file
 from pytest_mock import MockFixture
 
+from linguametrica.cache import DatasetCache
 from linguametrica.harness import TestHarness
 from linguametrica.metrics import Metric
-from linguametrica.testcase import TestCase, MessageData, MessageRole
+from linguametrica.testcase import (
+    MessageData,
+    MessageRole,
+    TestCase,
+    TestCaseCollection,
+)
 
 
 @pytest.fixture
@@ -48,6 +54,7 @@ def test_run_testcase(metric: Metric, test_harness: TestHarness):
     assert test_result is not None
     assert test_result.error is None
     assert test_result.scores["test"] == 0.5
+    assert set(test_result.timings.keys()) == {"pipeline", "test"}
 
 
 def test_run_test_case_with_history(metric: Metric, test_harness: TestHarness):
@@ -72,3 +79,115 @@ def test_load_testcase(config_file: Path):
     assert test_case.id == "test-1"
     assert test_case.input == "Hello, How are you?"
     assert len(test_case.history) == 0
+
+
+def test_load_testcase_collection(config_file: Path):
+    test_cases = TestCaseCollection.from_directory(config_file.parent)
+
+    assert len(test_cases) == 1
+    assert [test_case.id for test_case in test_cases] == ["test-1"]
+
+
+def test_load_testcase_collection_cached(config_file: Path, tmp_path):
+    dataset_cache = DatasetCache(tmp_path / "cache" / "dataset.db")
+
+    first_run = TestCaseCollection.from_directory(config_file.parent, dataset_cache)
+    second_run = TestCaseCollection.from_directory(config_file.parent, dataset_cache)
+
+    assert [test_case.id for test_case in first_run] == ["test-1"]
+    assert [test_case.id for test_case in second_run] == ["test-1"]
+
+
+def test_load_testcase_yaml_1_2_values(tmp_path):
+    test_case_file = Path(tmp_path) / "test-case-yes.yaml"
+    test_case_file.write_text("id: test-yes\ninput: yes\n")
+
+    test_case = TestCase.load(test_case_file)
+
+    assert test_case.input == "yes"
+
+
+def create_data_directory(tmp_path, group_sizes) -> Path:
+    data_directory = Path(tmp_path) / "data"
+
+    for group, group_size in group_sizes.items():
+        (data_directory / group).mkdir(parents=True)
+
+        for index in range(group_size):
+            test_case = TestCase(id=f"{group}-{index}", input=f"Question {index}")
+            to_yaml_file(data_directory / group / f"{group}-{index}.yml", test_case)
+
+    return data_directory
+
+
+def test_load_testcase_collection_subdirectories(tmp_path):
+    data_directory = create_data_directory(tmp_path, {"billing": 2, "support": 1})
+    (data_directory / "billing" / "notes.txt").write_text("Not a test case")
+
+    test_cases = TestCaseCollection.from_directory(data_directory)
+
+    assert [test_case.id for test_case in test_cases] == [
+        "billing-0",
+        "billing-1",
+        "support-0",
+    ]
+
+
+def test_sample_testcase_collection(tmp_path):
+    data_directory = create_data_directory(
+        tmp_path, {"billing": 60, "support": 30, "sales": 10}
+    )
+    test_cases = TestCaseCollection.from_directory(data_directory)
+
+    sample = test_cases.sample(size=10, seed=1)
+    groups = [path.parent.name for path in sample.paths]
+
+    assert len(sample) == 10
+    assert groups.count("billing") == 6
+    assert groups.count("support") == 3
+    assert groups.count("sales") == 1
+    assert sample.paths == test_cases.sample(size=10, seed=1).paths
+    assert sample.paths != test_cases.sample(size=10, seed=2).paths
+    assert len(test_cases.sample(fraction=0.25)) == 25
+    assert len(test_cases.sample(size=1000)) == 100
+
+
+def test_sample_testcase_collection_stable(tmp_path):
+    data_directory = create_data_directory(tmp_path, {"billing": 50})
+    sample = TestCaseCollection.from_directory(data_directory).sample(fraction=0.5)
+
+    to_yaml_file(
+        data_directory / "billing" / "billing-new.yml",
+        TestCase(id="billing-new", input="New question"),
+    )
+    new_sample = TestCaseCollection.from_directory(data_directory).sample(fraction=0.5)
+
+    assert len(set(sample.paths) - set(new_sample.paths)) <= 1
+
+
+def test_shuffle_testcase_collection(tmp_path):
+    test_cases = TestCaseCollection.from_directory(
+        create_data_directory(tmp_path, {"billing": 20})
+    )
+
+    shuffled = test_cases.shuffle(seed=1)
+
+    assert sorted(shuffled.paths) == test_cases.paths
+    assert shuffled.paths != test_cases.paths
+    assert shuffled.paths == test_cases.shuffle(seed=1).paths
+    assert shuffled.paths != test_cases.shuffle(seed=2).paths
+
+
+def test_sample_testcase_collection_invalid(tmp_path):
+    test_cases = TestCaseCollection.from_directory(
+        create_data_directory(tmp_path, {"billing": 5})
+    )
+
+    with pytest.raises(ValueError):
+        test_cases.sample()
+
+    with pytest.raises(ValueError):
+        test_cases.sample(size=5, fraction=0.5)
+
+    with pytest.raises(ValueError):
+        test_cases.sample(fraction=1.5)
@@ -0,0 +1,88 @@
+from uuid import uuid4
+
+import pytest
+from langchain_core.outputs import LLMResult
+
+from linguametrica.config import ModelPrice
+from linguametrica.usage import TokenUsage, TokenUsageCallbackHandler, get_price
+
+
+def create_llm_result(model_name: str, prompt_tokens: int, completion_tokens: int):
+    return LLMResult(
+        generations=[[]],
+        llm_output={
+            "model_name": model_name,
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        },
+    )
+
+
+def test_token_usage_callback_handler():
+    usage_handler = TokenUsageCallbackHandler()
+
+    assert usage_handler.get_usage() is None
+
+    usage_handler.on_llm_end(create_llm_result("gpt-3.5-turbo", 100, 10))
+    usage_handler.on_llm_end(create_llm_result("gpt-4", 200, 20))
+
+    assert usage_handler.get_usage() == TokenUsage(
+        prompt_tokens=300, completion_tokens=30
+    )
+
+
+def test_token_usage_callback_handler_estimates_cost():
+    usage_handler = TokenUsageCallbackHandler()
+    usage_handler.on_llm_end(create_llm_result("gpt-3.5-turbo-0125", 1000, 100))
+    usage_handler.on_llm_end(create_llm_result("unknown-model", 1000, 100))
+
+    usage = usage_handler.get_usage(
+        {"gpt-3.5-turbo": ModelPrice(prompt=0.5, completion=1.5)}
+    )
+
+    assert usage.prompt_tokens == 2000
+    assert usage.cost == pytest.approx(0.00065)
+
+
+def test_token_usage_callback_handler_measures_latency(mocker):
+    clock = mocker.patch("linguametrica.usage.time.perf_counter")
+    usage_handler = TokenUsageCallbackHandler()
+
+    assert usage_handler.get_latency() is None
+
+    first_run, second_run = uuid4(), uuid4()
+
+    clock.return_value = 1.0
+    usage_handler.on_llm_start({}, ["Hello"], run_id=first_run)
+    clock.return_value = 1.5
+    usage_handler.on_chat_model_start({}, [[]], run_id=second_run)
+    clock.return_value = 2.0
+    usage_handler.on_llm_end(create_llm_result("gpt-4", 10, 1), run_id=first_run)
+    clock.return_value = 4.0
+    usage_handler.on_llm_error(RuntimeError("Timeout"), run_id=second_run)
+
+    assert usage_handler.get_latency() == pytest.approx(3.5)
+    assert usage_handler.get_usage().calls == 2
+
+
+def test_get_price_uses_longest_prefix():
+    prices = {
+        "gpt-4": ModelPrice(prompt=30, completion=60),
+        "gpt-4-turbo": ModelPrice(prompt=10, completion=30),
+    }
+
+    assert get_price(prices, "gpt-4-turbo-2024-04-09").prompt == 10
+    assert get_price(prices, "gpt-4-0613").prompt == 30
+    assert get_price(prices, "gpt-3.5-turbo") is None
+
+
+def test_add_token_usage():
+    usage = TokenUsage(prompt_tokens=1, completion_tokens=2) + TokenUsage(
+        prompt_tokens=3, completion_tokens=4, cost=0.1
+    )
+
+    assert usage.total_tokens == 10
+    assert usage.cost == 0.1